@@ -0,0 +1,373 @@
+import json
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+import fire
+from loguru import logger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+# Scales are numbers of annotations.
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+ANNOTATIONS_PER_IMAGE = 5
+N_SHARDS = 4
+BASELINE_FILE = Path(__file__).with_name("baseline.json")
+
+Files = Dict[str, str]
+Timer = Callable[[], Any]
+
+
+def prepare(scale: str, data_dir: Path) -> Files:
+    """Generate the input files of a scale, reusing them if they already exist.
+
+    Args:
+        scale (str): Name of the scale in ``SCALES``.
+        data_dir (Path): Directory of the generated files.
+
+    Returns:
+        Files: Paths of the inputs, by name.
+    """
+    from cocosuite.core.synthetic import write_synthetic
+
+    scale_dir = data_dir / scale
+    n_images = SCALES[scale] // ANNOTATIONS_PER_IMAGE
+    files = {
+        "data": str(scale_dir / "data.json"),
+        "shards": str(scale_dir / "shards"),
+        "filter_config": str(scale_dir / "filter.json"),
+        "split_config": str(scale_dir / "split.json"),
+    }
+    if not Path(files["data"]).exists():
+        logger.info(f"Generating the {scale} dataset")
+        scale_dir.mkdir(parents=True, exist_ok=True)
+        options: Dict[str, Any] = dict(
+            annotations_per_image=ANNOTATIONS_PER_IMAGE,
+            id_sparsity=0.2,
+            segmentation_points=8,
+            compact=True,
+        )
+        for shard in range(N_SHARDS):
+            shard_file = Path(files["shards"], f"shard_{shard}", "annotations.json")
+            shard_file.parent.mkdir(parents=True, exist_ok=True)
+            write_synthetic(
+                str(shard_file), n_images // N_SHARDS, seed=shard, **options
+            )
+        Path(files["filter_config"]).write_text(
+            json.dumps({"filter": {"width": {"in": [640]}}, "match_all": False})
+        )
+        Path(files["split_config"]).write_text(
+            json.dumps({"criteria": {"file_name": {"prefix": "batch_1/"}}})
+        )
+        write_synthetic(files["data"], n_images, **options)
+    return files
+
+
+def bench_load(files: Files, work_dir: Path, timer: Timer) -> None:
+    """Load a dataset in memory and index its images."""
+    from cocosuite.core.dataset import COCODataset
+
+    with timer():
+        COCODataset.from_file(files["data"], use_cache=False).imgs
+
+
+def bench_load_streaming(files: Files, work_dir: Path, timer: Timer) -> None:
+    """Stream every annotation of a dataset."""
+    from cocosuite.core.dataset import COCODataset
+
+    with timer():
+        for _ in COCODataset.from_file(
+            files["data"], streaming=True
+        ).iter_annotations():
+            pass
+
+
+def bench_cache(files: Files, work_dir: Path, timer: Timer) -> None:
+    """Load a dataset from its binary cache."""
+    from cocosuite.core.cache import build_cache, load_cache
+
+    data_file = str(work_dir / "data.json")
+    shutil.copy(files["data"], data_file)
+    build_cache(data_file)
+    with timer():
+        load_cache(data_file)
+
+
+def bench_index(files: Files, work_dir: Path, timer: Timer) -> None:
+    """Build the random access index and look up 1000 images."""
+    from cocosuite.core.index import COCOIndex
+
+    with timer():
+        with COCOIndex.build(files["data"], str(work_dir / "index")) as index:
+            for image_id in index.image_ids[:: max(1, len(index) // 1000)].tolist():
+                index.get_annotations(image_id)
+
+
+def bench_statistics(files: Files, work_dir: Path, timer: Timer) -> None:
+    """Compute the statistics of the visualization charts."""
+    from cocosuite.core.statistics import DatasetStatistics
+
+    with timer():
+        DatasetStatistics.from_file(files["data"])
+
+
+def bench_report(files: Files, work_dir: Path, timer: Timer) -> None:
+    """Render the headless report of a dataset."""
+    from cocosuite.scripts.visualization.report import report
+
+    with timer():
+        report(files["data"], output_dir=str(work_dir / "report"), workers=1)
+
+
+def bench_merge(files: Files, work_dir: Path, timer: Timer) -> None:
+    """Merge a dataset with itself."""
+    from cocosuite.scripts.manipulation.coco_merge import coco_merge
+
+    with timer():
+        coco_merge(files["data"], files["data"], str(work_dir / "merged.json"))
+
+
+def bench_merge_multiple(files: Files, work_dir: Path, timer: Timer) -> None:
+    """Merge the shards of a directory."""
+    from cocosuite.scripts.manipulation.merge_multiple_coco_files import (
+        merge_multiple_coco_files,
+    )
+
+    shards_dir = work_dir / "shards"
+    shutil.copytree(files["shards"], shards_dir)
+    with timer():
+        merge_multiple_coco_files(str(shards_dir))
+
+
+def bench_filter(files: Files, work_dir: Path, timer: Timer) -> None:
+    """Filter images by width."""
+    from cocosuite.scripts.manipulation.coco_filter import filter_annotations
+
+    with timer():
+        filter_annotations(
+            files["data"], files["filter_config"], str(work_dir / "filtered.json")
+        )
+
+
+def bench_filter_streaming(files: Files, work_dir: Path, timer: Timer) -> None:
+    """Filter images by width in streaming mode."""
+    from cocosuite.scripts.manipulation.coco_filter import filter_annotations
+
+    with timer():
+        filter_annotations(
+            files["data"],
+            files["filter_config"],
+            str(work_dir / "filtered.json"),
+            streaming=True,
+        )
+
+
+def bench_random_split(files: Files, work_dir: Path, timer: Timer) -> None:
+    """Split a dataset randomly."""
+    from cocosuite.scripts.manipulation.coco_split import random_split
+
+    with timer():
+        random_split(files["data"], str(work_dir / "split.json"))
+
+
+def bench_property_split(files: Files, work_dir: Path, timer: Timer) -> None:
+    """Split a dataset by file name prefix."""
+    from cocosuite.scripts.manipulation.coco_split import property_split
+
+    with timer():
+        property_split(
+            files["data"], files["split_config"], str(work_dir / "split.json")
+        )
+
+
+def bench_stratified_split(files: Files, work_dir: Path, timer: Timer) -> None:
+    """Split a dataset balancing its categories."""
+    from cocosuite.scripts.manipulation.coco_split import stratified_split
+
+    with timer():
+        stratified_split(files["data"], str(work_dir / "split.json"))
+
+
+def bench_kfold_split(files: Files, work_dir: Path, timer: Timer) -> None:
+    """Write five cross-validation folds."""
+    from cocosuite.scripts.manipulation.coco_split import kfold_split
+
+    with timer():
+        kfold_split(files["data"], str(work_dir / "split.json"), n_folds=5)
+
+
+def bench_shard(files: Files, work_dir: Path, timer: Timer) -> None:
+    """Write 16 shards balanced by annotation count."""
+    from cocosuite.scripts.manipulation.coco_shard import shard_dataset
+
+    with timer():
+        shard_dataset(files["data"], 16, str(work_dir / "shard.json"))
+
+
+def bench_pipeline(files: Files, work_dir: Path, timer: Timer) -> None:
+    """Merge the shards, filter and split them in memory, writing only the splits."""
+    from cocosuite.scripts.manipulation.pipeline import COCOPipeline, load_config
+
+    filter_config = load_config(files["filter_config"])
+    with timer():
+        (
+            COCOPipeline()
+            .merge_multiple("merged", files["shards"])
+            .filter("filtered", "merged", **filter_config)
+            .random_split("split", "filtered")
+            .save("split_train", str(work_dir / "train.json"))
+            .save("split_val", str(work_dir / "val.json"))
+        )
+
+
+BENCHMARKS: Dict[str, Callable[[Files, Path, Timer], None]] = {
+    name[len("bench_") :]: function
+    for name, function in list(globals().items())
+    if name.startswith("bench_")
+}
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+def measure(name: str, files: Files, trace_memory: bool = False) -> Dict[str, Any]:
+    """Run a benchmark and measure its timed section.
+
+    Args:
+        name (str): Name of the benchmark in ``BENCHMARKS``.
+        files (Files): Inputs of the benchmark.
+        trace_memory (bool, optional): Also measure the peak of Python allocations with
+            tracemalloc, which slows the benchmark down. Defaults to False.
+
+    Returns:
+        Dict[str, Any]: Wall and CPU seconds of the timed section and peak memory of the
+            process.
+    """
+    metrics: Dict[str, Any] = {}
+
+    @contextmanager
+    def timer() -> Iterator[None]:
+        if trace_memory:
+            tracemalloc.start()
+        wall, cpu = time.perf_counter(), time.process_time()
+        yield
+        metrics["seconds"] = round(time.perf_counter() - wall, 3)
+        metrics["cpu_seconds"] = round(time.process_time() - cpu, 3)
+        if trace_memory:
+            metrics["peak_traced_mb"] = round(
+                tracemalloc.get_traced_memory()[1] / (1 << 20), 1
+            )
+            tracemalloc.stop()
+
+    logger.remove()
+    with tempfile.TemporaryDirectory() as work_dir:
+        BENCHMARKS[name](files, Path(work_dir), timer)
+    metrics["peak_rss_mb"] = _peak_rss_mb()
+    return metrics
+
+
+def _as_list(
+    value: Union[None, str, Sequence[str]], default: Sequence[str]
+) -> List[str]:
+    if value is None:
+        return list(default)
+    if isinstance(value, str):
+        return [v for v in value.split(",") if v]
+    return list(value)
+
+
+def run(
+    scales: Union[str, Sequence[str]] = "10k",
+    benchmarks: Union[None, str, Sequence[str]] = None,
+    data_dir: Optional[str] = None,
+    baseline: str = str(BASELINE_FILE),
+    update_baseline: bool = False,
+    tolerance: float = 1.5,
+    trace_memory: bool = False,
+    output_file: Optional[str] = None,
+) -> None:
+    """Time and memory-profile the tools on synthetic datasets.
+
+    Every benchmark runs in a fresh process, so the peak RSS of one does not hide the
+    next. Results are compared with the stored baseline of the same machine class: a
+    benchmark more than ``tolerance`` times slower or bigger than its baseline is
+    reported as a regression and the run exits with an error.
+
+    Args:
+        scales (Union[str, Sequence[str]], optional): Scales to run, comma separated, out
+            of "10k", "100k" and "1m" annotations. Defaults to "10k".
+        benchmarks (Union[None, str, Sequence[str]], optional): Benchmarks to run, comma
+            separated. Defaults to all of them.
+        data_dir (Optional[str], optional): Directory of the generated datasets, which
+            are reused between runs. Defaults to a temporary directory.
+        baseline (str, optional): Baseline file. Defaults to "benchmarks/baseline.json".
+        update_baseline (bool, optional): Store the results as the new baseline.
+            Defaults to False.
+        tolerance (float, optional): Allowed ratio over the baseline. Defaults to 1.5.
+        trace_memory (bool, optional): Also measure the peak of Python allocations.
+            Defaults to False.
+        output_file (Optional[str], optional): Write the results into this json file.
+            Defaults to None.
+    """
+    names = _as_list(benchmarks, list(BENCHMARKS))
+    baseline_file = Path(baseline)
+    stored = json.loads(baseline_file.read_text()) if baseline_file.exists() else {}
+    results: Dict[str, Dict[str, Any]] = {}
+    regressions = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(data_dir or tmp_dir)
+        for scale in _as_list(scales, ["10k"]):
+            files = prepare(scale, root)
+            for name in names:
+                key = f"{name}@{scale}"
+                with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                    metrics = pool.submit(measure, name, files, trace_memory).result()
+                results[key] = metrics
+
+                previous = stored.get(key, {})
+                slower = [
+                    metric
+                    for metric in ("seconds", "peak_rss_mb")
+                    if previous.get(metric)
+                    and metrics[metric] > tolerance * previous[metric]
+                ]
+                status = f"REGRESSION ({', '.join(slower)})" if slower else "ok"
+                logger.info(
+                    f"{key:32} {metrics['seconds']:9.3f} s {metrics['peak_rss_mb']:9.1f} MB"
+                    f"  baseline {previous.get('seconds', '-')} s"
+                    f" {previous.get('peak_rss_mb', '-')} MB  {status}"
+                )
+                if slower:
+                    regressions.append(key)
+
+    if output_file:
+        Path(output_file).write_text(json.dumps(results, indent=2) + "\n")
+    if update_baseline:
+        stored.update(results)
+        baseline_file.write_text(
+            json.dumps(dict(sorted(stored.items())), indent=2) + "\n"
+        )
+        logger.info(f"Baseline saved into {baseline_file}")
+    if regressions:
+        logger.error(f"Regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    fire.Fire(run)
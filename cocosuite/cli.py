@@ -0,0 +1,139 @@
+import sys
+from contextlib import nullcontext
+from importlib import import_module
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Tuple, Union
+
+# Subcommands are "module:function" strings imported only when they are run, so that
+# starting the CLI does not pay for NumPy or matplotlib unless the command needs them.
+Registry = Dict[str, Union[str, "Registry"]]
+
+COMMANDS: Registry = {
+    "merge": "cocosuite.scripts.manipulation.coco_merge:coco_merge",
+    "merge-multiple": (
+        "cocosuite.scripts.manipulation.merge_multiple_coco_files:merge_multiple_coco_files"
+    ),
+    "split": {
+        "random": "cocosuite.scripts.manipulation.coco_split:random_split",
+        "property": "cocosuite.scripts.manipulation.coco_split:property_split",
+        "stratified": "cocosuite.scripts.manipulation.coco_split:stratified_split",
+        "kfold": "cocosuite.scripts.manipulation.coco_split:kfold_split",
+    },
+    "filter": "cocosuite.scripts.manipulation.coco_filter:filter_annotations",
+    "pipeline": "cocosuite.scripts.manipulation.pipeline:run_pipeline",
+    "verify-images": "cocosuite.scripts.manipulation.verify_images:verify_images",
+    "shard": "cocosuite.scripts.manipulation.coco_shard:shard_dataset",
+    "segmentation": (
+        "cocosuite.scripts.manipulation.coco_segmentation:convert_segmentations"
+    ),
+    "plot": {
+        "categories": "cocosuite.scripts.visualization.visualization:plot_cat_distribution",
+        "image-sizes": (
+            "cocosuite.scripts.visualization.visualization:plot_img_size_distribution"
+        ),
+        "annotations-per-image": (
+            "cocosuite.scripts.visualization.visualization:plot_annotations_per_img"
+        ),
+        "image-sizes-by-category": (
+            "cocosuite.scripts.visualization.visualization"
+            ":plot_img_size_distribution_by_category"
+        ),
+        "bbox-sizes-by-category": (
+            "cocosuite.scripts.visualization.visualization"
+            ":plot_bbox_size_distribution_by_category"
+        ),
+        "all": "cocosuite.scripts.visualization.visualization:plot_all",
+    },
+    "report": "cocosuite.scripts.visualization.report:report",
+    "cache": "cocosuite.core.cache:build_cache",
+    "index": "cocosuite.core.index:build_index",
+}
+
+
+def resolve(spec: str) -> Callable[..., Any]:
+    """Import the function of a "module:function" command.
+
+    Args:
+        spec (str): Module and function of the command.
+
+    Returns:
+        Callable[..., Any]: The function.
+    """
+    module, _, function = spec.partition(":")
+    return getattr(import_module(module), function)
+
+
+def usage(name: str, commands: Registry) -> str:
+    """Get the usage message of a group of commands."""
+    return "\n".join(
+        [f"Usage: {name} [options] <command> [arguments]", "", "Commands:"]
+        + [f"  {command}" for command in commands]
+        + [
+            "",
+            "Options:",
+            "  --profile                 Log the time and memory of every stage",
+            "  --profile_output <file>   Also write them into a json file",
+        ]
+    )
+
+
+def parse_options(args: List[str]) -> Tuple[bool, Optional[str]]:
+    """Remove the profiling options placed before the command from the arguments.
+
+    Args:
+        args (List[str]): Command line arguments, modified in place.
+
+    Returns:
+        Tuple[bool, Optional[str]]: Whether to profile the command and the json file
+            to write the profile into.
+    """
+    profile, profile_output = False, None
+    while args and args[0].startswith("--profile"):
+        option, _, value = args.pop(0).partition("=")
+        if option == "--profile":
+            profile = True
+        elif option == "--profile_output":
+            if not value:
+                if not args:
+                    sys.exit("--profile_output requires a file")
+                value = args.pop(0)
+            profile, profile_output = True, value
+        else:
+            sys.exit(f'Unknown option "{option}"')
+    return profile, profile_output
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run a cocosuite command.
+
+    Args:
+        argv (Optional[List[str]], optional): Command line arguments, without the program
+            name. Defaults to ``sys.argv[1:]``.
+    """
+    args = sys.argv[1:] if argv is None else list(argv)
+    profile, profile_output = parse_options(args)
+    name = "cocosuite"
+    entry: Union[str, Registry] = COMMANDS
+    while isinstance(entry, dict):
+        if not args or args[0] not in entry:
+            print(usage(name, entry))
+            if args and args[0] not in ("-h", "--help"):
+                sys.exit(f'Unknown command "{args[0]}"')
+            return
+        command = args.pop(0)
+        name = f"{name} {command}"
+        entry = entry[command]
+
+    function = resolve(entry)
+    import fire
+
+    profiler: ContextManager[Any] = nullcontext()
+    if profile:
+        from cocosuite.core.profiling import Profiler
+
+        profiler = Profiler(name, output_file=profile_output)
+    with profiler:
+        fire.Fire(function, command=args, name=name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+import gc
+import json
+import os
+import zipfile
+from contextlib import contextmanager
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import fire
+import numpy as np
+from loguru import logger
+
+from cocosuite.core.dataset import CACHE_SUFFIX, COCODataset
+from cocosuite.core.profiling import stage
+
+CACHE_VERSION = 1
+FINGERPRINT_BLOCK = 1 << 20
+
+
+def cache_path(annotations_file: str) -> Path:
+    """Get the path of the sidecar cache of an annotations file."""
+    return Path(f"{annotations_file}{CACHE_SUFFIX}")
+
+
+def fingerprint(annotations_file: str) -> Dict[str, Any]:
+    """Get the values a cache is keyed by: path, size, mtime and a content hash.
+
+    The content hash covers the size and three 1 MiB blocks at the start, middle and end
+    of the file, so checking a multi-GB file stays well under a second.
+
+    Args:
+        annotations_file (str): JSON file containing COCO formatted data.
+
+    Returns:
+        Dict[str, Any]: Fingerprint of the file.
+    """
+    stat = os.stat(annotations_file)
+    content_hash = blake2b(str(stat.st_size).encode(), digest_size=16)
+    with open(annotations_file, "rb") as f:
+        for offset in (0, stat.st_size // 2, stat.st_size - FINGERPRINT_BLOCK):
+            f.seek(max(offset, 0))
+            content_hash.update(f.read(FINGERPRINT_BLOCK))
+    return {
+        "version": CACHE_VERSION,
+        "path": str(Path(annotations_file).resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": content_hash.hexdigest(),
+    }
+
+
+_SCALARS = {"int": int, "float": float, "bool": bool, "str": str}
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    # Rebuilding millions of records only allocates, so the cyclic garbage collector
+    # would repeatedly scan them without ever finding anything to free.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _is_number_list(value: Any, depth: int) -> bool:
+    if type(value) is not list:
+        return False
+    if depth == 1:
+        return all(type(v) is int or type(v) is float for v in value)
+    return all(_is_number_list(v, depth - 1) for v in value)
+
+
+def _kind(values: List[Any]) -> str:
+    for kind, value_type in _SCALARS.items():
+        if all(type(v) is value_type for v in values):
+            return kind
+    # Lists of numbers, such as boxes and polygons, are stored flat.
+    for depth in (1, 2):
+        if all(_is_number_list(v, depth) for v in values):
+            return "number" + "[]" * depth
+    return "json"
+
+
+def _encode_lists(values: List[Any], kind: str, name: str, arrays: Dict) -> None:
+    for level in range(kind.count("[]")):
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum([len(v) for v in values], out=offsets[1:])
+        arrays[f"{name}_offsets{level}"] = offsets
+        values = [x for v in values for x in v]
+    # Ints and floats are kept apart so that every number gets back its exact type.
+    is_int = np.fromiter(
+        (type(v) is int for v in values), dtype=bool, count=len(values)
+    )
+    arrays[f"{name}_is_int"] = is_int
+    arrays[f"{name}_ints"] = np.array([v for v in values if type(v) is int], np.int64)
+    arrays[name] = np.array([v for v in values if type(v) is float], np.float64)
+
+
+def _decode_lists(kind: str, name: str, arrays: Any) -> List[Any]:
+    is_int = arrays[f"{name}_is_int"]
+    leaves = np.empty(len(is_int), dtype=object)
+    leaves[is_int] = arrays[f"{name}_ints"].astype(object)
+    leaves[~is_int] = arrays[name].astype(object)
+    values = leaves.tolist()
+    for level in reversed(range(kind.count("[]"))):
+        offsets = arrays[f"{name}_offsets{level}"].tolist()
+        values = [values[start:end] for start, end in zip(offsets, offsets[1:])]
+    return values
+
+
+def _encode_column(values: List[Any], name: str, arrays: Dict[str, np.ndarray]) -> str:
+    kind = _kind(values)
+    try:
+        if kind == "int":
+            arrays[name] = np.array(values, dtype=np.int64)
+        elif kind.startswith("number"):
+            _encode_lists(values, kind, name, arrays)
+    except OverflowError:
+        kind = "json"
+
+    if kind == "float":
+        arrays[name] = np.array(values, dtype=np.float64)
+    elif kind == "bool":
+        arrays[name] = np.array(values, dtype=np.bool_)
+    elif kind == "str":
+        arrays[name] = np.frombuffer("".join(values).encode("utf-8"), dtype=np.uint8)
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum([len(v) for v in values], out=offsets[1:])
+        arrays[f"{name}_offsets"] = offsets
+    elif kind == "json":
+        text = json.dumps(values, ensure_ascii=False, separators=(",", ":"))
+        arrays[name] = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+    return kind
+
+
+def _decode_column(kind: str, name: str, arrays: Any) -> List[Any]:
+    if kind == "str":
+        text = arrays[name].tobytes().decode("utf-8")
+        offsets = arrays[f"{name}_offsets"].tolist()
+        return [text[start:end] for start, end in zip(offsets, offsets[1:])]
+    if kind == "json":
+        return json.loads(arrays[name].tobytes().decode("utf-8"))
+    if kind.endswith("[]"):
+        return _decode_lists(kind, name, arrays)
+    return arrays[name].tolist()
+
+
+def _encode_records(
+    records: List[Dict[str, Any]], prefix: str, arrays: Dict[str, np.ndarray]
+) -> Dict[str, Any]:
+    schema_ids: Dict[tuple, int] = {}
+    arrays[f"{prefix}schema"] = np.fromiter(
+        (schema_ids.setdefault(tuple(r), len(schema_ids)) for r in records),
+        dtype=np.int32,
+        count=len(records),
+    )
+    keys = list(dict.fromkeys(key for schema in schema_ids for key in schema))
+    columns = [
+        {
+            "key": key,
+            "kind": _encode_column(
+                [r[key] for r in records if key in r], f"{prefix}{i}", arrays
+            ),
+        }
+        for i, key in enumerate(keys)
+    ]
+    return {"schemas": [list(s) for s in schema_ids], "columns": columns}
+
+
+def _decode_records(meta: Dict[str, Any], prefix: str, arrays: Any) -> List[Dict]:
+    schema = arrays[f"{prefix}schema"]
+    values = {
+        column["key"]: _decode_column(column["kind"], f"{prefix}{i}", arrays)
+        for i, column in enumerate(meta["columns"])
+    }
+    schemas = [tuple(s) for s in meta["schemas"]]
+    if len(schemas) == 1:
+        keys = schemas[0]
+        if not keys:
+            return [{} for _ in range(len(schema))]
+        return [dict(zip(keys, row)) for row in zip(*(values[k] for k in keys))]
+
+    # Column values are stored only for the records having the key, so the row of each
+    # record in a column is its rank among them.
+    records: List[Dict[str, Any]] = [{} for _ in range(len(schema))]
+    ranks = {}
+    for key in values:
+        has_key = np.isin(schema, [i for i, s in enumerate(schemas) if key in s])
+        ranks[key] = np.cumsum(has_key) - 1
+    for schema_id, keys in enumerate(schemas):
+        idx = np.flatnonzero(schema == schema_id)
+        rows = zip(*([values[k][r] for r in ranks[k][idx].tolist()] for k in keys))
+        for i, row in zip(idx.tolist(), rows):
+            records[i] = dict(zip(keys, row))
+    return records
+
+
+def save_cache(dataset: COCODataset, annotations_file: str) -> Path:
+    """Store a parsed dataset in a binary sidecar cache next to its source file.
+
+    Lists of records are stored column by column: numbers and lists of numbers (e.g.
+    bbox, polygons) as flat NumPy arrays with offsets, strings as a UTF-8 string table
+    and any other value as compact JSON decoded in a single call.
+
+    Args:
+        dataset (COCODataset): Dataset loaded from ``annotations_file``.
+        annotations_file (str): JSON file the dataset was loaded from.
+
+    Returns:
+        Path: Path of the cache file.
+    """
+    arrays: Dict[str, Any] = {}
+    sections = []
+    for i, (key, value) in enumerate(dataset.to_dict().items()):
+        if isinstance(value, list) and all(isinstance(v, dict) for v in value):
+            meta = _encode_records(value, f"s{i}_", arrays)
+            sections.append({"key": key, "records": meta})
+        else:
+            sections.append({"key": key, "value": value})
+
+    meta = {"fingerprint": fingerprint(annotations_file), "sections": sections}
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+
+    output_file = cache_path(annotations_file)
+    tmp_file = output_file.with_name(f"{output_file.name}.tmp")
+    with open(tmp_file, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_file, output_file)
+    return output_file
+
+
+def load_cache(annotations_file: str) -> Optional[Dict[str, Any]]:
+    """Load a dataset from its sidecar cache if the cache is still valid.
+
+    Args:
+        annotations_file (str): JSON file containing COCO formatted data.
+
+    Returns:
+        Optional[Dict[str, Any]]: COCO formatted data, or None if there is no valid cache.
+    """
+    try:
+        with np.load(cache_path(annotations_file)) as arrays, _gc_paused():
+            meta = json.loads(arrays["meta"].tobytes().decode("utf-8"))
+            if meta["fingerprint"] != fingerprint(annotations_file):
+                logger.info(f"Ignoring outdated cache of {annotations_file}")
+                return None
+            return {
+                section["key"]: (
+                    _decode_records(section["records"], f"s{i}_", arrays)
+                    if "records" in section
+                    else section["value"]
+                )
+                for i, section in enumerate(meta["sections"])
+            }
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+        logger.warning(f"Ignoring unreadable cache of {annotations_file}: {e}")
+        return None
+
+
+def build_cache(annotations_file: str) -> str:
+    """Parse an annotations file and store it in a binary sidecar cache.
+
+    Every tool loading the file afterwards reads the cache instead, as long as the file
+    does not change.
+
+    Args:
+        annotations_file (str): JSON file containing COCO formatted data.
+
+    Returns:
+        str: Path of the cache file.
+    """
+    dataset = COCODataset.from_file(annotations_file, use_cache=False)
+    with stage("cache") as profile:
+        output_file = save_cache(dataset, annotations_file)
+        profile.records = len(dataset.images) + len(dataset.annotations)
+    logger.info(f"Saved cache into {output_file}")
+    return str(output_file)
+
+
+if __name__ == "__main__":
+    fire.Fire(build_cache)
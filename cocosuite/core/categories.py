@@ -0,0 +1,71 @@
+from typing import Any, Dict, Hashable, Iterable, List
+
+
+class CategoryRegistry:
+    """Categories gathered from several datasets, matched by name through a hash index.
+
+    Registering a category is O(1): it either resolves to the id of an already known
+    category with the same key or is added with the next free id. Registered categories
+    are copies, the input dicts are never modified.
+
+    Args:
+        match_supercategory (bool, optional): Match categories by name and supercategory
+            instead of only by name. Defaults to False.
+    """
+
+    def __init__(self, match_supercategory: bool = False) -> None:
+        self.match_supercategory = match_supercategory
+        self.categories: List[Dict[str, Any]] = []
+        self._ids: Dict[Hashable, int] = {}
+        self._used_ids: set = set()
+        self._max_id = 0
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+    def key(self, category: Dict[str, Any]) -> Hashable:
+        """Get the key two categories are matched by."""
+        if self.match_supercategory:
+            return category["name"], category.get("supercategory")
+        return category["name"]
+
+    def register(self, category: Dict[str, Any], keep_id: bool = False) -> int:
+        """Get the id of a category in the registry, adding it if it is not known yet.
+
+        Args:
+            category (Dict[str, Any]): Category to register.
+            keep_id (bool, optional): Keep the id of a new category if it is still free.
+                Defaults to False.
+
+        Returns:
+            int: Id of the category in the registry.
+        """
+        key = self.key(category)
+        cat_id = self._ids.get(key)
+        if cat_id is not None:
+            return cat_id
+
+        if keep_id and category["id"] not in self._used_ids:
+            cat_id = category["id"]
+        else:
+            cat_id = self._max_id + 1
+        self._ids[key] = cat_id
+        self._used_ids.add(cat_id)
+        self._max_id = max(self._max_id, cat_id)
+        self.categories.append(dict(category, id=cat_id))
+        return cat_id
+
+    def remap(
+        self, categories: Iterable[Dict[str, Any]], keep_ids: bool = False
+    ) -> Dict[int, int]:
+        """Register the categories of a dataset.
+
+        Args:
+            categories (Iterable[Dict[str, Any]]): Categories of the dataset.
+            keep_ids (bool, optional): Keep the ids of new categories if they are still
+                free. Defaults to False.
+
+        Returns:
+            Dict[int, int]: Mapping from the dataset category ids to the registry ids.
+        """
+        return {cat["id"]: self.register(cat, keep_id=keep_ids) for cat in categories}
@@ -0,0 +1,163 @@
+import math
+from itertools import islice
+from typing import Any, Dict, Hashable, Iterable, Iterator, List
+
+import numpy as np
+
+CHUNK_SIZE = 100_000
+
+_NO_BBOX = (np.nan, np.nan, np.nan, np.nan)
+# Codes of the ids that are not integers, counted up from the lowest int64.
+_ID_CODE_BASE = int(np.iinfo(np.int64).min)
+
+
+def positions(ids: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Get the position of each value in ``ids`` with a binary search, or -1 if missing.
+
+    Args:
+        ids (np.ndarray): Unique ids, in any order.
+        values (np.ndarray): Ids to look up.
+
+    Returns:
+        np.ndarray: Position of each value in ``ids``.
+    """
+    if not len(ids):
+        return np.full(len(values), -1, dtype=np.int64)
+    order = np.argsort(ids, kind="stable")
+    pos = np.minimum(np.searchsorted(ids[order], values), len(ids) - 1)
+    return np.where(ids[order][pos] == values, order[pos], -1)
+
+
+def _bbox(ann: Dict[str, Any]) -> Iterable[float]:
+    bbox = ann.get("bbox")
+    if isinstance(bbox, list) and len(bbox) == 4:
+        return [_number(v) for v in bbox]
+    return _NO_BBOX
+
+
+def _size(value: Any) -> int:
+    # Only JSON numbers are sizes, as in the numeric criteria.
+    if type(value) in (int, float) and math.isfinite(value):
+        return int(value)
+    return -1
+
+
+def _number(value: Any) -> float:
+    return value if type(value) in (int, float) else np.nan
+
+
+def _chunks(records: Iterator[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    while chunk := list(islice(records, CHUNK_SIZE)):
+        yield chunk
+
+
+def _concat(parts: List[np.ndarray], dtype: Any) -> np.ndarray:
+    return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+
+class COCOColumns:
+    """Struct-of-arrays view of a COCO dataset.
+
+    Every annotation field is a contiguous array aligned with the annotation order, and
+    every image field is aligned with the image order, so statistics, filters and splits
+    can be computed with NumPy operations instead of loops over dicts. Missing, null and
+    non-numeric values are NaN for floats, -1 for image sizes and 0 for ``iscrowd``.
+    Ids that are not integers, e.g. strings, are given int64 codes of their own, below
+    any integer id in practice, so they can still be looked up.
+
+    Attributes:
+        ann_id, ann_image_id, ann_category_id (np.ndarray): int64 annotation columns.
+        ann_bbox (np.ndarray): (N, 4) float32 boxes as [x, y, width, height].
+        ann_area (np.ndarray): float32 areas.
+        ann_iscrowd (np.ndarray): uint8 crowd flags.
+        ann_image_index (np.ndarray): Position of the image of each annotation in the
+            image columns, -1 if the image is unknown.
+        ann_category_index (np.ndarray): Position of the category of each annotation in
+            the category columns, -1 if the category is unknown.
+        img_id, img_width, img_height (np.ndarray): int64 image columns.
+        cat_id (np.ndarray): int64 category ids.
+        cat_names (List[str]): Category names.
+
+    Args:
+        images (List[Dict[str, Any]]): Images of the dataset.
+        annotations (Iterable[Dict[str, Any]]): Annotations of the dataset, consumed once.
+        categories (List[Dict[str, Any]]): Categories of the dataset.
+    """
+
+    def __init__(
+        self,
+        images: List[Dict[str, Any]],
+        annotations: Iterable[Dict[str, Any]],
+        categories: List[Dict[str, Any]],
+    ) -> None:
+        n_images = len(images)
+        self._id_codes: Dict[Hashable, int] = {}
+        self.img_id = self.ids([img["id"] for img in images])
+        self.img_width = np.fromiter(
+            (_size(img.get("width")) for img in images), dtype=np.int64, count=n_images
+        )
+        self.img_height = np.fromiter(
+            (_size(img.get("height")) for img in images), dtype=np.int64, count=n_images
+        )
+        self.cat_id = self.ids([cat["id"] for cat in categories])
+        self.cat_names = [cat["name"] for cat in categories]
+
+        ids, image_ids, category_ids, bboxes, areas, iscrowds = [], [], [], [], [], []
+        for chunk in _chunks(iter(annotations)):
+            n = len(chunk)
+            ids.append(self.ids([a["id"] for a in chunk]))
+            image_ids.append(self.ids([a["image_id"] for a in chunk]))
+            category_ids.append(self.ids([a["category_id"] for a in chunk]))
+            bboxes.append(
+                np.fromiter((v for a in chunk for v in _bbox(a)), np.float32, 4 * n)
+            )
+            areas.append(
+                np.fromiter((_number(a.get("area")) for a in chunk), np.float32, n)
+            )
+            iscrowds.append(
+                np.fromiter((a.get("iscrowd") or 0 for a in chunk), np.uint8, n)
+            )
+        self.ann_id = _concat(ids, np.int64)
+        self.ann_image_id = _concat(image_ids, np.int64)
+        self.ann_category_id = _concat(category_ids, np.int64)
+        self.ann_bbox = _concat(bboxes, np.float32).reshape(-1, 4)
+        self.ann_area = _concat(areas, np.float32)
+        self.ann_iscrowd = _concat(iscrowds, np.uint8)
+
+        self.ann_image_index = positions(self.img_id, self.ann_image_id)
+        self.ann_category_index = positions(self.cat_id, self.ann_category_id)
+
+    def __len__(self) -> int:
+        return len(self.ann_id)
+
+    def ids(self, values: List[Any]) -> np.ndarray:
+        """Get ids as an int64 array, coded like the id columns.
+
+        Args:
+            values (List[Any]): Ids, e.g. of some of the images.
+
+        Returns:
+            np.ndarray: The integer ids, and the codes of the other ids.
+        """
+        ids = np.array(values)
+        if ids.dtype.kind == "i":
+            return ids.astype(np.int64, copy=False)
+        codes = self._id_codes
+        return np.fromiter(
+            (
+                v if type(v) is int else codes.setdefault(v, _ID_CODE_BASE + len(codes))
+                for v in values
+            ),
+            np.int64,
+            len(values),
+        )
+
+    @property
+    def n_images(self) -> int:
+        """Number of images."""
+        return len(self.img_id)
+
+    @property
+    def n_categories(self) -> int:
+        """Number of categories."""
+        return len(self.cat_id)
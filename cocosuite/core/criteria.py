@@ -0,0 +1,213 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Union
+
+import numpy as np
+
+_MISSING = object()
+
+
+class ImageColumns:
+    """Column view of a list of images, each property extracted once on first use.
+
+    Args:
+        images (List[Dict[str, Any]]): Images to evaluate criteria over.
+    """
+
+    def __init__(self, images: List[Dict[str, Any]]) -> None:
+        self.images = images
+        self._values: Dict[str, List[Any]] = {}
+        self._numbers: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.images)
+
+    def values(self, key: str) -> List[Any]:
+        """Get the value of a property for every image, ``_MISSING`` where absent."""
+        if key not in self._values:
+            self._values[key] = [img.get(key, _MISSING) for img in self.images]
+        return self._values[key]
+
+    def numbers(self, key: str) -> np.ndarray:
+        """Get a property as a float array, NaN where it is absent or not a number."""
+        if key not in self._numbers:
+            self._numbers[key] = np.fromiter(
+                (v if type(v) in (int, float) else np.nan for v in self.values(key)),
+                dtype=np.float64,
+                count=len(self),
+            )
+        return self._numbers[key]
+
+
+class Predicate(ABC):
+    """Compiled criteria over image properties."""
+
+    def __call__(self, image: Dict[str, Any]) -> bool:
+        """Evaluate the criteria for a single image."""
+        return bool(self.evaluate([image])[0])
+
+    def evaluate(self, images: Union[List[Dict[str, Any]], ImageColumns]) -> np.ndarray:
+        """Evaluate the criteria for every image at once.
+
+        Args:
+            images (Union[List[Dict[str, Any]], ImageColumns]): Images to evaluate.
+
+        Returns:
+            np.ndarray: Whether each image matches the criteria.
+        """
+        if not isinstance(images, ImageColumns):
+            images = ImageColumns(images)
+        return self._evaluate(images)
+
+    @abstractmethod
+    def _evaluate(self, columns: ImageColumns) -> np.ndarray:
+        """Evaluate the criteria over the columns of the images."""
+
+
+class _All(Predicate):
+    def __init__(self, children: List[Predicate]) -> None:
+        self.children = children
+
+    def _evaluate(self, columns: ImageColumns) -> np.ndarray:
+        result = np.ones(len(columns), dtype=bool)
+        for child in self.children:
+            result &= child._evaluate(columns)
+        return result
+
+
+class _Any(Predicate):
+    def __init__(self, children: List[Predicate]) -> None:
+        self.children = children
+
+    def _evaluate(self, columns: ImageColumns) -> np.ndarray:
+        result = np.zeros(len(columns), dtype=bool)
+        for child in self.children:
+            result |= child._evaluate(columns)
+        return result
+
+
+class _Not(Predicate):
+    def __init__(self, child: Predicate) -> None:
+        self.child = child
+
+    def _evaluate(self, columns: ImageColumns) -> np.ndarray:
+        return ~self.child._evaluate(columns)
+
+
+class _ValueTest(Predicate):
+    """Test applied to each value of a property, absent values never match."""
+
+    def __init__(self, key: str, test: Callable[[Any], bool]) -> None:
+        self.key = key
+        self.test = test
+
+    def _evaluate(self, columns: ImageColumns) -> np.ndarray:
+        test = self.test
+        return np.fromiter(
+            (v is not _MISSING and test(v) for v in columns.values(self.key)),
+            dtype=bool,
+            count=len(columns),
+        )
+
+
+class _Compare(Predicate):
+    """Numeric comparison evaluated over the whole column, non-numbers never match."""
+
+    def __init__(self, key: str, compare: Callable[[np.ndarray], np.ndarray]) -> None:
+        self.key = key
+        self.compare = compare
+
+    def _evaluate(self, columns: ImageColumns) -> np.ndarray:
+        with np.errstate(invalid="ignore"):
+            return self.compare(columns.numbers(self.key))
+
+
+def _as_list(value: Any) -> List[Any]:
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def _in_test(values: List[Any]) -> Callable[[Any], bool]:
+    options = {v for v in values if not isinstance(v, (list, dict))}
+
+    def test(v: Any) -> bool:
+        try:
+            return v in options
+        except TypeError:
+            return False
+
+    return test
+
+
+def _contains_test(values: List[Any]) -> Callable[[Any], bool]:
+    substrings = [str(v) for v in values]
+    return lambda v: any(s in str(v) for s in substrings)
+
+
+def _compile_operator(key: str, operator: str, argument: Any) -> Predicate:
+    if operator == "in":
+        return _ValueTest(key, _in_test(_as_list(argument)))
+    if operator == "contains":
+        return _ValueTest(key, _contains_test(_as_list(argument)))
+    if operator == "prefix":
+        prefixes = tuple(str(v) for v in _as_list(argument))
+        return _ValueTest(key, lambda v: str(v).startswith(prefixes))
+    if operator == "suffix":
+        suffixes = tuple(str(v) for v in _as_list(argument))
+        return _ValueTest(key, lambda v: str(v).endswith(suffixes))
+    if operator == "regex":
+        pattern = re.compile(argument)
+        return _ValueTest(key, lambda v: pattern.search(str(v)) is not None)
+    if operator == "range":
+        low, high = argument
+        return _Compare(key, lambda x: (x >= low) & (x <= high))
+    if operator == "gt":
+        return _Compare(key, lambda x: x > argument)
+    if operator == "gte":
+        return _Compare(key, lambda x: x >= argument)
+    if operator == "lt":
+        return _Compare(key, lambda x: x < argument)
+    if operator == "lte":
+        return _Compare(key, lambda x: x <= argument)
+    raise ValueError(f'Unknown operator "{operator}" for property "{key}"')
+
+
+def _compile_field(key: str, condition: Any) -> Predicate:
+    if isinstance(condition, dict):
+        return _All([_compile_operator(key, op, arg) for op, arg in condition.items()])
+    return _compile_operator(key, "contains", condition)
+
+
+def compile_criteria(criteria: Dict[str, Any], match_all: bool = False) -> Predicate:
+    """Compile criteria over image properties into a predicate.
+
+    Each key of ``criteria`` is an image property mapped to a condition:
+
+    - A list of values matches if any of them is a substring of the property, the
+      historical behaviour (``480`` matches ``1480``).
+    - A dict of operators, all of which have to match: ``in`` (exact match against a
+      value or list of values), ``contains``, ``prefix``, ``suffix``, ``regex``,
+      ``range`` (``[min, max]``, inclusive), ``gt``, ``gte``, ``lt`` and ``lte``.
+
+    The special keys ``$and`` and ``$or`` take a list of criteria and ``$not`` takes
+    criteria, so conditions can be combined freely. Images without a property never
+    match a condition on it.
+
+    Args:
+        criteria (Dict[str, Any]): Criteria to compile.
+        match_all (bool, optional): Require every top-level condition to match instead
+            of any of them. Defaults to False.
+
+    Returns:
+        Predicate: The compiled criteria.
+    """
+    children: List[Predicate] = []
+    for key, condition in criteria.items():
+        if key == "$and":
+            children.append(_All([compile_criteria(c, True) for c in condition]))
+        elif key == "$or":
+            children.append(_Any([compile_criteria(c, True) for c in condition]))
+        elif key == "$not":
+            children.append(_Not(compile_criteria(condition, True)))
+        else:
+            children.append(_compile_field(key, condition))
+    return _All(children) if match_all else _Any(children)
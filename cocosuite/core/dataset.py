@@ -0,0 +1,296 @@
+import json
+from collections import defaultdict
+from contextlib import ExitStack
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional
+
+from cocosuite.core.profiling import stage
+from cocosuite.core.reader import iter_records, load_header
+from cocosuite.core.writer import COCOWriter, write_coco
+
+if TYPE_CHECKING:
+    from cocosuite.core.columns import COCOColumns
+
+CACHE_SUFFIX = ".cache.npz"
+
+
+class COCODataset:
+    """COCO dataset loaded in memory with lookup indexes built on first use.
+
+    The indexes are computed in a single pass over the images and annotations, so
+    every lookup afterwards is O(1) instead of a rescan of the whole annotation list.
+
+    In streaming mode only the images, categories and the rest of the small top-level
+    keys are held in memory, the annotations are read from ``source`` on demand.
+
+    Args:
+        data (Dict[str, Any]): COCO formatted data, as returned by ``json.load``.
+        source (Optional[str], optional): File the annotations are streamed from when
+            ``data`` has no "annotations" key. Defaults to None.
+    """
+
+    def __init__(self, data: Dict[str, Any], source: Optional[str] = None) -> None:
+        self.data = data
+        self.source = source
+        self.streaming = source is not None and "annotations" not in data
+        self.data.setdefault("images", [])
+        self.data.setdefault("categories", [])
+        if not self.streaming:
+            self.data.setdefault("annotations", [])
+
+    @classmethod
+    def from_file(
+        cls, annotations_file: str, streaming: bool = False, use_cache: bool = True
+    ) -> "COCODataset":
+        """Load a COCO formatted json file.
+
+        A binary sidecar cache built with ``cocosuite.core.cache`` is read instead of the
+        JSON file whenever it is still valid for the file.
+
+        Args:
+            annotations_file (str): JSON file containing COCO formatted data.
+            streaming (bool, optional): Keep the annotations on disk and stream them when
+                needed, so memory is proportional to the image table. Defaults to False.
+            use_cache (bool, optional): Read the sidecar cache if there is a valid one.
+                Defaults to True.
+
+        Returns:
+            COCODataset: The loaded dataset.
+        """
+        with stage("load") as profile:
+            dataset = cls._load(annotations_file, streaming, use_cache)
+            profile.records = len(dataset.images) + (
+                0 if dataset.streaming else len(dataset.annotations)
+            )
+        return dataset
+
+    @classmethod
+    def _load(
+        cls, annotations_file: str, streaming: bool, use_cache: bool
+    ) -> "COCODataset":
+        if streaming:
+            return cls(load_header(annotations_file), source=annotations_file)
+        if use_cache and Path(f"{annotations_file}{CACHE_SUFFIX}").exists():
+            # NumPy is only imported when there is a cache to read.
+            from cocosuite.core.cache import load_cache
+
+            data = load_cache(annotations_file)
+            if data is not None:
+                return cls(data, source=annotations_file)
+        with open(annotations_file, "r") as f:
+            return cls(json.load(f), source=annotations_file)
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        """General information about the dataset."""
+        return self.data.get("info", {})
+
+    @property
+    def licenses(self) -> List[Dict[str, Any]]:
+        """Licenses of the images."""
+        return self.data.get("licenses", [])
+
+    @property
+    def images(self) -> List[Dict[str, Any]]:
+        """Images of the dataset."""
+        return self.data["images"]
+
+    @property
+    def annotations(self) -> List[Dict[str, Any]]:
+        """Annotations of the dataset."""
+        if self.streaming:
+            raise RuntimeError(
+                "Annotations are not loaded in streaming mode, use iter_annotations"
+            )
+        return self.data["annotations"]
+
+    @property
+    def categories(self) -> List[Dict[str, Any]]:
+        """Categories of the dataset."""
+        return self.data["categories"]
+
+    @cached_property
+    def imgs(self) -> Dict[int, Dict[str, Any]]:
+        """Images indexed by their id."""
+        return {img["id"]: img for img in self.images}
+
+    @cached_property
+    def cats(self) -> Dict[int, Dict[str, Any]]:
+        """Categories indexed by their id."""
+        return {cat["id"]: cat for cat in self.categories}
+
+    @cached_property
+    def img_to_anns(self) -> Dict[int, List[Dict[str, Any]]]:
+        """Annotations grouped by the id of the image they belong to."""
+        img_to_anns = defaultdict(list)
+        for ann in self.annotations:
+            img_to_anns[ann["image_id"]].append(ann)
+        return img_to_anns
+
+    @cached_property
+    def cat_to_anns(self) -> Dict[int, List[Dict[str, Any]]]:
+        """Annotations grouped by their category id."""
+        cat_to_anns = defaultdict(list)
+        for ann in self.annotations:
+            cat_to_anns[ann["category_id"]].append(ann)
+        return cat_to_anns
+
+    @cached_property
+    def columns(self) -> "COCOColumns":
+        """Struct-of-arrays view of the dataset, built in one pass over the annotations."""
+        # NumPy is only imported by the tools that need columns.
+        from cocosuite.core.columns import COCOColumns
+
+        with stage("columns") as profile:
+            columns = COCOColumns(self.images, self.iter_annotations(), self.categories)
+            profile.records = len(columns)
+        return columns
+
+    def iter_annotations(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over the annotations, reading them from disk in streaming mode."""
+        if self.streaming:
+            return (ann for _, ann in iter_records(str(self.source), ("annotations",)))
+        return iter(self.annotations)
+
+    def get_annotations(self, image_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Get the annotations of the given images, keeping the order of the images.
+
+        Args:
+            image_ids (Iterable[int]): Ids of the images.
+
+        Returns:
+            List[Dict[str, Any]]: Annotations of the images.
+        """
+        img_to_anns = self.img_to_anns
+        return [ann for img_id in image_ids for ann in img_to_anns.get(img_id, [])]
+
+    def subset(self, images: List[Dict[str, Any]]) -> "COCODataset":
+        """Create a new dataset with the given images and their annotations.
+
+        Args:
+            images (List[Dict[str, Any]]): Images to keep.
+
+        Returns:
+            COCODataset: Dataset sharing info, licenses and categories with this one.
+        """
+        return self.partition([images])[0]
+
+    def partition(
+        self, image_groups: List[List[Dict[str, Any]]]
+    ) -> List["COCODataset"]:
+        """Create one dataset per group of images, each with the annotations of its images.
+
+        In memory the annotations follow the order of the images. In streaming mode the
+        annotations are routed in a single pass over the file and keep the file order.
+
+        Args:
+            image_groups (List[List[Dict[str, Any]]]): Disjoint groups of images.
+
+        Returns:
+            List[COCODataset]: Datasets sharing info, licenses and categories with this one.
+        """
+        if self.streaming:
+            group_of_img = {
+                img["id"]: i for i, images in enumerate(image_groups) for img in images
+            }
+            group_anns: List[List[Dict[str, Any]]] = [[] for _ in image_groups]
+            for ann in self.iter_annotations():
+                group = group_of_img.get(ann["image_id"])
+                if group is not None:
+                    group_anns[group].append(ann)
+        else:
+            group_anns = [
+                self.get_annotations(img["id"] for img in images)
+                for images in image_groups
+            ]
+
+        return [
+            self.with_records(images, annotations)
+            for images, annotations in zip(image_groups, group_anns)
+        ]
+
+    def with_records(
+        self, images: List[Dict[str, Any]], annotations: List[Dict[str, Any]]
+    ) -> "COCODataset":
+        """Create a dataset with the given images and annotations.
+
+        Args:
+            images (List[Dict[str, Any]]): Images of the new dataset.
+            annotations (List[Dict[str, Any]]): Annotations of the new dataset.
+
+        Returns:
+            COCODataset: Dataset sharing info, licenses and categories with this one.
+        """
+        return COCODataset(
+            {
+                "info": self.info,
+                "licenses": self.licenses,
+                "images": images,
+                "annotations": annotations,
+                "categories": self.categories,
+            }
+        )
+
+    def write_partition(
+        self,
+        image_groups: List[List[Dict[str, Any]]],
+        output_files: List[str],
+        compact: bool = False,
+    ) -> None:
+        """Write one COCO file per group of images, each with the annotations of its images.
+
+        In streaming mode all the output files are written at the same time while the
+        annotations are read in a single pass, so no annotation table is held in memory.
+
+        Args:
+            image_groups (List[List[Dict[str, Any]]]): Disjoint groups of images.
+            output_files (List[str]): Output json file of each group.
+            compact (bool, optional): Write without indentation. Defaults to False.
+        """
+        if not self.streaming:
+            for dataset, output_file in zip(self.partition(image_groups), output_files):
+                dataset.write(output_file, compact=compact)
+            return
+
+        with stage("write") as profile, ExitStack() as stack:
+            writers = [
+                stack.enter_context(COCOWriter(output_file, compact=compact))
+                for output_file in output_files
+            ]
+            for writer, images in zip(writers, image_groups):
+                writer.write_value("info", self.info)
+                writer.write_records("licenses", self.licenses)
+                writer.write_records("images", images)
+                writer.begin_array("annotations")
+
+            writer_of_img = {
+                img["id"]: writer
+                for writer, images in zip(writers, image_groups)
+                for img in images
+            }
+            for ann in self.iter_annotations():
+                img_writer = writer_of_img.get(ann["image_id"])
+                if img_writer is not None:
+                    img_writer.write_record(ann)
+
+            for writer in writers:
+                writer.end_array()
+                writer.write_records("categories", self.categories)
+            profile.records = sum(writer.records_written for writer in writers)
+
+    def write(self, output_file: str, compact: bool = False) -> None:
+        """Write the dataset into a COCO formatted json file.
+
+        Args:
+            output_file (str): Path of the output json file.
+            compact (bool, optional): Write without indentation. Defaults to False.
+        """
+        if self.streaming:
+            self.write_partition([self.images], [output_file], compact=compact)
+        else:
+            write_coco(output_file, self.data, compact=compact)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the COCO formatted data of the dataset."""
+        return self.data
@@ -0,0 +1,143 @@
+import posixpath
+import unicodedata
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, Hashable, List, Optional
+
+from loguru import logger
+
+from cocosuite.core.hashing import content_hash
+from cocosuite.core.parallel import ordered_map
+
+DEDUP_POLICIES = ("keep_first", "union")
+DEDUP_KEYS = ("path", "name", "content")
+HASH_WORKERS = 8
+
+
+def normalize_file_name(file_name: str) -> str:
+    """Get the base name of an image file, case folded and in Unicode NFC form.
+
+    Args:
+        file_name (str): Image file name, with or without folders.
+
+    Returns:
+        str: The normalized name.
+    """
+    name = PurePosixPath(file_name.replace("\\", "/")).name
+    return unicodedata.normalize("NFC", name).casefold()
+
+
+def normalize_path(file_name: str) -> str:
+    """Get the relative path of an image file, normalized and in Unicode NFC form.
+
+    Folders and case are kept, only the separators and "." and ".." parts change.
+
+    Args:
+        file_name (str): Image file name, relative to the image directory.
+
+    Returns:
+        str: The normalized path.
+    """
+    path = posixpath.normpath(file_name.replace("\\", "/"))
+    return unicodedata.normalize("NFC", path)
+
+
+def _file_hash(file: Path) -> Optional[str]:
+    try:
+        return content_hash(str(file))
+    except OSError:
+        return None
+
+
+class DuplicateIndex:
+    """Hash index of the images seen so far, to find the duplicates of new ones.
+
+    Images are duplicates when their normalized relative paths and sizes match, with
+    ``by="name"`` when their base names (case folded) and sizes match, or with
+    ``by="content"`` when their files have the same content hash. Content hashes are
+    computed in a thread pool reading the files in chunks; images whose file cannot be
+    read fall back to the path and size key. Images without width or height are never
+    found to be duplicates by path or name.
+
+    Args:
+        by (str, optional): "path", "name" or "content". Defaults to "path".
+        workers (int, optional): Number of threads hashing image files.
+            Defaults to 8.
+    """
+
+    def __init__(self, by: str = "path", workers: int = HASH_WORKERS) -> None:
+        if by not in DEDUP_KEYS:
+            raise ValueError(f'Unknown dedup key "{by}", expected one of {DEDUP_KEYS}')
+        self.by = by
+        self.workers = workers
+        self._ids: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def keys(
+        self,
+        images: List[Dict[str, Any]],
+        image_dir: Optional[str] = None,
+        prefix: str = "",
+    ) -> List[Optional[Hashable]]:
+        """Get the keys duplicates of the images are found by.
+
+        Args:
+            images (List[Dict[str, Any]]): Images of a dataset.
+            image_dir (Optional[str], optional): Directory the file names of the images
+                are relative to, needed to hash their content. Defaults to None.
+            prefix (str, optional): Prefix added to the file names of the images, e.g.
+                the folder of their annotation file, which the path and name keys leave
+                out. Defaults to "".
+
+        Returns:
+            List[Optional[Hashable]]: Key of every image, None if it has no key.
+        """
+        normalize = normalize_file_name if self.by == "name" else normalize_path
+        keys: List[Optional[Hashable]] = [
+            (
+                (
+                    normalize(img.get("file_name", "").removeprefix(prefix)),
+                    img["width"],
+                    img["height"],
+                )
+                if img.get("width") is not None and img.get("height") is not None
+                else None
+            )
+            for img in images
+        ]
+        if self.by != "content":
+            return keys
+        if image_dir is None:
+            raise ValueError("Finding duplicates by content needs the image directory")
+
+        files = [Path(image_dir, img.get("file_name", "")) for img in images]
+        hashes = ordered_map(_file_hash, files, self.workers, threads=True)
+        missing = 0
+        for i, digest in enumerate(hashes):
+            if digest is None:
+                missing += 1
+            else:
+                keys[i] = digest
+        if missing:
+            logger.warning(
+                f"{missing} image files not found in {image_dir}, "
+                "matched by path and size instead"
+            )
+        return keys
+
+    def find_or_add(self, key: Optional[Hashable], image_id: int) -> Optional[int]:
+        """Get the id of the image already seen with this key, adding it if there is none.
+
+        Args:
+            key (Optional[Hashable]): Key of the image, from ``keys``. Images without a
+                key are always new.
+            image_id (int): Id of the image if it is new.
+
+        Returns:
+            Optional[int]: Id of the image seen before, or None if the image is new.
+        """
+        if key is None:
+            return None
+        seen = self._ids.setdefault(key, image_id)
+        return None if seen == image_id else seen
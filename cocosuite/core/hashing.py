@@ -0,0 +1,20 @@
+from hashlib import blake2b
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def content_hash(file: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """Get the BLAKE2b digest of the whole content of a file.
+
+    Args:
+        file (str): Path of the file.
+        chunk_size (int, optional): Number of bytes read at a time. Defaults to 1 MiB.
+
+    Returns:
+        str: Hexadecimal digest.
+    """
+    digest = blake2b(digest_size=16)
+    with open(file, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
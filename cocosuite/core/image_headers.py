@@ -0,0 +1,116 @@
+import struct
+from typing import BinaryIO, Optional, Tuple
+
+HEADER_SIZE = 32
+
+Size = Tuple[int, int]
+
+# Start of frame markers, which hold the image size. C4, C8 and CC are not frames.
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Markers without a length field.
+JPEG_STANDALONE_MARKERS = frozenset(range(0xD0, 0xD8)) | {0x01, 0xD8}
+
+
+def _png_size(head: bytes) -> Optional[Size]:
+    if len(head) < 24 or head[12:16] != b"IHDR":
+        return None
+    width, height = struct.unpack(">II", head[16:24])
+    return width, height
+
+
+def _gif_size(head: bytes) -> Optional[Size]:
+    if len(head) < 10:
+        return None
+    width, height = struct.unpack("<HH", head[6:10])
+    return width, height
+
+
+def _bmp_size(head: bytes) -> Optional[Size]:
+    if len(head) < 26:
+        return None
+    (dib_size,) = struct.unpack("<I", head[14:18])
+    if dib_size == 12:
+        width, height = struct.unpack("<HH", head[18:22])
+        return width, height
+    width, height = struct.unpack("<ii", head[18:26])
+    # A negative height means the rows are stored top-down.
+    return width, abs(height)
+
+
+def _webp_size(head: bytes) -> Optional[Size]:
+    if len(head) < 30:
+        return None
+    chunk = head[12:16]
+    if chunk == b"VP8 " and head[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and head[20] == 0x2F:
+        b0, b1, b2, b3 = head[21:25]
+        width = 1 + (b0 | (b1 & 0x3F) << 8)
+        height = 1 + (b1 >> 6 | b2 << 2 | (b3 & 0x0F) << 10)
+        return width, height
+    if chunk == b"VP8X":
+        width = 1 + int.from_bytes(head[24:27], "little")
+        height = 1 + int.from_bytes(head[27:30], "little")
+        return width, height
+    return None
+
+
+def _jpeg_size(f: BinaryIO) -> Optional[Size]:
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b"\xff":
+            byte = f.read(1)
+        while byte == b"\xff":
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        if marker in (0xD9, 0xDA):
+            # End of image or start of scan before any frame header.
+            return None
+        segment = f.read(2)
+        if len(segment) < 2:
+            return None
+        (length,) = struct.unpack(">H", segment)
+        if marker in JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+        f.seek(length - 2, 1)
+
+
+def image_size(file: str) -> Optional[Size]:
+    """Get the size of a PNG, JPEG, GIF, BMP or WebP image from its header.
+
+    Only the first bytes of the file are read, plus the segment headers before the
+    frame header of JPEG files, so the image is never decoded.
+
+    Args:
+        file (str): Path of the image file.
+
+    Returns:
+        Optional[Size]: Width and height of the image, or None if the format is not
+            supported or the header is truncated.
+
+    Raises:
+        OSError: If the file cannot be opened.
+    """
+    with open(file, "rb") as f:
+        head = f.read(HEADER_SIZE)
+        if head.startswith(b"\x89PNG\r\n\x1a\n"):
+            return _png_size(head)
+        if head.startswith(b"\xff\xd8"):
+            return _jpeg_size(f)
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return _gif_size(head)
+        if head.startswith(b"BM"):
+            return _bmp_size(head)
+        if head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+            return _webp_size(head)
+    return None
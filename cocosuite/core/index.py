@@ -0,0 +1,230 @@
+import json
+import mmap
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import fire
+import numpy as np
+from loguru import logger
+
+from cocosuite.core.cache import fingerprint
+from cocosuite.core.dataset import COCODataset
+from cocosuite.core.profiling import stage
+from cocosuite.core.reader import iter_record_spans
+
+INDEX_SUFFIX = ".index"
+META_FILE = "meta.json"
+
+
+def index_path(annotations_file: str) -> Path:
+    """Get the default index directory of an annotations file."""
+    return Path(f"{annotations_file}{INDEX_SUFFIX}")
+
+
+def _spans(starts: array, ends: array) -> np.ndarray:
+    return np.stack([np.frombuffer(starts, np.int64), np.frombuffer(ends, np.int64)], 1)
+
+
+class COCOIndex:
+    """Random access to the images and annotations of a COCO file by image id.
+
+    The index is a directory of ``.npy`` offset tables sorted by image id: the byte span
+    of each image, the range of its annotations in the annotation table, sorted by image,
+    and the byte span of each annotation. The tables and the annotations file are memory
+    mapped, so a lookup only reads the requested records and every process opening the
+    same index shares the mapped pages.
+
+    Args:
+        annotations_file (str): JSON file the index was built for.
+        index_dir (Optional[str], optional): Directory of the index. Defaults to the
+            annotations file path with an ".index" suffix.
+
+    Raises:
+        FileNotFoundError: If the index does not exist.
+        ValueError: If the index was built for a different version of the file.
+    """
+
+    def __init__(self, annotations_file: str, index_dir: Optional[str] = None) -> None:
+        self.annotations_file = annotations_file
+        self.index_dir = Path(index_dir) if index_dir else index_path(annotations_file)
+        with open(self.index_dir / META_FILE, "r") as f:
+            meta = json.load(f)
+        if meta["fingerprint"] != fingerprint(annotations_file):
+            raise ValueError(f"The index of {annotations_file} is outdated, rebuild it")
+        self.header: Dict[str, Any] = meta["header"]
+
+        self.image_ids = self._load_table("image_ids")
+        self.image_spans = self._load_table("image_spans")
+        self.image_annotations = self._load_table("image_annotations")
+        self.annotation_image_ids = self._load_table("annotation_image_ids")
+        self.annotation_spans = self._load_table("annotation_spans")
+
+        self._file = open(annotations_file, "rb")
+        # An empty file cannot be mapped, but it is not a valid COCO file either.
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def build(
+        cls, annotations_file: str, index_dir: Optional[str] = None
+    ) -> "COCOIndex":
+        """Scan an annotations file once and persist its index.
+
+        Args:
+            annotations_file (str): JSON file containing COCO formatted data.
+            index_dir (Optional[str], optional): Directory of the index. Defaults to the
+                annotations file path with an ".index" suffix.
+
+        Returns:
+            COCOIndex: The opened index.
+        """
+        output_dir = Path(index_dir) if index_dir else index_path(annotations_file)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        (output_dir / META_FILE).unlink(missing_ok=True)
+
+        image_ids, image_starts, image_ends = array("q"), array("q"), array("q")
+        ann_image_ids, ann_starts, ann_ends = array("q"), array("q"), array("q")
+        header_spans = {}
+        with stage("scan") as profile:
+            for key, record, start, end in iter_record_spans(annotations_file):
+                if key == "images":
+                    image_ids.append(record["id"])
+                    image_starts.append(start)
+                    image_ends.append(end)
+                elif key == "annotations":
+                    ann_image_ids.append(record["image_id"])
+                    ann_starts.append(start)
+                    ann_ends.append(end)
+                else:
+                    header_spans[key] = (start, end)
+            profile.records = len(image_ids) + len(ann_image_ids)
+
+        img_ids = np.frombuffer(image_ids, np.int64)
+        img_order = np.argsort(img_ids, kind="stable")
+        ann_img_ids = np.frombuffer(ann_image_ids, np.int64)
+        ann_order = np.argsort(ann_img_ids, kind="stable")
+        tables = {
+            "image_ids": img_ids[img_order],
+            "image_spans": _spans(image_starts, image_ends)[img_order],
+            "annotation_image_ids": ann_img_ids[ann_order],
+            "annotation_spans": _spans(ann_starts, ann_ends)[ann_order],
+        }
+        tables["image_annotations"] = np.stack(
+            [
+                np.searchsorted(
+                    tables["annotation_image_ids"], tables["image_ids"], "left"
+                ),
+                np.searchsorted(
+                    tables["annotation_image_ids"], tables["image_ids"], "right"
+                ),
+            ],
+            1,
+        )
+        for table, values in tables.items():
+            np.save(output_dir / f"{table}.npy", values)
+
+        with open(annotations_file, "rb") as f:
+            header = {}
+            for key, (start, end) in header_spans.items():
+                f.seek(start)
+                header[key] = json.loads(f.read(end - start).decode("utf-8"))
+        # The metadata is written last, so an interrupted build leaves no valid index.
+        meta = {"fingerprint": fingerprint(annotations_file), "header": header}
+        with open(output_dir / META_FILE, "w") as f:
+            json.dump(meta, f)
+        return cls(annotations_file, str(output_dir))
+
+    def _load_table(self, table: str) -> np.ndarray:
+        return np.load(self.index_dir / f"{table}.npy", mmap_mode="r")
+
+    def close(self) -> None:
+        """Release the mapped annotations file."""
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "COCOIndex":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.image_ids)
+
+    def __contains__(self, image_id: int) -> bool:
+        return self._position(image_id) is not None
+
+    @property
+    def categories(self) -> List[Dict[str, Any]]:
+        """Categories of the dataset."""
+        return self.header.get("categories", [])
+
+    def _position(self, image_id: int) -> Optional[int]:
+        pos = int(np.searchsorted(self.image_ids, image_id))
+        if pos < len(self.image_ids) and self.image_ids[pos] == image_id:
+            return pos
+        return None
+
+    def _read(self, span: np.ndarray) -> Dict[str, Any]:
+        start, end = span.tolist()
+        return json.loads(self._map[start:end].decode("utf-8"))
+
+    def get_image(self, image_id: int) -> Dict[str, Any]:
+        """Get an image by its id.
+
+        Raises:
+            KeyError: If there is no image with that id.
+        """
+        pos = self._position(image_id)
+        if pos is None:
+            raise KeyError(image_id)
+        return self._read(self.image_spans[pos])
+
+    def get_annotations(self, image_id: int) -> List[Dict[str, Any]]:
+        """Get the annotations of an image, in file order.
+
+        Raises:
+            KeyError: If there is no image with that id.
+        """
+        pos = self._position(image_id)
+        if pos is None:
+            raise KeyError(image_id)
+        start, end = self.image_annotations[pos].tolist()
+        return [self._read(span) for span in self.annotation_spans[start:end]]
+
+    def subset(self, image_ids: Iterable[int]) -> COCODataset:
+        """Get a dataset with only the given images and their annotations.
+
+        Args:
+            image_ids (Iterable[int]): Ids of the images to keep.
+
+        Returns:
+            COCODataset: Dataset with the header of the file and the given images.
+        """
+        image_ids = list(image_ids)
+        data = dict(self.header)
+        data["images"] = [self.get_image(image_id) for image_id in image_ids]
+        data["annotations"] = [
+            ann for image_id in image_ids for ann in self.get_annotations(image_id)
+        ]
+        return COCODataset(data)
+
+
+def build_index(annotations_file: str, index_dir: Optional[str] = None) -> str:
+    """Build the random access index of an annotations file.
+
+    Args:
+        annotations_file (str): JSON file containing COCO formatted data.
+        index_dir (Optional[str], optional): Directory of the index. Defaults to the
+            annotations file path with an ".index" suffix.
+
+    Returns:
+        str: Directory of the index.
+    """
+    with COCOIndex.build(annotations_file, index_dir) as index:
+        logger.info(f"Indexed {len(index)} images into {index.index_dir}")
+        return str(index.index_dir)
+
+
+if __name__ == "__main__":
+    fire.Fire(build_index)
@@ -0,0 +1,60 @@
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Deque, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def resolve_workers(workers: int) -> int:
+    """Get the number of workers to use, where 0 or less means one per CPU."""
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def ordered_map(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    workers: int = 1,
+    threads: bool = False,
+    prefetch: int = 2,
+) -> Iterator[R]:
+    """Apply ``func`` to every item in a worker pool, yielding results in input order.
+
+    At most ``prefetch * workers`` items are in flight at a time, so results that are
+    not consumed yet do not pile up in memory. With a single worker the items are
+    processed serially in the calling process.
+
+    Args:
+        func (Callable[[T], R]): Function to apply. Must be picklable for processes.
+        items (Iterable[T]): Items to process.
+        workers (int, optional): Number of workers, 0 or less for one per CPU. Defaults to 1.
+        threads (bool, optional): Use a thread pool instead of a process pool.
+            Defaults to False.
+        prefetch (int, optional): Items submitted in advance per worker. Defaults to 2.
+
+    Yields:
+        R: The result of each item.
+    """
+    workers = resolve_workers(workers)
+    if workers == 1:
+        yield from map(func, items)
+        return
+
+    executor_cls = ThreadPoolExecutor if threads else ProcessPoolExecutor
+    executor: Executor
+    with executor_cls(max_workers=workers) as executor:
+        items = iter(items)
+        pending: Deque[Future] = deque()
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= prefetch * workers:
+                break
+        while pending:
+            result = pending.popleft().result()
+            for item in items:
+                pending.append(executor.submit(func, item))
+                break
+            yield result
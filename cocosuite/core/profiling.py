@@ -0,0 +1,199 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import TracebackType
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+
+from loguru import logger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+_ACTIVE: ContextVar[Optional["Profiler"]] = ContextVar("profiler", default=None)
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the peak RSS of the process, only possible on Linux."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Get the peak RSS of the process since the last reset, or since it started."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return peak / (1 << 20 if sys.platform == "darwin" else 1 << 10)
+
+
+class Stage:
+    """Measurements of a stage, which the instrumented code can add a record count to.
+
+    Attributes:
+        name (str): Name of the stage.
+        depth (int): Number of enclosing stages.
+        records (Optional[int]): Number of records processed by the stage.
+        wall_seconds, cpu_seconds (float): Time spent in the stage.
+        peak_rss_mb (Optional[float]): Peak RSS of the process during the stage.
+    """
+
+    def __init__(self, name: str, depth: int = 0) -> None:
+        self.name = name
+        self.depth = depth
+        self.records: Optional[int] = None
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_rss_mb: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the measurements as a json serializable dict."""
+        return {
+            "name": self.name,
+            "depth": self.depth,
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "peak_rss_mb": (
+                None if self.peak_rss_mb is None else round(self.peak_rss_mb, 1)
+            ),
+            "records": self.records,
+        }
+
+    def __str__(self) -> str:
+        text = (
+            f"{self.name}: {self.wall_seconds:.3f} s wall, {self.cpu_seconds:.3f} s CPU"
+        )
+        if self.peak_rss_mb is not None:
+            text += f", {self.peak_rss_mb:.1f} MB peak RSS"
+        if self.records is not None:
+            text += f", {self.records} records"
+        return text
+
+
+class Profiler:
+    """Opt-in recorder of the stages run by the tools.
+
+    While a profiler is active, every ``stage`` block records its wall time, CPU time,
+    peak RSS and record count, logs them and keeps them for ``to_dict``. Stages run in
+    worker processes or threads are not recorded.
+
+    Example:
+        >>> with Profiler("merge", output_file="metrics.json"):
+        ...     coco_merge("a.json", "b.json")
+
+    Args:
+        name (str, optional): Name of the profiled run. Defaults to "cocosuite".
+        output_file (Optional[str], optional): Write the metrics into this json file when
+            the run ends. Defaults to None.
+    """
+
+    def __init__(
+        self, name: str = "cocosuite", output_file: Optional[str] = None
+    ) -> None:
+        self.name = name
+        self.output_file = output_file
+        self.total = Stage(name)
+        self.stages: List[Stage] = []
+        self._open: List[Stage] = []
+        self._token: Any = None
+        self._start: Tuple[float, float] = (0.0, 0.0)
+
+    def __enter__(self) -> "Profiler":
+        self._token = _ACTIVE.set(self)
+        self._start = self._begin()
+        self._open = [self.total]
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self._end(self.total, self._start)
+        _ACTIVE.reset(self._token)
+        logger.info(f"Profile of {self.total}")
+        if self.output_file:
+            self.write(self.output_file)
+
+    def _begin(self) -> Tuple[float, float]:
+        # The peak is reset for the new stage, keep the one reached so far in the
+        # stages it is nested in.
+        peak = _peak_rss_mb()
+        if peak is not None:
+            for open_stage in self._open:
+                open_stage.peak_rss_mb = max(open_stage.peak_rss_mb or 0, peak)
+        _reset_peak_rss()
+        return time.perf_counter(), time.process_time()
+
+    def _end(self, stage: Stage, start: Tuple[float, float]) -> None:
+        stage.wall_seconds = time.perf_counter() - start[0]
+        stage.cpu_seconds = time.process_time() - start[1]
+        peak = _peak_rss_mb()
+        # Inner stages reset the peak, so the peak of a stage includes theirs.
+        if peak is not None:
+            stage.peak_rss_mb = max(peak, stage.peak_rss_mb or 0)
+            if stage is not self.total:
+                parent = self._open[-1]
+                parent.peak_rss_mb = max(parent.peak_rss_mb or 0, stage.peak_rss_mb)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Stage]:
+        """Record a stage of the run."""
+        record = Stage(name, depth=len(self._open) - 1)
+        start = self._begin()
+        self.stages.append(record)
+        self._open.append(record)
+        try:
+            yield record
+        finally:
+            self._open.pop()
+            self._end(record, start)
+            logger.info(f"Profile {'  ' * record.depth}{record}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the metrics of the run as a json serializable dict."""
+        return {
+            "name": self.name,
+            "total": self.total.to_dict(),
+            "stages": [stage.to_dict() for stage in self.stages],
+        }
+
+    def write(self, output_file: str) -> None:
+        """Write the metrics of the run into a json file."""
+        with open(output_file, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        logger.info(f"Profile saved into {output_file}")
+
+
+@contextmanager
+def stage(name: str) -> Iterator[Stage]:
+    """Record a stage in the active profiler, doing nothing when there is none.
+
+    Args:
+        name (str): Name of the stage.
+
+    Yields:
+        Stage: The stage, whose ``records`` can be set to the number of processed records.
+    """
+    profiler = _ACTIVE.get()
+    if profiler is None:
+        yield Stage(name)
+        return
+    with profiler.stage(name) as record:
+        yield record
@@ -0,0 +1,223 @@
+import json
+import re
+from typing import IO, Any, Dict, Iterable, Iterator, Tuple
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+class _Scanner:
+    """Incremental scanner over a JSON text file.
+
+    Only the part of the file that has not been consumed yet is kept in the buffer, so
+    memory is bounded by the size of the largest single value that is decoded.
+    """
+
+    def __init__(self, f: IO[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.offset = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """Read more data into the buffer, dropping the already consumed part.
+
+        The read size grows with the buffer, so decoding a value larger than the chunk
+        size needs a logarithmic number of attempts instead of a linear one.
+        """
+        if self.eof:
+            return False
+        chunk = self.f.read(max(self.chunk_size, len(self.buffer) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.offset += self.pos
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self.buffer, self.pos)
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, or "" at the end of the file."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()  # type: ignore[union-attr]
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Consume the next character, which must be ``char``."""
+        if self.peek() != char:
+            raise self._error(f"Expecting '{char}'")
+        self.pos += 1
+
+    def decode_value(self) -> Any:
+        """Decode the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number or literal touching the end of the buffer may be truncated.
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def decode_span(self) -> Tuple[Any, int, int]:
+        """Decode the next JSON value along with its start and end position in the file."""
+        self.peek()
+        start = self.offset + self.pos
+        value = self.decode_value()
+        return value, start, self.offset + self.pos
+
+    def iter_array(self) -> Iterator[Any]:
+        """Decode the elements of the next JSON array one by one."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.decode_value()
+            if self.end_of_container("]"):
+                return
+
+    def iter_object_keys(self) -> Iterator[str]:
+        """Iterate over the keys of the next JSON object.
+
+        After each key is yielded the scanner is positioned at its value, which has to be
+        consumed before resuming the iteration.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.decode_value()
+            self.expect(":")
+            yield key
+            if self.end_of_container("}"):
+                return
+
+    def end_of_container(self, closing: str) -> bool:
+        """Consume the separator after a value, returning whether the container ended."""
+        char = self.peek()
+        self.pos += 1
+        if char == ",":
+            return False
+        if char == closing:
+            return True
+        self.pos -= 1
+        raise self._error(f"Expecting ',' or '{closing}'")
+
+
+def iter_records(
+    annotations_file: str,
+    sections: Iterable[str] = ("images", "annotations", "categories"),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Tuple[str, Any]]:
+    """Stream the records of a COCO formatted json file without loading it whole.
+
+    Args:
+        annotations_file (str): JSON file containing COCO formatted data.
+        sections (Iterable[str], optional): Top-level keys to stream. The elements of list
+            sections are yielded one by one, any other value is yielded once.
+            Defaults to ("images", "annotations", "categories").
+        chunk_size (int, optional): Number of characters read at a time. Defaults to 1 MiB.
+
+    Yields:
+        Tuple[str, Any]: The section name and the record.
+    """
+    sections = set(sections)
+    with open(annotations_file, "r", encoding="utf-8") as f:
+        scanner = _Scanner(f, chunk_size)
+        for key in scanner.iter_object_keys():
+            if scanner.peek() == "[":
+                for record in scanner.iter_array():
+                    if key in sections:
+                        yield key, record
+            else:
+                value = scanner.decode_value()
+                if key in sections:
+                    yield key, value
+
+
+def iter_record_spans(
+    annotations_file: str,
+    sections: Iterable[str] = ("images", "annotations"),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Tuple[str, Any, int, int]]:
+    """Stream the records of a COCO formatted json file along with their byte offsets.
+
+    The file is decoded as latin-1 so that positions are byte offsets, which means
+    non-ASCII strings of the yielded records are not decoded correctly: they are meant to
+    read ids and numbers, the exact records are read back from their byte spans.
+
+    Args:
+        annotations_file (str): JSON file containing COCO formatted data.
+        sections (Iterable[str], optional): Top-level list keys whose elements are yielded
+            one by one, any other value is yielded once. Defaults to ("images", "annotations").
+        chunk_size (int, optional): Number of characters read at a time. Defaults to 1 MiB.
+
+    Yields:
+        Tuple[str, Any, int, int]: The section name, the record and its start and end
+            byte offsets.
+    """
+    sections = set(sections)
+    with open(annotations_file, "r", encoding="latin-1", newline="") as f:
+        scanner = _Scanner(f, chunk_size)
+        for key in scanner.iter_object_keys():
+            if key not in sections or scanner.peek() != "[":
+                yield (key, *scanner.decode_span())
+                continue
+            scanner.expect("[")
+            if scanner.peek() == "]":
+                scanner.pos += 1
+                continue
+            while True:
+                yield (key, *scanner.decode_span())
+                if scanner.end_of_container("]"):
+                    break
+
+
+def load_header(
+    annotations_file: str,
+    skip: Iterable[str] = ("annotations",),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """Load a COCO formatted json file leaving out the given sections.
+
+    The skipped sections are scanned record by record and discarded, so loading the
+    images and categories of a file never holds its annotation table in memory.
+
+    Args:
+        annotations_file (str): JSON file containing COCO formatted data.
+        skip (Iterable[str], optional): Top-level keys to leave out. Defaults to ("annotations",).
+        chunk_size (int, optional): Number of characters read at a time. Defaults to 1 MiB.
+
+    Returns:
+        Dict[str, Any]: The remaining top-level keys of the file.
+    """
+    skip = set(skip)
+    header = {}
+    with open(annotations_file, "r", encoding="utf-8") as f:
+        scanner = _Scanner(f, chunk_size)
+        for key in scanner.iter_object_keys():
+            if key not in skip:
+                header[key] = scanner.decode_value()
+            elif scanner.peek() == "[":
+                for _ in scanner.iter_array():
+                    pass
+            else:
+                scanner.decode_value()
+    return header
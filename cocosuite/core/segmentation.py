@@ -0,0 +1,577 @@
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from cocosuite.core.dataset import COCODataset
+from cocosuite.core.parallel import ordered_map
+from cocosuite.core.profiling import stage
+
+SEGMENTATION_MODES = ("rle", "polygon", "geometry")
+BATCH_SIZE = 1000
+# Polygons are rasterized on a grid upsampled by this factor, as in pycocotools.
+POLYGON_SCALE = 5
+# 5-bit groups needed to compress the difference of two 32-bit counts.
+GROUPS_PER_COUNT = 7
+
+RLE = Dict[str, Any]
+Size = Tuple[int, int]
+Batch = Tuple[List[Dict[str, Any]], List[Optional[Size]], str]
+
+
+def _groups(lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the group and the position in its group of every item of concatenated groups."""
+    group = np.repeat(np.arange(len(lengths)), lengths)
+    position = np.arange(len(group)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return group, position
+
+
+def _encode(counts_list: List[np.ndarray]) -> List[str]:
+    """Compress the RLE counts of several masks at once."""
+    lengths = np.array([len(counts) for counts in counts_list], dtype=np.int64)
+    if not lengths.sum():
+        return ["" for _ in counts_list]
+    counts = np.concatenate(counts_list).astype(np.int64)
+    group, position = _groups(lengths)
+    x = counts.copy()
+    delta = np.flatnonzero(position > 2)
+    x[delta] -= counts[delta - 2]
+    # One column per 5-bit group, little end first; a value ends at the first group
+    # after which only its sign extension is left.
+    shifts = 5 * np.arange(GROUPS_PER_COUNT)
+    groups = (x[:, None] >> shifts) & 0x1F
+    rest = x[:, None] >> (shifts + 5)
+    more = np.where(groups & 0x10, rest != -1, rest != 0)
+    used = np.ones_like(more)
+    used[:, 1:] = np.logical_and.accumulate(more[:, :-1], axis=1)
+    chars = (groups | np.where(more, 0x20, 0)) + 48
+    string = chars[used].astype(np.uint8).tobytes().decode("ascii")
+    ends = np.cumsum(np.bincount(group, used.sum(axis=1), len(lengths))).astype(int)
+    return [string[start:end] for start, end in zip(chain([0], ends), ends)]
+
+
+def encode_counts(counts: Union[Sequence[int], np.ndarray]) -> str:
+    """Compress RLE counts into the string format of COCO.
+
+    Each count, minus the count two positions before it from the fourth one on, is
+    written as a variable length sequence of 5-bit groups offset to printable ASCII.
+
+    Args:
+        counts (Union[Sequence[int], np.ndarray]): Run lengths, alternating zeros and
+            ones, zeros first.
+
+    Returns:
+        str: The compressed counts.
+    """
+    return _encode([np.asarray(counts, dtype=np.int64)])[0]
+
+
+def decode_counts(string: str) -> np.ndarray:
+    """Decompress RLE counts from the string format of COCO.
+
+    Args:
+        string (str): Compressed counts.
+
+    Returns:
+        np.ndarray: Run lengths, alternating zeros and ones, zeros first.
+    """
+    c = np.frombuffer(string.encode("ascii"), dtype=np.uint8).astype(np.int64) - 48
+    if not len(c):
+        return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero((c & 0x20) == 0)
+    _, group = _groups(np.diff(ends, prepend=-1))
+    starts = ends - group[ends]
+    x = np.add.reduceat((c & 0x1F) << (5 * group), starts)
+    # Negative values are sign extended from their last group.
+    negative = (c[ends] & 0x10) != 0
+    x[negative] -= np.int64(1) << (5 * (group[ends[negative]] + 1))
+    counts = x.copy()
+    counts[1::2] = np.cumsum(x[1::2])
+    counts[2::2] = np.cumsum(x[2::2])
+    return counts
+
+
+def _counts(rle: RLE) -> np.ndarray:
+    counts = rle["counts"]
+    if isinstance(counts, bytes):
+        counts = counts.decode("ascii")
+    if isinstance(counts, str):
+        return decode_counts(counts)
+    return np.asarray(counts, dtype=np.int64)
+
+
+def _mask(counts: np.ndarray, height: int, columns: Tuple[int, int]) -> np.ndarray:
+    """Decode the columns [start, end) of a mask from its RLE counts."""
+    start, end = columns[0] * height, columns[1] * height
+    bounds = np.clip(np.concatenate(([0], np.cumsum(counts))), start, end) - start
+    values = np.arange(len(counts)) % 2 == 1
+    return np.repeat(values, np.diff(bounds)).reshape(
+        (height, columns[1] - columns[0]), order="F"
+    )
+
+
+def mask_to_rle(mask: np.ndarray) -> RLE:
+    """Encode a binary mask as a compressed COCO RLE.
+
+    Args:
+        mask (np.ndarray): Mask of shape (height, width).
+
+    Returns:
+        RLE: The mask, run length encoded in column-major order.
+    """
+    height, width = mask.shape
+    flat = np.asarray(mask, dtype=bool).ravel(order="F")
+    changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    counts = np.diff(np.concatenate(([0], changes, [flat.size])))
+    if flat.size and flat[0]:
+        counts = np.concatenate(([0], counts))
+    return {"size": [height, width], "counts": encode_counts(counts)}
+
+
+def rle_to_mask(rle: RLE) -> np.ndarray:
+    """Decode a COCO RLE, compressed or not, into a binary mask.
+
+    Args:
+        rle (RLE): Run length encoded mask.
+
+    Returns:
+        np.ndarray: Boolean mask of shape (height, width).
+    """
+    height, width = rle["size"]
+    return _mask(_counts(rle), height, (0, width))
+
+
+def _rasterize(
+    polygons: Sequence[Sequence[float]], sizes: Sequence[Size]
+) -> List[np.ndarray]:
+    """Rasterize polygons into RLE counts at once, giving the same masks as pycocotools.
+
+    Every step of the pycocotools algorithm is applied to the vertices, edge points and
+    column crossings of all the polygons together, each tagged with its polygon.
+    """
+    n_polygons = len(polygons)
+    if not n_polygons:
+        return []
+    heights, widths = np.array(sizes, dtype=np.int64).reshape(-1, 2).T
+    areas = heights * widths
+    n_vertices = np.array([len(polygon) // 2 for polygon in polygons], dtype=np.int64)
+    xy = np.fromiter(
+        chain.from_iterable(
+            polygon[: 2 * n] for polygon, n in zip(polygons, n_vertices.tolist())
+        ),
+        dtype=np.float64,
+        count=2 * int(n_vertices.sum()),
+    )
+
+    # Vertices on the upsampled grid, each joined to the next one of its polygon.
+    x = np.trunc(POLYGON_SCALE * xy[0::2] + 0.5).astype(np.int64)
+    y = np.trunc(POLYGON_SCALE * xy[1::2] + 0.5).astype(np.int64)
+    first = np.cumsum(n_vertices) - n_vertices
+    following = np.arange(len(x)) + 1
+    following[(first + n_vertices - 1)[n_vertices > 0]] = first[n_vertices > 0]
+    xs, xe, ys, ye = x, x[following], y, y[following]
+    dx, dy = np.abs(xe - xs), np.abs(ys - ye)
+    horizontal = dx >= dy
+    flip = (horizontal & (xs > xe)) | (~horizontal & (ys > ye))
+    xs, xe = np.where(flip, xe, xs), np.where(flip, xs, xe)
+    ys, ye = np.where(flip, ye, ys), np.where(flip, ys, ye)
+    steps = np.where(horizontal, dx, dy)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(horizontal, (ye - ys) / dx, (xe - xs) / dy)
+    slope[steps == 0] = 0
+
+    # Every grid point along the edges.
+    edge, d = _groups(steps + 1)
+    t = np.where(flip[edge], steps[edge] - d, d)
+    horizontal = horizontal[edge]
+    interpolated = np.trunc(
+        np.where(horizontal, ys[edge], xs[edge]) + slope[edge] * t + 0.5
+    ).astype(np.int64)
+    u = np.where(horizontal, t + xs[edge], interpolated)
+    v = np.where(horizontal, interpolated, t + ys[edge])
+    polygon = np.repeat(np.arange(n_polygons), n_vertices)[edge]
+
+    # Points where a boundary crosses a column, downsampled to pixel centers.
+    j = np.flatnonzero((u[1:] != u[:-1]) & (polygon[1:] == polygon[:-1])) + 1
+    polygon = polygon[j]
+    xd = np.where(u[j] < u[j - 1], u[j], u[j] - 1).astype(np.float64)
+    xd = (xd + 0.5) / POLYGON_SCALE - 0.5
+    keep = (np.floor(xd) == xd) & (xd >= 0) & (xd <= widths[polygon] - 1)
+    polygon = polygon[keep]
+    yd = np.minimum(v[j], v[j - 1])[keep].astype(np.float64)
+    yd = np.ceil(np.clip((yd + 0.5) / POLYGON_SCALE - 0.5, 0, heights[polygon]))
+
+    # Every crossing toggles the mask in column-major order, so crossings at the same
+    # pixel cancel out in pairs. The mask ends at a sentinel after its last pixel.
+    stride = int(areas.max()) + 1
+    pixels = xd[keep].astype(np.int64) * heights[polygon] + yd.astype(np.int64)
+    toggles, repeats = np.unique(polygon * stride + pixels, return_counts=True)
+    sentinels = np.arange(n_polygons) * stride + areas
+    keys = np.concatenate((toggles[repeats % 2 == 1], sentinels))
+    is_sentinel = np.concatenate(
+        (np.zeros(len(keys) - n_polygons, dtype=bool), np.ones(n_polygons, dtype=bool))
+    )
+    order = np.lexsort((is_sentinel, keys))
+    keys, is_sentinel = keys[order], is_sentinel[order]
+    polygon, bounds = np.divmod(keys, stride)
+    starts = np.ones(len(keys), dtype=bool)
+    starts[1:] = polygon[1:] != polygon[:-1]
+    counts = np.where(starts, bounds, bounds - np.roll(bounds, 1))
+    keep = ~(is_sentinel & ~starts & (counts == 0))
+    counts, polygon = counts[keep], polygon[keep]
+    return np.split(counts, np.flatnonzero(polygon[1:] != polygon[:-1]) + 1)
+
+
+def _union(counts_list: List[np.ndarray], area: int) -> np.ndarray:
+    """Get the RLE counts of the union of masks of the same size."""
+    if len(counts_list) == 1:
+        return counts_list[0]
+    starts, ends = [], []
+    for counts in counts_list:
+        bounds = np.cumsum(counts)
+        n_runs = len(counts) // 2
+        starts.append(bounds[0 : 2 * n_runs : 2])
+        ends.append(bounds[1 : 2 * n_runs : 2])
+    start, end = np.concatenate(starts), np.concatenate(ends)
+    order = np.argsort(start, kind="stable")
+    start, reach = start[order], np.maximum.accumulate(end[order])
+    # A run starts a new one unless it overlaps or touches the runs before it.
+    first = np.ones(len(start), dtype=bool)
+    first[1:] = start[1:] > reach[:-1]
+    last = np.ones_like(first)
+    last[:-1] = first[1:]
+    bounds = np.stack([start[first], reach[last]], axis=1).ravel()
+    if not len(bounds) or bounds[-1] < area:
+        bounds = np.append(bounds, area)
+    return np.diff(bounds, prepend=0)
+
+
+def polygons_to_rle(polygons: List[List[float]], height: int, width: int) -> RLE:
+    """Rasterize the polygons of a segmentation into a single compressed COCO RLE.
+
+    Args:
+        polygons (List[List[float]]): Polygons as flat [x1, y1, x2, y2, ...] lists.
+        height (int): Height of the image.
+        width (int): Width of the image.
+
+    Returns:
+        RLE: Union of the polygons, run length encoded.
+    """
+    counts_list = _rasterize(polygons, [(height, width)] * len(polygons))
+    if not counts_list:
+        counts_list = [np.array([height * width])]
+    counts = _union(counts_list, height * width)
+    return {"size": [height, width], "counts": encode_counts(counts)}
+
+
+def _trace(
+    masks: List[np.ndarray], offsets: List[Tuple[int, int]]
+) -> List[List[List[float]]]:
+    """Trace the outer boundaries of several masks along the pixel edges at once.
+
+    Every pixel edge between a mask and the background is linked to the next one going
+    clockwise around the mask, and the loops of linked edges are ordered by pointer
+    jumping, so no edge is visited from Python.
+    """
+    # Pixel edges between a mask and the background, going clockwise around the mask:
+    # direction, neighbour, and start and end corners relative to the pixel.
+    sides = (
+        (0, (0, 1), (0, 0), (1, 0)),
+        (1, (1, 2), (1, 0), (1, 1)),
+        (2, (2, 1), (1, 1), (0, 1)),
+        (3, (1, 0), (0, 1), (0, 0)),
+    )
+    parts: List[Tuple[np.ndarray, ...]] = []
+    for mask_index, mask in enumerate(masks):
+        padded = np.pad(mask, 1)
+        height, width = mask.shape
+        inside = padded[1:-1, 1:-1]
+        for side, (row, col), start_corner, end_corner in sides:
+            neighbour = padded[row : row + height, col : col + width]
+            rows, cols = np.nonzero(inside & ~neighbour)
+            parts.append(
+                (
+                    np.full(len(rows), mask_index),
+                    cols + start_corner[0],
+                    rows + start_corner[1],
+                    cols + end_corner[0],
+                    rows + end_corner[1],
+                    np.full(len(rows), side),
+                )
+            )
+    polygons: List[List[List[float]]] = [[] for _ in masks]
+    if not parts:
+        return polygons
+    owner, x, y, end_x, end_y, direction = (np.concatenate(p) for p in zip(*parts))
+    n_edges = len(direction)
+    if not n_edges:
+        return polygons
+
+    # The next edge is the one leaving the end corner turning right if there is one,
+    # which keeps pixels touching only by a corner apart, else straight, else left.
+    stride = max(max(mask.shape) for mask in masks) + 2
+    start_key = ((owner * stride + y) * stride + x) * 4 + direction
+    end_key = ((owner * stride + end_y) * stride + end_x) * 4
+    order = np.argsort(start_key)
+    sorted_keys = start_key[order]
+    following = np.full(n_edges, -1)
+    for turn in (3, 0, 1):
+        candidate = end_key + (direction + turn) % 4
+        pos = np.minimum(np.searchsorted(sorted_keys, candidate), n_edges - 1)
+        found = sorted_keys[pos] == candidate
+        following[found] = order[pos[found]]
+    previous = np.empty_like(following)
+    previous[following] = np.arange(n_edges)
+
+    # Label every loop by its first edge, then rank the edges from it.
+    label, jump = np.arange(n_edges), following
+    while True:
+        new_label = np.minimum(label, label[jump])
+        if np.array_equal(new_label, label):
+            break
+        label, jump = new_label, jump[jump]
+    is_first = label == np.arange(n_edges)
+    rank = (~is_first).astype(np.int64)
+    jump = np.where(is_first, np.arange(n_edges), previous)
+    while not np.array_equal(jump, jump[jump]):
+        rank, jump = rank + rank[jump], jump[jump]
+
+    # Corners in loop order, and the signed area of every loop.
+    corner = direction != direction[previous]
+    order = np.lexsort((rank, label))
+    order = order[corner[order]]
+    loop = label[order]
+    vx = (x + np.array([o[0] for o in offsets])[owner])[order].astype(np.float64)
+    vy = (y + np.array([o[1] for o in offsets])[owner])[order].astype(np.float64)
+    starts = np.flatnonzero(np.diff(loop, prepend=-1))
+    lengths = np.diff(np.append(starts, len(loop)))
+    following_corner = np.arange(len(loop)) + 1
+    following_corner[starts + lengths - 1] = starts
+    cross = vx * vy[following_corner] - vx[following_corner] * vy
+    loop_index = np.repeat(np.arange(len(starts)), lengths)
+    # Outer boundaries go clockwise, holes the other way round.
+    outer = np.bincount(loop_index, cross, len(starts)) > 0
+    vertices = np.stack([vx, vy], axis=1).ravel().tolist()
+    for first, length, owner_of_loop, keep in zip(
+        starts.tolist(), lengths.tolist(), owner[order[starts]].tolist(), outer.tolist()
+    ):
+        if keep:
+            polygons[owner_of_loop].append(vertices[2 * first : 2 * (first + length)])
+    return polygons
+
+
+def rle_to_polygons(rle: RLE) -> List[List[float]]:
+    """Trace the outer boundaries of a COCO RLE mask as polygons.
+
+    The polygons follow the pixel edges, so rasterizing them gives back the mask, except
+    for holes: COCO polygons are merged by union, so holes are filled. Pixels touching
+    only by a corner get separate polygons.
+
+    Args:
+        rle (RLE): Run length encoded mask.
+
+    Returns:
+        List[List[float]]: Polygons as flat [x1, y1, x2, y2, ...] lists.
+    """
+    return _trace([rle_to_mask(rle)], [(0, 0)])[0]
+
+
+def _measure(
+    counts_list: List[np.ndarray], heights: Sequence[int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the areas and [x, y, width, height] bboxes of several masks at once."""
+    n_masks = len(counts_list)
+    lengths = np.array([len(counts) for counts in counts_list], dtype=np.int64)
+    counts = np.concatenate(counts_list).astype(np.int64)
+    mask, position = _groups(lengths)
+    areas = np.bincount(mask, counts * (position % 2), n_masks).astype(np.int64)
+
+    # First and last pixel of every run of ones, from the running sum of every mask.
+    total = np.cumsum(counts)
+    first = np.cumsum(lengths) - lengths
+    before = np.where(first > 0, total[np.maximum(first - 1, 0)], 0)
+    pixels = total - before[mask] - position % 2
+    runs = position < (lengths // 2 * 2)[mask]
+    pixels, mask = pixels[runs], mask[runs]
+    height = np.asarray(heights, dtype=np.int64)[mask]
+    ys, xs = pixels % height, pixels // height
+
+    bboxes = np.zeros((n_masks, 4))
+    if not len(mask):
+        return areas, bboxes
+    starts = np.flatnonzero(np.diff(mask, prepend=-1))
+    measured = mask[starts]
+    x_min, x_max = np.minimum.reduceat(xs, starts), np.maximum.reduceat(xs, starts)
+    y_min, y_max = np.minimum.reduceat(ys, starts), np.maximum.reduceat(ys, starts)
+    # A run going on in the next column covers every row.
+    wraps = np.bincount(mask[1::2], xs[1::2] > xs[0::2], n_masks)[measured] > 0
+    y_min = np.where(wraps, 0, y_min)
+    y_max = np.where(wraps, height[starts] - 1, y_max)
+    bboxes[measured] = np.stack([x_min, y_min, x_max - x_min + 1, y_max - y_min + 1], 1)
+    return areas, bboxes
+
+
+def rle_area(rle: RLE) -> int:
+    """Get the number of pixels of a COCO RLE mask."""
+    return int(_counts(rle)[1::2].sum())
+
+
+def rle_bbox(rle: RLE) -> List[float]:
+    """Get the [x, y, width, height] bounding box of a COCO RLE mask, as pycocotools.
+
+    Args:
+        rle (RLE): Run length encoded mask.
+
+    Returns:
+        List[float]: Bounding box, all zeros for an empty mask.
+    """
+    _, bboxes = _measure([_counts(rle)], [rle["size"][0]])
+    return bboxes[0].tolist()
+
+
+def _process_batch(batch: Batch) -> List[Dict[str, Any]]:
+    annotations, sizes, mode = batch
+    # Masks of the annotations with a segmentation, polygons rasterized all at once.
+    masks: Dict[int, Tuple[np.ndarray, Size]] = {}
+    polygons: List[Sequence[float]] = []
+    owners: List[int] = []
+    owner_sizes: List[Size] = []
+    for i, (annotation, size) in enumerate(zip(annotations, sizes)):
+        segmentation = annotation.get("segmentation")
+        if isinstance(segmentation, dict):
+            height, width = segmentation["size"]
+            masks[i] = (_counts(segmentation), (height, width))
+        elif segmentation and size is not None:
+            polygons.extend(segmentation)
+            owners.extend([i] * len(segmentation))
+            owner_sizes.extend([size] * len(segmentation))
+    rasterized = _rasterize(polygons, owner_sizes)
+    by_owner: Dict[int, Tuple[List[np.ndarray], Size]] = {}
+    for owner, size, counts in zip(owners, owner_sizes, rasterized):
+        by_owner.setdefault(owner, ([], size))[0].append(counts)
+    for owner, (counts_list, (height, width)) in by_owner.items():
+        masks[owner] = (_union(counts_list, height * width), (height, width))
+    if not masks:
+        return annotations
+
+    indices = sorted(masks)
+    counts_list = [masks[i][0] for i in indices]
+    areas, bboxes = _measure(counts_list, [masks[i][1][0] for i in indices])
+    processed = list(annotations)
+    encode, trace, crops, offsets = [], [], [], []
+    for i, counts, area, bbox in zip(indices, counts_list, areas.tolist(), bboxes):
+        annotation = processed[i]
+        segmentation = annotation["segmentation"]
+        height, width = masks[i][1]
+        if mode == "rle" or (mode == "polygon" and annotation.get("iscrowd")):
+            if not isinstance(segmentation, dict) or not isinstance(
+                segmentation["counts"], str
+            ):
+                encode.append(i)
+        elif mode == "polygon" and isinstance(segmentation, dict):
+            x, y, w, h = bbox.astype(int).tolist()
+            trace.append(i)
+            crops.append(_mask(counts, height, (x, x + w))[y : y + h])
+            offsets.append((x, y))
+        processed[i] = dict(
+            annotation, segmentation=segmentation, area=float(area), bbox=bbox.tolist()
+        )
+    for i, string in zip(encode, _encode([masks[i][0] for i in encode])):
+        processed[i]["segmentation"] = {"size": list(masks[i][1]), "counts": string}
+    for i, traced in zip(trace, _trace(crops, offsets)):
+        processed[i]["segmentation"] = traced
+    return processed
+
+
+def process_annotation(
+    annotation: Dict[str, Any], size: Optional[Size], mode: str
+) -> Dict[str, Any]:
+    """Convert the segmentation of an annotation and recompute its area and bbox.
+
+    Crowd annotations stay run length encoded. Annotations without segmentation, and
+    polygons of images of unknown size, are returned as they are.
+
+    Args:
+        annotation (Dict[str, Any]): Annotation to process, which is not modified.
+        size (Optional[Size]): Height and width of the image of the annotation.
+        mode (str): "rle" to encode polygons as compressed RLE, "polygon" to trace
+            RLE masks as polygons or "geometry" to keep the segmentation as it is.
+
+    Returns:
+        Dict[str, Any]: The annotation with the converted segmentation, and the area
+            and bbox of its mask.
+    """
+    return _process_batch(([annotation], [size], mode))[0]
+
+
+def process_annotations(
+    annotations: Iterable[Dict[str, Any]],
+    sizes: Dict[int, Size],
+    mode: str = "rle",
+    workers: int = 1,
+) -> Iterator[Dict[str, Any]]:
+    """Process the segmentations of annotations in batches, in a process pool.
+
+    The polygons, areas, bboxes and RLE strings of a batch are computed together with
+    vectorized NumPy operations.
+
+    Args:
+        annotations (Iterable[Dict[str, Any]]): Annotations to process, consumed lazily.
+        sizes (Dict[int, Size]): Height and width of the images, by image id.
+        mode (str, optional): "rle", "polygon" or "geometry", see
+            ``process_annotation``. Defaults to "rle".
+        workers (int, optional): Number of processes, 0 for one per CPU. Defaults to 1.
+
+    Yields:
+        Dict[str, Any]: The processed annotations, in input order.
+    """
+    if mode not in SEGMENTATION_MODES:
+        raise ValueError(
+            f'Unknown segmentation mode "{mode}", expected one of {SEGMENTATION_MODES}'
+        )
+
+    def batches() -> Iterator[Batch]:
+        batch: List[Dict[str, Any]] = []
+        for annotation in annotations:
+            batch.append(annotation)
+            if len(batch) == BATCH_SIZE:
+                yield batch, [sizes.get(ann["image_id"]) for ann in batch], mode
+                batch = []
+        if batch:
+            yield batch, [sizes.get(ann["image_id"]) for ann in batch], mode
+
+    for processed in ordered_map(_process_batch, batches(), workers=workers):
+        yield from processed
+
+
+def process_segmentations(
+    dataset: COCODataset, mode: str = "rle", workers: int = 1
+) -> COCODataset:
+    """Convert the segmentations of a dataset and recompute the area and bbox from them.
+
+    In streaming mode the annotations are read from disk and the processed ones are
+    held in memory.
+
+    Args:
+        dataset (COCODataset): Dataset to process, which is not modified.
+        mode (str, optional): "rle" to encode polygons as compressed RLE, "polygon" to
+            trace RLE masks as polygons or "geometry" to only recompute the area and
+            bbox. Defaults to "rle".
+        workers (int, optional): Number of processes, 0 for one per CPU. Defaults to 1.
+
+    Returns:
+        COCODataset: Dataset with the processed annotations.
+    """
+    sizes = {
+        img["id"]: (img["height"], img["width"])
+        for img in dataset.images
+        if img.get("height") and img.get("width")
+    }
+    with stage("segmentation") as profile:
+        annotations = list(
+            process_annotations(dataset.iter_annotations(), sizes, mode, workers)
+        )
+        profile.records = len(annotations)
+    data = {k: v for k, v in dataset.to_dict().items() if k != "annotations"}
+    data["annotations"] = annotations
+    return COCODataset(data)
@@ -0,0 +1,106 @@
+from typing import Dict, List
+
+import numpy as np
+
+from cocosuite.core.dataset import COCODataset
+from cocosuite.core.profiling import stage
+
+
+def _first_seen_counts(keys: np.ndarray) -> tuple:
+    """Count the distinct keys, ordered by their first appearance."""
+    unique, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    order = np.argsort(first, kind="stable")
+    return unique[order], counts[order]
+
+
+class DatasetStatistics:
+    """Distributions of a dataset computed in a single vectorized pass over its columns.
+
+    Annotations referencing an unknown image or category are left out of the
+    distributions that need them, as are images without a size and boxes without a
+    width or height.
+
+    Attributes:
+        n_annotations (int): Number of annotations.
+        category_names (List[str]): Category names, in dataset order.
+        category_counts (np.ndarray): Number of annotations of each category.
+        image_names (List[str]): File name of each image, in dataset order.
+        annotations_per_image (np.ndarray): Number of annotations of each image.
+        image_sizes (List[str]): Distinct "<width>x<height>" image sizes, in order of
+            first appearance.
+        image_size_counts (np.ndarray): Number of images of each size.
+        ann_image_width, ann_image_height (np.ndarray): Size of the image of each
+            annotation with a known category and a known image with a size.
+        ann_image_category (np.ndarray): Category position of those annotations.
+        bbox_width, bbox_height (np.ndarray): Size of each box with a known category.
+        bbox_category (np.ndarray): Category position of those boxes.
+
+    Args:
+        dataset (COCODataset): Dataset to describe.
+    """
+
+    def __init__(self, dataset: COCODataset) -> None:
+        columns = dataset.columns
+        self.n_annotations = len(columns)
+        self.category_names: List[str] = columns.cat_names
+        self.image_names: List[str] = [
+            img.get("file_name", "") for img in dataset.images
+        ]
+
+        cat_index = columns.ann_category_index
+        img_index = columns.ann_image_index
+        self.category_counts = np.bincount(
+            cat_index[cat_index >= 0], minlength=columns.n_categories
+        )
+        self.annotations_per_image = np.bincount(
+            img_index[img_index >= 0], minlength=columns.n_images
+        )
+
+        has_size = (columns.img_width >= 0) & (columns.img_height >= 0)
+        sizes, self.image_size_counts = _first_seen_counts(
+            (columns.img_width[has_size] << 32) | columns.img_height[has_size]
+        )
+        self.image_sizes = [f"{s >> 32}x{s & 0xFFFFFFFF}" for s in sizes.tolist()]
+
+        known = (img_index >= 0) & (cat_index >= 0)
+        known[known] = has_size[img_index[known]]
+        self.ann_image_width = columns.img_width[img_index[known]]
+        self.ann_image_height = columns.img_height[img_index[known]]
+        self.ann_image_category = cat_index[known]
+
+        bbox = columns.ann_bbox
+        has_bbox = (cat_index >= 0) & ~np.isnan(bbox[:, 2]) & ~np.isnan(bbox[:, 3])
+        self.bbox_width = bbox[has_bbox, 2]
+        self.bbox_height = bbox[has_bbox, 3]
+        self.bbox_category = cat_index[has_bbox]
+
+    @classmethod
+    def from_file(cls, annotations_file: str) -> "DatasetStatistics":
+        """Compute the statistics of a COCO formatted json file.
+
+        Args:
+            annotations_file (str): JSON file containing COCO formatted data.
+
+        Returns:
+            DatasetStatistics: The statistics of the file.
+        """
+        dataset = COCODataset.from_file(annotations_file)
+        with stage("statistics") as profile:
+            stats = cls(dataset)
+            profile.records = stats.n_annotations
+        return stats
+
+    def category_distribution(self) -> Dict[str, int]:
+        """Number of annotations of each category, by name."""
+        counts: Dict[str, int] = {}
+        for name, count in zip(self.category_names, self.category_counts.tolist()):
+            counts[name] = counts.get(name, 0) + count
+        return counts
+
+    def image_size_distribution(self) -> Dict[str, int]:
+        """Number of images of each "<width>x<height>" size."""
+        return dict(zip(self.image_sizes, self.image_size_counts.tolist()))
+
+    def annotations_per_image_distribution(self) -> Dict[str, int]:
+        """Number of annotations of each image, by file name."""
+        return dict(zip(self.image_names, self.annotations_per_image.tolist()))
@@ -0,0 +1,176 @@
+from typing import Any, Dict, Iterator, List
+
+import fire
+import numpy as np
+from loguru import logger
+
+from cocosuite.core.writer import write_coco
+
+IMAGE_SIZES = [(640, 480), (800, 600), (1024, 768), (1280, 720), (1920, 1080)]
+CHUNK_SIZE = 10_000
+
+
+def _ids(rng: np.random.Generator, n: int, id_sparsity: float) -> np.ndarray:
+    """Get ``n`` sorted ids, a fraction ``id_sparsity`` of the id range left unused."""
+    if id_sparsity <= 0:
+        return np.arange(1, n + 1, dtype=np.int64)
+    span = int(np.ceil(n / (1 - id_sparsity)))
+    return np.sort(rng.choice(span, n, replace=False)) + 1
+
+
+def _annotations(
+    columns: Dict[str, np.ndarray], segmentation_points: int
+) -> Iterator[Dict[str, Any]]:
+    angles = np.linspace(0, 2 * np.pi, segmentation_points, endpoint=False)
+    for start in range(0, len(columns["id"]), CHUNK_SIZE):
+        chunk = {k: v[start : start + CHUNK_SIZE] for k, v in columns.items()}
+        x, y, w, h = chunk["x"], chunk["y"], chunk["w"], chunk["h"]
+        bboxes = np.round(np.stack([x, y, w, h], 1), 2).tolist()
+        areas = np.round(w * h, 2).tolist()
+        if segmentation_points:
+            # Polygons are ellipses inscribed in the boxes.
+            px = (x + w / 2)[:, None] + (w / 2)[:, None] * np.cos(angles)
+            py = (y + h / 2)[:, None] + (h / 2)[:, None] * np.sin(angles)
+            polygons = np.round(np.stack([px, py], 2).reshape(len(x), -1), 2).tolist()
+        for i, (ann_id, image_id, category_id) in enumerate(
+            zip(
+                chunk["id"].tolist(),
+                chunk["image_id"].tolist(),
+                chunk["category_id"].tolist(),
+            )
+        ):
+            ann = {
+                "id": ann_id,
+                "image_id": image_id,
+                "category_id": category_id,
+                "bbox": bboxes[i],
+                "area": areas[i],
+                "iscrowd": 0,
+            }
+            if segmentation_points:
+                ann["segmentation"] = [polygons[i]]
+            yield ann
+
+
+def generate_coco(
+    n_images: int = 1000,
+    annotations_per_image: float = 5.0,
+    n_categories: int = 80,
+    id_sparsity: float = 0.0,
+    segmentation_points: int = 0,
+    seed: int = 47,
+) -> Dict[str, Any]:
+    """Generate a deterministic synthetic COCO dataset.
+
+    The number of annotations per image follows a Poisson distribution and categories
+    a Zipf-like one, so splits and statistics see unbalanced data. The annotations are
+    a generator built in chunks, so a dataset can be written without holding its
+    annotation dicts in memory.
+
+    Args:
+        n_images (int, optional): Number of images. Defaults to 1000.
+        annotations_per_image (float, optional): Mean number of annotations per image.
+            Defaults to 5.0.
+        n_categories (int, optional): Number of categories. Defaults to 80.
+        id_sparsity (float, optional): Fraction of unused ids in the id ranges of
+            images, annotations and categories, from 0 (contiguous) to below 1.
+            Defaults to 0.0.
+        segmentation_points (int, optional): Number of points of the polygon of each
+            annotation, 0 for no segmentation. Defaults to 0.
+        seed (int, optional): Random seed. Defaults to 47.
+
+    Returns:
+        Dict[str, Any]: COCO formatted data whose "annotations" is an iterator.
+    """
+    rng = np.random.default_rng(seed)
+
+    cat_ids = _ids(rng, n_categories, id_sparsity)
+    categories: List[Dict[str, Any]] = [
+        {"id": cat_id, "name": f"category_{i}", "supercategory": f"group_{i % 10}"}
+        for i, cat_id in enumerate(cat_ids.tolist())
+    ]
+
+    img_ids = _ids(rng, n_images, id_sparsity)
+    sizes = np.array(IMAGE_SIZES)[rng.integers(len(IMAGE_SIZES), size=n_images)]
+    images: List[Dict[str, Any]] = [
+        {
+            "id": img_id,
+            "file_name": f"batch_{img_id % 10}/{img_id:012d}.jpg",
+            "width": width,
+            "height": height,
+        }
+        for img_id, (width, height) in zip(img_ids.tolist(), sizes.tolist())
+    ]
+
+    counts = rng.poisson(annotations_per_image, n_images)
+    n_annotations = int(counts.sum())
+    image_pos = np.repeat(np.arange(n_images), counts)
+    weights = 1 / np.arange(1, n_categories + 1)
+    width = sizes[image_pos, 0].astype(np.float64)
+    height = sizes[image_pos, 1].astype(np.float64)
+    w = np.minimum(width, rng.lognormal(4, 0.8, n_annotations))
+    h = np.minimum(height, rng.lognormal(4, 0.8, n_annotations))
+    columns = {
+        "id": _ids(rng, n_annotations, id_sparsity),
+        "image_id": img_ids[image_pos],
+        "category_id": cat_ids[
+            rng.choice(n_categories, n_annotations, p=weights / weights.sum())
+        ],
+        "x": rng.random(n_annotations) * (width - w),
+        "y": rng.random(n_annotations) * (height - h),
+        "w": w,
+        "h": h,
+    }
+
+    return {
+        "info": {"description": "Synthetic COCO dataset", "version": "1.0"},
+        "licenses": [],
+        "images": images,
+        "annotations": _annotations(columns, segmentation_points),
+        "categories": categories,
+    }
+
+
+def write_synthetic(
+    output_file: str,
+    n_images: int = 1000,
+    annotations_per_image: float = 5.0,
+    n_categories: int = 80,
+    id_sparsity: float = 0.0,
+    segmentation_points: int = 0,
+    seed: int = 47,
+    compact: bool = False,
+) -> str:
+    """Write a deterministic synthetic COCO dataset into a json file.
+
+    Args:
+        output_file (str): Path of the output json file.
+        n_images (int, optional): Number of images. Defaults to 1000.
+        annotations_per_image (float, optional): Mean number of annotations per image.
+            Defaults to 5.0.
+        n_categories (int, optional): Number of categories. Defaults to 80.
+        id_sparsity (float, optional): Fraction of unused ids in the id ranges.
+            Defaults to 0.0.
+        segmentation_points (int, optional): Number of points of the polygon of each
+            annotation, 0 for no segmentation. Defaults to 0.
+        seed (int, optional): Random seed. Defaults to 47.
+        compact (bool, optional): Write the output without indentation. Defaults to False.
+
+    Returns:
+        str: Path of the output file.
+    """
+    data = generate_coco(
+        n_images,
+        annotations_per_image,
+        n_categories,
+        id_sparsity,
+        segmentation_points,
+        seed,
+    )
+    write_coco(output_file, data, compact=compact)
+    logger.info(f"Synthetic dataset saved into {output_file}")
+    return output_file
+
+
+if __name__ == "__main__":
+    fire.Fire(write_synthetic)
@@ -0,0 +1,283 @@
+import json
+from pathlib import Path
+from types import TracebackType
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    TextIO,
+    Tuple,
+    Type,
+)
+
+from cocosuite.core.parallel import ordered_map
+from cocosuite.core.profiling import stage
+
+DEFAULT_CHUNK_SIZE = 1000
+COPY_CHUNK_SIZE = 1 << 20
+
+Span = Tuple[int, int]
+
+
+def resolve_output_path(output_filename: str, annotations_file: str) -> Path:
+    """Get the path of an output file.
+
+    If ``output_filename`` is only a name, the file is placed next to the input file.
+
+    Args:
+        output_filename (str): Name or path of the output file.
+        annotations_file (str): Input file the output is derived from.
+
+    Returns:
+        Path: Path of the output file.
+    """
+    if len(output_filename.rsplit("/", 1)) >= 2:
+        return Path(output_filename)
+    return Path(Path(annotations_file).parent, output_filename)
+
+
+class COCOWriter:
+    """Write a COCO formatted json file incrementally.
+
+    Records are encoded one by one and written in chunks of ``chunk_size`` records, so
+    the whole tree is never materialised as a single string. The indented output is
+    byte-identical to ``json.dump(data, f, indent=2, ensure_ascii=False)``; the compact
+    output has no indentation nor whitespace after separators.
+
+    The byte span of every top-level value is kept in ``spans``, so values and records
+    of a file can later be copied as they are into another one written with the same
+    settings, without decoding them.
+
+    Args:
+        output_file (str): Path of the output json file.
+        compact (bool, optional): Write without indentation. Defaults to False.
+        chunk_size (int, optional): Number of records buffered before each write.
+            Defaults to 1000.
+    """
+
+    def __init__(
+        self,
+        output_file: str,
+        compact: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        self.output_file = output_file
+        self.compact = compact
+        self.chunk_size = chunk_size
+        if compact:
+            self.encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+        else:
+            self.encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+        self._f: Optional[TextIO] = None
+        self._n_keys = 0
+        self._n_records = 0
+        self._buffer: List[str] = []
+        self.records_written = 0
+        self.spans: Dict[str, Span] = {}
+
+    def __enter__(self) -> "COCOWriter":
+        self.open()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def _encode(self, value: Any, level: int) -> str:
+        text = self.encoder.encode(value)
+        if self.compact:
+            return text
+        return text.replace("\n", "\n" + "  " * level)
+
+    def _newline(self, level: int) -> str:
+        return "" if self.compact else "\n" + "  " * level
+
+    def _flush(self) -> None:
+        if self._buffer and self._f is not None:
+            self._f.write("".join(self._buffer))
+            self._buffer = []
+
+    def _write(self, text: str) -> None:
+        self._buffer.append(text)
+        if len(self._buffer) >= self.chunk_size:
+            self._flush()
+
+    def _write_key(self, key: str) -> None:
+        separator = ":" if self.compact else ": "
+        prefix = "," if self._n_keys else ""
+        self._write(prefix + self._newline(1) + json.dumps(key) + separator)
+        self._n_keys += 1
+
+    def open(self) -> None:
+        """Open the output file and start the top-level object."""
+        self._f = open(self.output_file, "w", encoding="utf-8")
+        self._write("{")
+
+    def close(self) -> None:
+        """End the top-level object and close the output file."""
+        if self._f is None:
+            return
+        self._write((self._newline(0) if self._n_keys else "") + "}")
+        self._flush()
+        self._f.close()
+        self._f = None
+
+    def tell(self) -> int:
+        """Get the number of bytes written so far, flushing the buffered output."""
+        assert self._f is not None, "The writer is not open"
+        self._flush()
+        self._f.flush()
+        return self._f.buffer.tell()
+
+    def _copy(self, source: BinaryIO, start: int, end: int) -> None:
+        assert self._f is not None, "The writer is not open"
+        self._flush()
+        self._f.flush()
+        source.seek(start)
+        while start < end:
+            chunk = source.read(min(COPY_CHUNK_SIZE, end - start))
+            if not chunk:
+                raise EOFError(f"Unexpected end of file at byte {start}")
+            self._f.buffer.write(chunk)
+            start += len(chunk)
+
+    def write(self, key: str, value: Any) -> None:
+        """Write a top-level key, record by record if its value is a list or iterator."""
+        if isinstance(value, (list, tuple, Iterator)):
+            self.write_records(key, value)
+        else:
+            self.write_value(key, value)
+
+    def write_value(self, key: str, value: Any) -> None:
+        """Write a top-level key with its value encoded at once."""
+        self._write_key(key)
+        start = self.tell()
+        self._write(self._encode(value, 1))
+        self.spans[key] = (start, self.tell())
+
+    def copy_value(self, key: str, source: BinaryIO, span: Span) -> None:
+        """Write a top-level key with its value copied from another output file.
+
+        Args:
+            key (str): Top-level key.
+            source (BinaryIO): File written with the same settings.
+            span (Span): Byte span of the value in ``source``, from its ``spans``.
+        """
+        self._write_key(key)
+        start = self.tell()
+        self._copy(source, *span)
+        self.spans[key] = (start, self.tell())
+
+    def begin_array(self, key: str) -> None:
+        """Start a top-level key whose value is an array written record by record."""
+        self._write_key(key)
+        self.spans[key] = (self.tell(), -1)
+        self._write("[")
+        self._n_records = 0
+
+    def write_record(self, record: Any) -> None:
+        """Append a record to the array started with ``begin_array``."""
+        prefix = "," if self._n_records else ""
+        self._write(prefix + self._newline(2) + self._encode(record, 2))
+        self._n_records += 1
+        self.records_written += 1
+
+    def copy_records(self, source: BinaryIO, span: Span, n_records: int) -> None:
+        """Append records copied from an array of another output file.
+
+        Args:
+            source (BinaryIO): File written with the same settings.
+            span (Span): Byte span of the records in ``source``, as given by ``tell``
+                before and after writing them.
+            n_records (int): Number of records in the span.
+        """
+        if not n_records:
+            return
+        start, end = span
+        source.seek(start)
+        # The first record of an array is not preceded by a comma, the others are.
+        if source.read(1) == b",":
+            start += 1
+        if self._n_records:
+            self._write(",")
+        self._copy(source, start, end)
+        self._n_records += n_records
+        self.records_written += n_records
+
+    def end_array(self) -> None:
+        """End the array started with ``begin_array``."""
+        self._write((self._newline(1) if self._n_records else "") + "]")
+        key = next(reversed(self.spans))
+        self.spans[key] = (self.spans[key][0], self.tell())
+
+    def write_records(self, key: str, records: Iterable[Any]) -> None:
+        """Write a top-level key whose value is an array, consuming ``records`` lazily."""
+        self.begin_array(key)
+        for record in records:
+            self.write_record(record)
+        self.end_array()
+
+
+def write_coco(
+    output_file: str,
+    data: Mapping[str, Any],
+    compact: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> None:
+    """Write COCO formatted data into a json file incrementally.
+
+    Lists and iterators (e.g. generators of annotations) are written record by record.
+
+    Args:
+        output_file (str): Path of the output json file.
+        data (Mapping[str, Any]): COCO formatted data.
+        compact (bool, optional): Write without indentation. Defaults to False.
+        chunk_size (int, optional): Number of records buffered before each write.
+            Defaults to 1000.
+    """
+    with (
+        stage("write") as profile,
+        COCOWriter(output_file, compact=compact, chunk_size=chunk_size) as writer,
+    ):
+        for key, value in data.items():
+            writer.write(key, value)
+        profile.records = writer.records_written
+
+
+def _write_coco_file(job: Tuple[str, Mapping[str, Any], bool]) -> str:
+    output_file, data, compact = job
+    write_coco(output_file, data, compact=compact)
+    return output_file
+
+
+def write_coco_files(
+    outputs: Iterable[Tuple[str, Mapping[str, Any]]],
+    compact: bool = False,
+    workers: int = 1,
+) -> Iterator[str]:
+    """Write several COCO formatted json files in a process pool.
+
+    The data of every file is sent to a worker process, which encodes and writes it,
+    so the files are written in parallel. The outputs are consumed lazily, keeping only
+    a few of them in flight.
+
+    Args:
+        outputs (Iterable[Tuple[str, Mapping[str, Any]]]): Path and COCO formatted data
+            of every output json file.
+        compact (bool, optional): Write without indentation. Defaults to False.
+        workers (int, optional): Number of processes, 0 for one per CPU. Defaults to 1.
+
+    Yields:
+        str: The path of each file written, in input order.
+    """
+    jobs = ((output_file, data, compact) for output_file, data in outputs)
+    yield from ordered_map(_write_coco_file, jobs, workers)
@@ -1,14 +1,63 @@
 import json
-from pathlib import Path
+from typing import Any, Dict, List, Optional
 
 import fire
 from loguru import logger
 
+from cocosuite.core.criteria import compile_criteria
+from cocosuite.core.dataset import COCODataset
+from cocosuite.core.profiling import stage
+from cocosuite.core.writer import resolve_output_path
+
+
+def filter_images(
+    dataset: COCODataset, filters: Dict[str, Any], match_all: bool = False
+) -> List[Dict[str, Any]]:
+    """Get the images of the dataset that do not match the filter criteria.
+
+    Args:
+        dataset (COCODataset): Dataset to filter.
+        filters (Dict[str, Any]): Criteria of the images to remove.
+        match_all (bool, optional): Remove only the images matching every criterion
+            instead of any of them. Defaults to False.
+
+    Returns:
+        List[Dict[str, Any]]: The images kept.
+    """
+    with stage("filter") as profile:
+        matches = compile_criteria(filters, match_all).evaluate(dataset.images)
+        filtered_images = [
+            image for image, match in zip(dataset.images, matches) if not match
+        ]
+        profile.records = len(dataset.images)
+    return filtered_images
+
+
+def filter_dataset(
+    dataset: COCODataset, filters: Dict[str, Any], match_all: bool = False
+) -> COCODataset:
+    """Filter a dataset in memory, keeping the annotations of the images left.
+
+    Args:
+        dataset (COCODataset): Dataset to filter.
+        filters (Dict[str, Any]): Criteria of the images to remove.
+        match_all (bool, optional): Remove only the images matching every criterion
+            instead of any of them. Defaults to False.
+
+    Returns:
+        COCODataset: The filtered dataset.
+    """
+    return dataset.subset(filter_images(dataset, filters, match_all))
+
 
 def filter_annotations(
     annotations_file: str,
     filter_config_file: str,
     output_filename: str = "filtered_annotations.json",
+    streaming: bool = False,
+    compact: bool = False,
+    segmentation: Optional[str] = None,
+    workers: int = 1,
 ):
     """Filter the input json file based on the filter criteria.
 
@@ -17,9 +66,16 @@ def filter_annotations(
         filter_config_file (str): JSON file containing the criteria for filtering the data.
         output_filename (Optional[str], optional): Name of the output json file. Defaults to "filtered_annotations.json".
         output_path (Optional[str], optional): Path to save the output file. Defaults to None.
+        streaming (bool, optional): Stream the annotations from disk instead of loading them,
+            keeping them in file order. Defaults to False.
+        compact (bool, optional): Write the output without indentation. Defaults to False.
+        segmentation (Optional[str], optional): Convert the segmentations of the output,
+            "rle", "polygon" or "geometry", recomputing their area and bbox.
+            Defaults to None.
+        workers (int, optional): Number of processes converting segmentations, 0 for one
+            per CPU. Defaults to 1.
     """
-    with open(annotations_file, "r") as f:
-        coco_data = json.load(f)
+    dataset = COCODataset.from_file(annotations_file, streaming=streaming)
 
     with open(filter_config_file, "r") as f:
         filter_config = json.load(f)
@@ -27,47 +83,19 @@ def filter_annotations(
     match_all = filter_config.get("match_all", False)
 
     logger.info(f"Filtering data based on the criteria: {filters}")
-    filtered_images = []
-    filtered_annotations = []
-
-    for image in coco_data["images"]:
-        if match_all:
-            match = all(
-                key in image and any(str(value) in str(image[key]) for value in values)
-                for key, values in filters.items()
-            )
-        else:
-            match = any(
-                key in image and any(str(value) in str(image[key]) for value in values)
-                for key, values in filters.items()
-            )
-
-        if not match:
-            filtered_images.append(image)
-            filtered_annotations.extend(
-                [
-                    ann
-                    for ann in coco_data["annotations"]
-                    if ann["image_id"] == image["id"]
-                ]
-            )
-
-    filtered_data = {
-        "info": coco_data.get("info", {}),
-        "licenses": coco_data.get("licenses", []),
-        "images": filtered_images,
-        "annotations": filtered_annotations,
-        "categories": coco_data["categories"],
-    }
-
-    if len(output_filename.rsplit("/", 1)) >= 2:
-        file_path = Path(output_filename).parent
+    filtered_images = filter_images(dataset, filters, match_all)
+
+    output_file = resolve_output_path(output_filename, annotations_file)
+    if segmentation is None:
+        dataset.write_partition([filtered_images], [str(output_file)], compact=compact)
     else:
-        file_path = Path(annotations_file).parent
+        # Imported here, only converting segmentations needs it.
+        from cocosuite.core.segmentation import process_segmentations
 
-    output_file = Path(file_path, output_filename)
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(filtered_data, f, indent=2, ensure_ascii=False)
+        filtered = dataset.subset(filtered_images)
+        process_segmentations(filtered, segmentation, workers).write(
+            str(output_file), compact=compact
+        )
     logger.info(f"Saved filtered data into {output_filename}")
 
 
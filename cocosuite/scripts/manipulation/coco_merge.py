@@ -1,90 +1,279 @@
-import json
+from itertools import repeat
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
 
 import fire
 from loguru import logger
 
+from cocosuite.core.categories import CategoryRegistry
+from cocosuite.core.dataset import COCODataset
+from cocosuite.core.duplicates import DEDUP_POLICIES, DuplicateIndex
+from cocosuite.core.profiling import stage
+from cocosuite.core.writer import resolve_output_path
+
+
+class COCOMerger:
+    """Merge any number of COCO datasets in a single pass.
+
+    Datasets are appended one after another: image and annotation ids are reassigned
+    sequentially and categories are reconciled through a CategoryRegistry, new ones
+    getting the next free id. The info, licenses and any other top-level keys are taken
+    from the first dataset. Input records are copied, never modified.
+
+    With a dedup policy, images already merged are found through a DuplicateIndex and
+    not added again. Their annotations are dropped with "keep_first" or moved to the
+    image merged first with "union".
+
+    Args:
+        match_supercategory (bool, optional): Match categories by name and supercategory
+            instead of only by name. Defaults to False.
+        dedup (Optional[str], optional): Policy for duplicate images, "keep_first" or
+            "union". Defaults to None, which keeps every image.
+        dedup_by (str, optional): Find duplicates by "path" (normalized relative path
+            and size), "name" (base name and size) or "content" (hash of the image
+            file). Defaults to "path".
+    """
+
+    def __init__(
+        self,
+        match_supercategory: bool = False,
+        dedup: Optional[str] = None,
+        dedup_by: str = "path",
+    ) -> None:
+        if dedup is not None and dedup not in DEDUP_POLICIES:
+            raise ValueError(
+                f'Unknown dedup policy "{dedup}", expected one of {DEDUP_POLICIES}'
+            )
+        self.output: Optional[Dict[str, Any]] = None
+        self.categories = CategoryRegistry(match_supercategory=match_supercategory)
+        self.dedup = dedup
+        self.duplicates = DuplicateIndex(dedup_by) if dedup else None
+        self.n_duplicates = 0
+        self.n_inputs = 0
+        self.next_image_id = 0
+        self.next_annotation_id = 0
+        self._keep_category_ids = True
+
+    def resume(
+        self,
+        categories: List[Dict[str, Any]],
+        next_image_id: int,
+        next_annotation_id: int,
+    ) -> None:
+        """Continue a previous merge instead of starting a new one.
+
+        Args:
+            categories (List[Dict[str, Any]]): Categories of the previous merge result.
+            next_image_id (int): First image id given to the records remapped next.
+            next_annotation_id (int): First annotation id given to the records remapped
+                next.
+        """
+        self.categories.remap(categories, keep_ids=True)
+        self.next_image_id = next_image_id
+        self.next_annotation_id = next_annotation_id
+        self._keep_category_ids = False
+
+    def _duplicate_keys(
+        self, dataset: COCODataset, image_dir: Optional[str], prefix: str
+    ) -> Iterable[Optional[Hashable]]:
+        if self.duplicates is None:
+            return repeat(None)
+        if image_dir is None and dataset.source is not None:
+            image_dir = str(Path(dataset.source).parent)
+        with stage("dedup") as profile:
+            keys = self.duplicates.keys(dataset.images, image_dir, prefix)
+            profile.records = len(keys)
+        return keys
+
+    def remap(
+        self, dataset: COCODataset, image_dir: Optional[str] = None, prefix: str = ""
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[int, int]]:
+        """Copy the images and annotations of a dataset with their ids in the result.
+
+        Args:
+            dataset (COCODataset): Dataset to remap.
+            image_dir (Optional[str], optional): Directory the image file names are
+                relative to, for duplicates found by content. Defaults to the directory
+                of the dataset file.
+            prefix (str, optional): Prefix added to the image file names, left out of
+                the keys duplicates are found by. Defaults to "".
+
+        Returns:
+            Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[int, int]]: Images
+                and annotations of the dataset with the merged ids, and the mapping from
+                its category ids to the merged ones.
+        """
+        cat_id_map = self.categories.remap(
+            dataset.categories, keep_ids=self._keep_category_ids
+        )
+        self._keep_category_ids = False
+
+        img_id_map: Dict[int, Optional[int]] = {}
+        images = []
+        keys = self._duplicate_keys(dataset, image_dir, prefix)
+        for image, key in zip(dataset.images, keys):
+            if self.duplicates is not None:
+                seen = self.duplicates.find_or_add(key, self.next_image_id)
+                if seen is not None:
+                    self.n_duplicates += 1
+                    img_id_map[image["id"]] = seen if self.dedup == "union" else None
+                    continue
+            img_id_map[image["id"]] = self.next_image_id
+            images.append(dict(image, id=self.next_image_id))
+            self.next_image_id += 1
+
+        annotations = []
+        for annotation in dataset.annotations:
+            image_id = img_id_map[annotation["image_id"]]
+            if image_id is None:
+                continue
+            annotations.append(
+                dict(
+                    annotation,
+                    id=self.next_annotation_id,
+                    image_id=image_id,
+                    category_id=cat_id_map[annotation["category_id"]],
+                )
+            )
+            self.next_annotation_id += 1
+        return images, annotations, cat_id_map
+
+    def add(
+        self, dataset: COCODataset, image_dir: Optional[str] = None, prefix: str = ""
+    ) -> None:
+        """Append a dataset to the merge result.
+
+        Args:
+            dataset (COCODataset): Dataset to append.
+            image_dir (Optional[str], optional): Directory the image file names are
+                relative to, for duplicates found by content. Defaults to the directory
+                of the dataset file.
+            prefix (str, optional): Prefix added to the image file names, left out of
+                the keys duplicates are found by. Defaults to "".
+        """
+        self.n_inputs += 1
+        logger.info(
+            "Input {}: {} images, {} annotations".format(
+                self.n_inputs, len(dataset.images), len(dataset.annotations)
+            )
+        )
+        with stage("merge") as profile:
+            self._append(dataset, image_dir, prefix)
+            profile.records = len(dataset.images) + len(dataset.annotations)
+
+    def _append(
+        self, dataset: COCODataset, image_dir: Optional[str], prefix: str
+    ) -> None:
+        if self.output is None:
+            self.output = {
+                k: v
+                for k, v in dataset.to_dict().items()
+                if k not in ("images", "annotations")
+            }
+            self.output["categories"] = self.categories.categories
+            self.output["images"], self.output["annotations"] = [], []
+        images, annotations, _ = self.remap(dataset, image_dir, prefix)
+        self.output["images"].extend(images)
+        self.output["annotations"].extend(annotations)
+
+    def result(self) -> Dict[str, Any]:
+        """Get the merged COCO formatted data."""
+        if self.output is None:
+            return {"images": [], "annotations": [], "categories": []}
+        logger.info(
+            "Result: {} images, {} annotations".format(
+                len(self.output["images"]), len(self.output["annotations"])
+            )
+        )
+        if self.duplicates is not None:
+            logger.info(f"Duplicate images: {self.n_duplicates}, policy {self.dedup}")
+        return self.output
+
+
+def merge_datasets(
+    datasets: Iterable[COCODataset],
+    match_supercategory: bool = False,
+    dedup: Optional[str] = None,
+    dedup_by: str = "path",
+) -> COCODataset:
+    """Merge COCO datasets in memory, in the order they are given.
+
+    Args:
+        datasets (Iterable[COCODataset]): Datasets to merge.
+        match_supercategory (bool, optional): Match categories by name and supercategory
+            instead of only by name. Defaults to False.
+        dedup (Optional[str], optional): Policy for duplicate images, "keep_first" or
+            "union". Defaults to None.
+        dedup_by (str, optional): Find duplicates by "path", "name" or "content".
+            Defaults to "path".
+
+    Returns:
+        COCODataset: The merged dataset.
+    """
+    merger = COCOMerger(match_supercategory, dedup, dedup_by)
+    for dataset in datasets:
+        merger.add(dataset)
+    return COCODataset(merger.result())
+
 
 def coco_merge(
     annotations_file_1: str,
     annotations_file_2: str,
     output_filename: str = "merged_annotations.json",
+    compact: bool = False,
+    match_supercategory: bool = False,
+    dedup: Optional[str] = None,
+    dedup_by: str = "path",
+    segmentation: Optional[str] = None,
+    workers: int = 1,
 ) -> str:
     """Merge two COCO formatted json files into a single file.
 
+    Images present in both files can be merged once with ``dedup``. Duplicates are
+    found by normalized relative path and size, by base name (case folded) and size, or
+    by the content hash of the image files, which are looked for next to each
+    annotation file.
+
     Args:
         annotations_file_1 (str): File path to the first COCO formatted json file.
         annotations_file_2 (str): File path to the second COCO formatted json file.
         output_filename (str, optional): Name of the output json file. Defaults to "merged_annotations.json".
+        compact (bool, optional): Write the output without indentation. Defaults to False.
+        match_supercategory (bool, optional): Match categories by name and supercategory
+            instead of only by name. Defaults to False.
+        dedup (Optional[str], optional): Merge duplicate images once, dropping the
+            annotations of the later copies with "keep_first" or keeping the
+            annotations of every copy with "union". Defaults to None.
+        dedup_by (str, optional): Find duplicates by "path", "name" or "content".
+            Defaults to "path".
+        segmentation (Optional[str], optional): Convert the segmentations of the output,
+            "rle", "polygon" or "geometry", recomputing their area and bbox.
+            Defaults to None.
+        workers (int, optional): Number of processes converting segmentations, 0 for one
+            per CPU. Defaults to 1.
 
     Returns:
         str: Path to the output json file.
     """
-    with open(annotations_file_1, "r") as f:
-        data_1 = json.load(f)
-    with open(annotations_file_2, "r") as f:
-        data_2 = json.load(f)
-
-    output: Dict[str, Any] = {
-        k: data_1[k] for k in data_1 if k not in ("images", "annotations")
-    }
-
-    output["images"], output["annotations"] = [], []
-
-    for i, data in enumerate([data_1, data_2]):
-        logger.info(
-            "Input {}: {} images, {} annotations".format(
-                i + 1, len(data["images"]), len(data["annotations"])
-            )
-        )
-
-        cat_id_map = {}
-        for new_cat in data["categories"]:
-            new_id = None
-            for output_cat in output["categories"]:
-                if new_cat["name"] == output_cat["name"]:
-                    new_id = output_cat["id"]
-                    break
-
-            if new_id is not None:
-                cat_id_map[new_cat["id"]] = new_id
-            else:
-                new_cat_id = max(c["id"] for c in output["categories"]) + 1
-                cat_id_map[new_cat["id"]] = new_cat_id
-                new_cat["id"] = new_cat_id
-                output["categories"].append(new_cat)
-
-        img_id_map = {}
-        for image in data["images"]:
-            n_imgs = len(output["images"])
-            img_id_map[image["id"]] = n_imgs
-            image["id"] = n_imgs
-
-            output["images"].append(image)
-
-        for annotation in data["annotations"]:
-            n_anns = len(output["annotations"])
-            annotation["id"] = n_anns
-            annotation["image_id"] = img_id_map[annotation["image_id"]]
-            annotation["category_id"] = cat_id_map[annotation["category_id"]]
-
-            output["annotations"].append(annotation)
-
-    logger.info(
-        "Result: {} images, {} annotations".format(
-            len(output["images"]), len(output["annotations"])
-        )
+    merged = merge_datasets(
+        (
+            COCODataset.from_file(file)
+            for file in (annotations_file_1, annotations_file_2)
+        ),
+        match_supercategory=match_supercategory,
+        dedup=dedup,
+        dedup_by=dedup_by,
     )
+    if segmentation is not None:
+        # Imported here, only converting segmentations needs it.
+        from cocosuite.core.segmentation import process_segmentations
 
-    if len(output_filename.rsplit("/", 1)) < 2:
-        file_path = Path(annotations_file_1).parent
-        output_filename = str(Path(file_path, output_filename))
+        merged = process_segmentations(merged, segmentation, workers)
 
-    with open(output_filename, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    output_file = str(resolve_output_path(output_filename, annotations_file_1))
+    merged.write(output_file, compact=compact)
 
-    return str(output_filename)
+    return output_file
 
 
 if __name__ == "__main__":
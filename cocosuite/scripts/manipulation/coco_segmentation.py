@@ -0,0 +1,50 @@
+import fire
+from loguru import logger
+
+from cocosuite.core.dataset import COCODataset
+from cocosuite.core.segmentation import process_segmentations
+from cocosuite.core.writer import resolve_output_path
+
+
+def convert_segmentations(
+    annotations_file: str,
+    mode: str = "rle",
+    output_filename: str = "segmentation_annotations.json",
+    workers: int = 1,
+    streaming: bool = False,
+    compact: bool = False,
+) -> str:
+    """Convert the segmentations of a COCO file and recompute their area and bbox.
+
+    Polygons are rasterized as in pycocotools, so the RLE masks, areas and bboxes match
+    the ones of the COCO API. Polygons traced from masks follow the pixel borders, with
+    the holes filled.
+
+    Args:
+        annotations_file (str): JSON file containing COCO formatted data.
+        mode (str, optional): "rle" to encode polygons as compressed RLE, "polygon" to
+            trace RLE masks as polygons or "geometry" to only recompute the area and
+            bbox. Defaults to "rle".
+        output_filename (str, optional): Name of the output json file.
+            Defaults to "segmentation_annotations.json".
+        workers (int, optional): Number of processes, 0 for one per CPU. Defaults to 1.
+        streaming (bool, optional): Stream the annotations from disk instead of loading
+            them. Defaults to False.
+        compact (bool, optional): Write the output without indentation. Defaults to False.
+
+    Returns:
+        str: Path to the output json file.
+    """
+    dataset = COCODataset.from_file(annotations_file, streaming=streaming)
+
+    logger.info(f'Converting segmentations with mode "{mode}"')
+    processed = process_segmentations(dataset, mode, workers)
+
+    output_file = str(resolve_output_path(output_filename, annotations_file))
+    processed.write(output_file, compact=compact)
+    logger.info(f"Saved {len(processed.annotations)} annotations into {output_file}")
+    return output_file
+
+
+if __name__ == "__main__":
+    fire.Fire(convert_segmentations)
@@ -0,0 +1,173 @@
+import heapq
+import json
+import os
+from typing import Any, Dict, Tuple
+
+import fire
+import numpy as np
+from loguru import logger
+
+from cocosuite.core.dataset import COCODataset
+from cocosuite.core.profiling import stage
+from cocosuite.core.writer import resolve_output_path, write_coco_files
+
+BALANCE_MODES = ("annotations", "bytes")
+
+
+def _record_size(record: Dict[str, Any]) -> int:
+    return len(json.dumps(record, separators=(",", ":")))
+
+
+def image_weights(
+    dataset: COCODataset, balance: str = "annotations"
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the load of every image, with its annotations, in a single pass over them.
+
+    Args:
+        dataset (COCODataset): Dataset to weigh.
+        balance (str, optional): "annotations" to weigh the images by their number of
+            annotations or "bytes" by the estimated size of the image and its
+            annotations in compact JSON. Defaults to "annotations".
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Weight and number of annotations of every image.
+    """
+    if balance not in BALANCE_MODES:
+        raise ValueError(
+            f'Unknown balance "{balance}", expected one of {BALANCE_MODES}'
+        )
+    images = dataset.images
+    position = {img["id"]: i for i, img in enumerate(images)}
+    counts = [0] * len(images)
+    sizes = [_record_size(img) for img in images] if balance == "bytes" else counts
+    for ann in dataset.iter_annotations():
+        i = position.get(ann["image_id"])
+        if i is None:
+            continue
+        counts[i] += 1
+        if balance == "bytes":
+            sizes[i] += _record_size(ann)
+    weights = np.array(sizes if balance == "bytes" else counts, dtype=np.int64)
+    return weights, np.array(counts, dtype=np.int64)
+
+
+def greedy_shards(weights: np.ndarray, n_shards: int) -> np.ndarray:
+    """Assign items to shards balancing the total weight of every shard.
+
+    Items are taken from the heaviest to the lightest and each one goes to the shard
+    with the lowest load, ties going to the shard with fewer items, so items without
+    weight are spread evenly too. The heaviest shard is at most 4/3 of the optimum.
+
+    Args:
+        weights (np.ndarray): Weight of every item.
+        n_shards (int): Number of shards.
+
+    Returns:
+        np.ndarray: Shard of every item.
+    """
+    if n_shards < 1:
+        raise ValueError(f"The number of shards must be positive, got {n_shards}")
+    shards = np.empty(len(weights), dtype=np.int64)
+    heap = [(0, 0, shard) for shard in range(n_shards)]
+    order = np.argsort(-weights, kind="stable")
+    for i, weight in zip(order.tolist(), weights[order].tolist()):
+        load, n_items, shard = heap[0]
+        heapq.heapreplace(heap, (load + weight, n_items + 1, shard))
+        shards[i] = shard
+    return shards
+
+
+def shard_dataset(
+    annotations_file: str,
+    n_shards: int,
+    output_filename: str = "shard.json",
+    balance: str = "annotations",
+    workers: int = 1,
+    streaming: bool = False,
+    compact: bool = False,
+) -> str:
+    """Split the input json file into shards of similar load for distributed loaders.
+
+    Every image goes to a single shard with all its annotations. Shard k is written as
+    "<output_stem>_<k>.json", with k zero padded, and "<output_stem>_index.json" lists
+    the file, number of images and annotations, weight and size of every shard. The
+    images of each shard keep their order in the input file.
+
+    Args:
+        annotations_file (str): JSON file containing COCO formatted data.
+        n_shards (int): Number of shards.
+        output_filename (str, optional): Name of the output json file.
+            Defaults to "shard.json".
+        balance (str, optional): Balance the shards by number of "annotations" or by
+            the estimated "bytes" of their records. Defaults to "annotations".
+        workers (int, optional): Number of processes writing shard files, 0 for one per
+            CPU. Defaults to 1.
+        streaming (bool, optional): Stream the annotations from disk instead of loading
+            them, writing all the shards in a single pass. Defaults to False.
+        compact (bool, optional): Write the output without indentation. Defaults to False.
+
+    Returns:
+        str: Path to the index file.
+    """
+    dataset = COCODataset.from_file(annotations_file, streaming=streaming)
+
+    logger.info(f"Sharding data into {n_shards} shards balanced by {balance}")
+    with stage("shard") as profile:
+        weights, counts = image_weights(dataset, balance)
+        shards = greedy_shards(weights, n_shards)
+        profile.records = len(shards)
+
+    images = dataset.images
+    order = np.argsort(shards, kind="stable")
+    bounds = np.cumsum(np.bincount(shards, minlength=n_shards))[:-1]
+    image_groups = [
+        [images[i] for i in group.tolist()] for group in np.split(order, bounds)
+    ]
+    output_path = resolve_output_path(output_filename, annotations_file)
+    digits = len(str(n_shards - 1))
+    output_files = [
+        str(output_path.with_name(f"{output_path.stem}_{shard:0{digits}d}.json"))
+        for shard in range(n_shards)
+    ]
+
+    if dataset.streaming:
+        dataset.write_partition(image_groups, output_files, compact=compact)
+    else:
+        subsets = dataset.partition(image_groups)
+        outputs = zip(output_files, (subset.to_dict() for subset in subsets))
+        for output_file in write_coco_files(outputs, compact, workers):
+            logger.debug(f"Saved shard into {os.path.basename(output_file)}")
+
+    shard_counts = np.bincount(shards, weights=counts, minlength=n_shards)
+    shard_weights = np.bincount(shards, weights=weights, minlength=n_shards)
+    index: Dict[str, Any] = {
+        "source": os.path.basename(annotations_file),
+        "balance": balance,
+        "n_shards": n_shards,
+        "shards": [
+            {
+                "file": os.path.basename(output_file),
+                "images": len(group),
+                "annotations": int(n_annotations),
+                "weight": int(weight),
+                "bytes": os.path.getsize(output_file),
+            }
+            for output_file, group, n_annotations, weight in zip(
+                output_files, image_groups, shard_counts, shard_weights
+            )
+        ],
+    }
+    index_file = output_path.with_name(f"{output_path.stem}_index.json")
+    with open(index_file, "w") as f:
+        json.dump(index, f, indent=2)
+
+    logger.info(
+        f"Saved {n_shards} shards with {balance} from {int(shard_weights.min())} "
+        f"to {int(shard_weights.max())}"
+    )
+    logger.info(f"Saved the shard index into {index_file.name}")
+    return str(index_file)
+
+
+if __name__ == "__main__":
+    fire.Fire(shard_dataset)
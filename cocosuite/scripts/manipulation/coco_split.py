@@ -1,15 +1,271 @@
 import json
 import random
+import re
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
 from loguru import logger
 
+from cocosuite.core.columns import positions
+from cocosuite.core.criteria import compile_criteria
+from cocosuite.core.dataset import COCODataset
+from cocosuite.core.profiling import stage
+from cocosuite.core.writer import resolve_output_path, write_coco_files
+
+
+def partition_by_image_ids(
+    dataset: COCODataset, image_groups: List[List[Dict[str, Any]]]
+) -> List[COCODataset]:
+    """Create one dataset per group of images, each with the annotations of its images.
+
+    The group of every annotation is found at once with a binary search of its image id
+    over the sorted ids of the grouped images, so image ids can be arbitrary and
+    non-contiguous. Annotations keep their order in the dataset.
+
+    Args:
+        dataset (COCODataset): Dataset loaded in memory.
+        image_groups (List[List[Dict[str, Any]]]): Disjoint groups of images.
+
+    Returns:
+        List[COCODataset]: Dataset of each group.
+    """
+    columns = dataset.columns
+    group_ids = [columns.ids([img["id"] for img in images]) for images in image_groups]
+    ids = np.concatenate(group_ids) if group_ids else np.empty(0, dtype=np.int64)
+    labels = np.repeat(np.arange(len(group_ids)), [len(g) for g in group_ids])
+    ann_pos = positions(ids, columns.ann_image_id)
+    ann_labels = np.where(ann_pos >= 0, labels[ann_pos], -1) if len(ids) else ann_pos
+
+    annotations = dataset.annotations
+    ann_order = np.argsort(ann_labels, kind="stable")
+    bounds = np.searchsorted(ann_labels[ann_order], np.arange(len(image_groups) + 1))
+    return [
+        dataset.with_records(
+            images, [annotations[i] for i in ann_order[bounds[g] : bounds[g + 1]]]
+        )
+        for g, images in enumerate(image_groups)
+    ]
+
+
+def image_category_pairs(dataset: COCODataset) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the image position and category index of every annotation.
+
+    Annotations of unknown images or categories are left out. Works in streaming mode
+    too, since the columns of the dataset are built in a single pass.
+
+    Args:
+        dataset (COCODataset): Dataset to read the annotations from.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Position of the image of each annotation in
+            ``dataset.images`` and index of its category in ``dataset.categories``.
+    """
+    columns = dataset.columns
+    valid = (columns.ann_image_index >= 0) & (columns.ann_category_index >= 0)
+    return columns.ann_image_index[valid], columns.ann_category_index[valid]
+
+
+def _csr(keys: np.ndarray, n_keys: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the order that groups ``keys`` and the start offset of every key."""
+    order = np.argsort(keys, kind="stable")
+    indptr = np.zeros(n_keys + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n_keys), out=indptr[1:])
+    return order, indptr
+
+
+def _gather(indptr: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Get the positions of the entries of the given CSR rows."""
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(lengths.sum())
+
+
+def iterative_stratification(
+    samples: np.ndarray,
+    labels: np.ndarray,
+    n_samples: int,
+    ratios: List[float],
+    seed: int = 47,
+) -> np.ndarray:
+    """Assign samples to folds balancing the weight of every label across them.
+
+    Multi-label iterative stratification: labels are processed from the one with the
+    fewest unassigned samples to the most common. The unassigned samples of a label are
+    shuffled and split in one vectorized step, in proportion to the weight each fold
+    still needs for that label, and every label of the assigned samples is then
+    discounted from the needs of their fold. Samples without labels fill the folds up
+    to their desired number of samples.
+
+    The sample×label matrix is kept sparse as (sample, label, weight) entries, so memory
+    and time are linear in the number of entries plus quadratic only in the number of
+    labels.
+
+    Args:
+        samples (np.ndarray): Sample index of every occurrence of a label.
+        labels (np.ndarray): Label index of every occurrence, e.g. one per annotation.
+        n_samples (int): Total number of samples, including those without labels.
+        ratios (List[float]): Fraction of the data desired in each fold.
+        seed (int, optional): Seed for random number generation. Defaults to 47.
+
+    Returns:
+        np.ndarray: Fold of every sample.
+    """
+    rng = np.random.default_rng(seed)
+    ratios_arr = np.asarray(ratios, dtype=np.float64) / np.sum(ratios)
+    n_folds = len(ratios_arr)
+    n_labels = int(labels.max()) + 1 if len(labels) else 0
+
+    keys, weights = np.unique(samples * n_labels + labels, return_counts=True)
+    entry_samples, entry_labels = keys // max(n_labels, 1), keys % max(n_labels, 1)
+    by_sample, sample_ptr = _csr(entry_samples, n_samples)
+    by_label, label_ptr = _csr(entry_labels, n_labels)
+
+    label_weights = np.bincount(entry_labels, weights=weights, minlength=n_labels)
+    desired = ratios_arr[:, None] * label_weights[None, :]
+    desired_samples = ratios_arr * n_samples
+    pending = np.bincount(entry_labels, minlength=n_labels).astype(np.float64)
+    folds = np.full(n_samples, -1, dtype=np.int64)
+
+    while n_labels and pending.max() > 0:
+        label = int(np.where(pending > 0, pending, np.inf).argmin())
+        entries = by_label[label_ptr[label] : label_ptr[label + 1]]
+        entries = entries[folds[entry_samples[entries]] == -1]
+        entries = entries[rng.permutation(len(entries))]
+        label_samples, label_sample_weights = entry_samples[entries], weights[entries]
+
+        share = np.clip(desired[:, label], 0, None)
+        if share.sum() <= 0:
+            share = np.clip(desired_samples, 0, None)
+        if share.sum() <= 0:
+            share = ratios_arr
+        cumulative = np.cumsum(label_sample_weights)
+        bounds = np.cumsum(share / share.sum())[:-1] * cumulative[-1]
+        midpoints = cumulative - label_sample_weights / 2
+        assigned = np.searchsorted(bounds, midpoints)
+        folds[label_samples] = assigned
+
+        sample_entries = by_sample[_gather(sample_ptr, label_samples)]
+        entry_folds = np.repeat(
+            assigned, sample_ptr[label_samples + 1] - sample_ptr[label_samples]
+        )
+        desired -= np.bincount(
+            entry_folds * n_labels + entry_labels[sample_entries],
+            weights=weights[sample_entries],
+            minlength=n_folds * n_labels,
+        ).reshape(n_folds, n_labels)
+        pending -= np.bincount(entry_labels[sample_entries], minlength=n_labels)
+        desired_samples -= np.bincount(assigned, minlength=n_folds)
+
+    unlabeled = np.flatnonzero(folds == -1)
+    if len(unlabeled):
+        quota = np.clip(desired_samples, 0, None)
+        if quota.sum() <= 0:
+            quota = ratios_arr
+        quota = quota / quota.sum() * len(unlabeled)
+        counts = np.floor(quota).astype(np.int64)
+        remainder = len(unlabeled) - counts.sum()
+        counts[np.argsort(counts - quota, kind="stable")[:remainder]] += 1
+        folds[rng.permutation(unlabeled)] = np.repeat(np.arange(n_folds), counts)
+    return folds
+
+
+def split_dataset(
+    dataset: COCODataset, splits: Dict[str, List[Dict[str, Any]]]
+) -> Dict[str, COCODataset]:
+    """Create a dataset per split of images, each with the annotations of its images.
+
+    Args:
+        dataset (COCODataset): Dataset loaded in memory.
+        splits (Dict[str, List[Dict[str, Any]]]): Images of each split, by split name.
+
+    Returns:
+        Dict[str, COCODataset]: Dataset of each split, by split name.
+    """
+    with stage("partition") as profile:
+        subsets = partition_by_image_ids(dataset, list(splits.values()))
+        profile.records = len(dataset.annotations)
+    return dict(zip(splits, subsets))
+
+
+def write_splits(
+    dataset: COCODataset,
+    splits: Dict[str, List[Dict[str, Any]]],
+    annotations_file: str,
+    output_filename: str,
+    compact: bool = False,
+    segmentation: Optional[str] = None,
+    workers: int = 1,
+) -> None:
+    """Write each split of images with its annotations into "<output_stem>_<split>.json".
+
+    In streaming mode the annotations are routed while they are read from disk, in memory
+    they are assigned with ``partition_by_image_ids``. Converting the segmentations
+    loads the annotations.
+
+    Args:
+        dataset (COCODataset): Dataset the images belong to.
+        splits (Dict[str, List[Dict[str, Any]]]): Images of each split, by split name.
+        annotations_file (str): Input json file, the outputs go next to it by default.
+        output_filename (str): Name of the output json file.
+        compact (bool, optional): Write without indentation. Defaults to False.
+        segmentation (Optional[str], optional): Convert the segmentations, "rle",
+            "polygon" or "geometry", recomputing their area and bbox. Defaults to None.
+        workers (int, optional): Number of processes converting segmentations, 0 for one
+            per CPU. Defaults to 1.
+    """
+    if segmentation is not None:
+        # Imported here, only converting segmentations needs it.
+        from cocosuite.core.segmentation import process_segmentations
+
+        dataset = process_segmentations(dataset, segmentation, workers)
+    output_path = resolve_output_path(output_filename, annotations_file)
+    output_files = [
+        str(output_path.with_name(f"{output_path.stem}_{name}.json")) for name in splits
+    ]
+    if dataset.streaming:
+        dataset.write_partition(list(splits.values()), output_files, compact=compact)
+    else:
+        subsets = split_dataset(dataset, splits).values()
+        for subset, output_file in zip(subsets, output_files):
+            subset.write(output_file, compact=compact)
+    for output_file in output_files:
+        logger.info(f"Saved split into {Path(output_file).name}")
+
+
+def property_split_images(
+    dataset: COCODataset, criteria: Dict[str, Any], match_all: bool = False
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Split the images of a dataset into "train" and "val" by the property criteria.
+
+    Args:
+        dataset (COCODataset): Dataset to split.
+        criteria (Dict[str, Any]): Criteria of the val images.
+        match_all (bool, optional): Put in val only the images matching every criterion
+            instead of any of them. Defaults to False.
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: Images of each split, by split name.
+    """
+    with stage("split") as profile:
+        matches = compile_criteria(criteria, match_all).evaluate(dataset.images)
+        train_images = [
+            image for image, match in zip(dataset.images, matches) if not match
+        ]
+        val_images = [image for image, match in zip(dataset.images, matches) if match]
+        profile.records = len(dataset.images)
+    return {"train": train_images, "val": val_images}
+
 
 def property_split(
     annotations_file: str,
     config_split: str,
     output_filename: str = "property_split.json",
+    streaming: bool = False,
+    compact: bool = False,
+    segmentation: Optional[str] = None,
+    workers: int = 1,
 ) -> None:
     """Split the input json file based on the property criteria.
 
@@ -17,9 +273,16 @@ def property_split(
         annotations_file (str): JSON file containing COCO formatted data.
         config_split (str): JSON file containing the criteria for splitting the data.
         output_filename (str, optional): Name of the output json file. Defaults to None.
+        streaming (bool, optional): Stream the annotations from disk instead of loading them,
+            keeping them in file order. Defaults to False.
+        compact (bool, optional): Write the output without indentation. Defaults to False.
+        segmentation (Optional[str], optional): Convert the segmentations of the output,
+            "rle", "polygon" or "geometry", recomputing their area and bbox.
+            Defaults to None.
+        workers (int, optional): Number of processes converting segmentations, 0 for one
+            per CPU. Defaults to 1.
     """
-    with open(annotations_file, "r") as f:
-        coco_data = json.load(f)
+    dataset = COCODataset.from_file(annotations_file, streaming=streaming)
 
     with open(config_split, "r") as f:
         config_data = json.load(f)
@@ -27,69 +290,47 @@ def property_split(
     match_all = config_data.get("match_all", False)
 
     logger.info(f"Splitting data based on the property: {criteria}")
-    train_images = []
-    val_images = []
-    train_annotations = []
-    val_annotations = []
-
-    for image in coco_data["images"]:
-        if match_all:
-            match = all(
-                key in image and any(str(value) in str(image[key]) for value in values)
-                for key, values in criteria.items()
-            )
-        else:
-            match = any(
-                key in image and any(str(value) in str(image[key]) for value in values)
-                for key, values in criteria.items()
-            )
-
-        if match:
-            val_images.append(image)
-            val_annotations.extend(
-                [
-                    ann
-                    for ann in coco_data["annotations"]
-                    if ann["image_id"] == image["id"]
-                ]
-            )
-        else:
-            train_images.append(image)
-            train_annotations.extend(
-                [
-                    ann
-                    for ann in coco_data["annotations"]
-                    if ann["image_id"] == image["id"]
-                ]
-            )
-
-    train_data = {
-        "info": coco_data.get("info", {}),
-        "licenses": coco_data.get("licenses", []),
-        "images": train_images,
-        "annotations": train_annotations,
-        "categories": coco_data["categories"],
-    }
-    val_data = {
-        "info": coco_data.get("info", {}),
-        "licenses": coco_data.get("licenses", []),
-        "images": val_images,
-        "annotations": val_annotations,
-        "categories": coco_data["categories"],
-    }
+    write_splits(
+        dataset,
+        property_split_images(dataset, criteria, match_all),
+        annotations_file,
+        output_filename,
+        compact=compact,
+        segmentation=segmentation,
+        workers=workers,
+    )
 
-    file_name = Path(output_filename).stem
-    if len(output_filename.rsplit("/", 1)) >= 2:
-        file_path = Path(output_filename).parent
-    else:
-        file_path = Path(annotations_file).parent
 
-    for data_type, data in [("train", train_data), ("val", val_data)]:
-        type_file_name = f"{file_name}_{data_type}.json"
-        output_file = Path(file_path, type_file_name)
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        logger.info(f"Saved split into {type_file_name}")
+def random_split_images(
+    dataset: COCODataset, train_percentage: float = 0.8, seed: int = 47
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Split the images of a dataset randomly into "train" and "val".
+
+    Args:
+        dataset (COCODataset): Dataset to split.
+        train_percentage (float, optional): Percentage of data to be used for training.
+            Defaults to 0.8.
+        seed (int, optional): Seed for random number generation. Defaults to 47.
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: Images of each split, by split name.
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+
+    with stage("split") as profile:
+        data_size = len(dataset.images)
+        indices = np.random.permutation(data_size)
+        train_size = int(data_size * train_percentage)
+        train_indices = np.sort(indices[:train_size])
+        val_indices = np.sort(indices[train_size:])
+        profile.records = data_size
+
+    images = dataset.images
+    return {
+        "train": [images[i] for i in train_indices],
+        "val": [images[i] for i in val_indices],
+    }
 
 
 def random_split(
@@ -97,6 +338,10 @@ def random_split(
     output_filename: str = "random_split.json",
     train_percentage: float = 0.8,
     seed: int = 47,
+    streaming: bool = False,
+    compact: bool = False,
+    segmentation: Optional[str] = None,
+    workers: int = 1,
 ) -> None:
     """Split the input json file randomly into train and val.
 
@@ -106,55 +351,244 @@ def random_split(
         output_path (Optional[str], optional): Path to save the output file. Defaults to None.
         train_percentage (Optional[float], optional): Percentage of data to be used for training. Defaults to 0.8.
         seed (Optional[int], optional): Seed for random number generation. Defaults to 47.
+        streaming (bool, optional): Stream the annotations from disk instead of loading them,
+            keeping them in file order. Defaults to False.
+        compact (bool, optional): Write the output without indentation. Defaults to False.
+        segmentation (Optional[str], optional): Convert the segmentations of the output,
+            "rle", "polygon" or "geometry", recomputing their area and bbox.
+            Defaults to None.
+        workers (int, optional): Number of processes converting segmentations, 0 for one
+            per CPU. Defaults to 1.
     """
-    with open(annotations_file, "r") as f:
-        data = json.load(f)
-
-    random.seed(seed)
-    np.random.seed(seed)
+    dataset = COCODataset.from_file(annotations_file, streaming=streaming)
 
     logger.info(
         f"Splitting data into train and val with {train_percentage} train percentage"
     )
-    data_size = len(data["images"])
-    indices = np.random.permutation(data_size)
-    train_size = int(data_size * train_percentage)
-    train_indices = indices[:train_size]
-    val_indices = indices[train_size:]
-
-    train_data = {
-        "info": data.get("info", {}),
-        "licenses": data.get("licenses", []),
-        "images": [],
-        "annotations": [],
-        "categories": data["categories"],
-    }
-    val_data = {
-        "info": data.get("info", {}),
-        "licenses": data.get("licenses", []),
-        "images": [],
-        "annotations": [],
-        "categories": data["categories"],
+    write_splits(
+        dataset,
+        random_split_images(dataset, train_percentage, seed),
+        annotations_file,
+        output_filename,
+        compact=compact,
+        segmentation=segmentation,
+        workers=workers,
+    )
+
+
+def stratified_split_images(
+    dataset: COCODataset, train_percentage: float = 0.8, seed: int = 47
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Split the images of a dataset into "train" and "val" balancing the categories.
+
+    Args:
+        dataset (COCODataset): Dataset to split.
+        train_percentage (float, optional): Percentage of data to be used for training.
+            Defaults to 0.8.
+        seed (int, optional): Seed for random number generation. Defaults to 47.
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: Images of each split, by split name.
+    """
+    images = dataset.images
+    with stage("split") as profile:
+        samples, labels = image_category_pairs(dataset)
+        folds = iterative_stratification(
+            samples, labels, len(images), [train_percentage, 1 - train_percentage], seed
+        )
+        profile.records = len(images)
+    return {
+        "train": [images[i] for i in np.flatnonzero(folds == 0)],
+        "val": [images[i] for i in np.flatnonzero(folds == 1)],
     }
 
-    train_data["images"] = [data["images"][i] for i in train_indices]
-    val_data["images"] = [data["images"][i] for i in val_indices]
 
-    for ann in data["annotations"]:
-        if ann["image_id"] in train_indices:
-            train_data["annotations"].append(ann)
-        else:
-            val_data["annotations"].append(ann)
+def stratified_split(
+    annotations_file: str,
+    output_filename: str = "stratified_split.json",
+    train_percentage: float = 0.8,
+    seed: int = 47,
+    streaming: bool = False,
+    compact: bool = False,
+    segmentation: Optional[str] = None,
+    workers: int = 1,
+) -> None:
+    """Split the input json file into train and val balancing the annotations of each category.
+
+    Images are assigned with multi-label iterative stratification over the per-image
+    annotation counts of every category, so rare categories are also represented in val.
 
-    file_name = Path(output_filename).stem
-    if len(output_filename.rsplit("/", 1)) >= 2:
-        file_path = Path(output_filename).parent
+    Args:
+        annotations_file (str): JSON file containing COCO formatted data.
+        output_filename (str, optional): Name of the output json file. Defaults to "stratified_split.json".
+        train_percentage (float, optional): Percentage of data to be used for training. Defaults to 0.8.
+        seed (int, optional): Seed for random number generation. Defaults to 47.
+        streaming (bool, optional): Stream the annotations from disk instead of loading them,
+            keeping them in file order. Defaults to False.
+        compact (bool, optional): Write the output without indentation. Defaults to False.
+        segmentation (Optional[str], optional): Convert the segmentations of the output,
+            "rle", "polygon" or "geometry", recomputing their area and bbox.
+            Defaults to None.
+        workers (int, optional): Number of processes converting segmentations, 0 for one
+            per CPU. Defaults to 1.
+    """
+    dataset = COCODataset.from_file(annotations_file, streaming=streaming)
+
+    logger.info(
+        f"Stratified split into train and val with {train_percentage} train percentage"
+    )
+    write_splits(
+        dataset,
+        stratified_split_images(dataset, train_percentage, seed),
+        annotations_file,
+        output_filename,
+        compact=compact,
+        segmentation=segmentation,
+        workers=workers,
+    )
+
+
+def image_groups(
+    images: List[Dict[str, Any]], group_by: str, group_pattern: Optional[str] = None
+) -> np.ndarray:
+    """Get the group index of every image from one of its properties.
+
+    Args:
+        images (List[Dict[str, Any]]): Images to group.
+        group_by (str): Image property the groups are defined by, e.g. "file_name".
+        group_pattern (Optional[str], optional): Regular expression applied to the
+            property, the first match is the group (e.g. "^[^/]+" for the folder of the
+            file name). The whole value is used when it does not match. Defaults to None.
+
+    Returns:
+        np.ndarray: Group index of every image.
+    """
+    pattern = re.compile(group_pattern) if group_pattern else None
+    group_index: Dict[Any, int] = {}
+    groups = np.empty(len(images), dtype=np.int64)
+    for i, image in enumerate(images):
+        key = image.get(group_by)
+        if pattern is not None:
+            match = pattern.search(str(key))
+            key = match.group(0) if match else str(key)
+        groups[i] = group_index.setdefault(key, len(group_index))
+    return groups
+
+
+def kfold_assignment(
+    dataset: COCODataset,
+    n_folds: int = 5,
+    seed: int = 47,
+    stratified: bool = False,
+    group_by: Optional[str] = None,
+    group_pattern: Optional[str] = None,
+) -> np.ndarray:
+    """Assign every image of the dataset to one of ``n_folds`` disjoint folds.
+
+    Args:
+        dataset (COCODataset): Dataset to split.
+        n_folds (int, optional): Number of folds. Defaults to 5.
+        seed (int, optional): Seed for random number generation. Defaults to 47.
+        stratified (bool, optional): Balance the annotations of every category across
+            the folds. Defaults to False.
+        group_by (Optional[str], optional): Image property whose images always share a
+            fold. Defaults to None.
+        group_pattern (Optional[str], optional): Regular expression extracting the group
+            from the ``group_by`` property. Defaults to None.
+
+    Returns:
+        np.ndarray: Fold of every image.
+    """
+    n_images = len(dataset.images)
+    if group_by is None:
+        groups = np.arange(n_images)
+    else:
+        groups = image_groups(dataset.images, group_by, group_pattern)
+    n_groups = int(groups.max()) + 1 if n_images else 0
+
+    if stratified:
+        samples, labels = image_category_pairs(dataset)
+        group_folds = iterative_stratification(
+            groups[samples], labels, n_groups, [1 / n_folds] * n_folds, seed
+        )
     else:
-        file_path = Path(annotations_file).parent
-
-    for data_type, data in [("train", train_data), ("val", val_data)]:
-        type_file_name = f"{file_name}_{data_type}.json"
-        output_file = Path(file_path, type_file_name)
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        logger.info(f"Saved split into {type_file_name}")
+        group_folds = np.empty(n_groups, dtype=np.int64)
+        permutation = np.random.default_rng(seed).permutation(n_groups)
+        group_folds[permutation] = np.arange(n_groups) * n_folds // max(n_groups, 1)
+    return group_folds[groups]
+
+
+def kfold_split(
+    annotations_file: str,
+    output_filename: str = "kfold_split.json",
+    n_folds: int = 5,
+    seed: int = 47,
+    stratified: bool = False,
+    group_by: Optional[str] = None,
+    group_pattern: Optional[str] = None,
+    workers: int = 1,
+    compact: bool = False,
+    segmentation: Optional[str] = None,
+) -> None:
+    """Split the input json file into k folds for cross-validation.
+
+    The dataset is loaded once and all the folds are assigned in a single pass. Fold k
+    is written as "<output_stem>_fold<k>_val.json" with its images and
+    "<output_stem>_fold<k>_train.json" with the images of every other fold.
+
+    Args:
+        annotations_file (str): JSON file containing COCO formatted data.
+        output_filename (str, optional): Name of the output json file. Defaults to "kfold_split.json".
+        n_folds (int, optional): Number of folds. Defaults to 5.
+        seed (int, optional): Seed for random number generation. Defaults to 47.
+        stratified (bool, optional): Balance the annotations of every category across
+            the folds. Defaults to False.
+        group_by (Optional[str], optional): Image property whose images always share a
+            fold, e.g. "file_name". Defaults to None.
+        group_pattern (Optional[str], optional): Regular expression extracting the group
+            from the ``group_by`` property, e.g. "^[^/]+" for the folder. Defaults to None.
+        workers (int, optional): Number of processes writing fold files and converting
+            segmentations, 0 for one per CPU. Defaults to 1.
+        compact (bool, optional): Write the output without indentation. Defaults to False.
+        segmentation (Optional[str], optional): Convert the segmentations of the output,
+            "rle", "polygon" or "geometry", recomputing their area and bbox.
+            Defaults to None.
+    """
+    dataset = COCODataset.from_file(annotations_file)
+    if segmentation is not None:
+        # Imported here, only converting segmentations needs it.
+        from cocosuite.core.segmentation import process_segmentations
+
+        dataset = process_segmentations(dataset, segmentation, workers)
+
+    logger.info(f"Splitting data into {n_folds} folds")
+    with stage("split") as profile:
+        folds = kfold_assignment(
+            dataset, n_folds, seed, stratified, group_by, group_pattern
+        )
+        ann_pos = dataset.columns.ann_image_index
+        ann_folds = (
+            np.where(ann_pos >= 0, folds[ann_pos], -1) if len(folds) else ann_pos
+        )
+        profile.records = len(dataset.images)
+
+    images, annotations = dataset.images, dataset.annotations
+    output_path = resolve_output_path(output_filename, annotations_file)
+
+    def fold_outputs() -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for fold in range(n_folds):
+            for name, img_mask, ann_mask in (
+                ("train", folds != fold, (ann_folds != fold) & (ann_folds >= 0)),
+                ("val", folds == fold, ann_folds == fold),
+            ):
+                subset = dataset.with_records(
+                    [images[i] for i in np.flatnonzero(img_mask)],
+                    [annotations[i] for i in np.flatnonzero(ann_mask)],
+                )
+                output_file = output_path.with_name(
+                    f"{output_path.stem}_fold{fold}_{name}.json"
+                )
+                yield str(output_file), subset.to_dict()
+
+    for output_file in write_coco_files(fold_outputs(), compact, workers):
+        logger.info(f"Saved fold into {Path(output_file).name}")
@@ -0,0 +1,233 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from cocosuite.core.dataset import COCODataset
+from cocosuite.core.hashing import content_hash
+from cocosuite.core.parallel import ordered_map
+from cocosuite.core.profiling import stage
+from cocosuite.core.writer import COCOWriter
+from cocosuite.scripts.manipulation.coco_merge import COCOMerger
+from cocosuite.scripts.manipulation.merge_multiple_coco_files import (
+    add_ann_folder_to_img_name,
+)
+
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = ".manifest.json"
+
+Shard = Dict[str, Any]
+
+
+def manifest_path(output_file: Path) -> Path:
+    """Get the path of the manifest of a merge output."""
+    return output_file.with_name(f"{output_file.name}{MANIFEST_SUFFIX}")
+
+
+def _stat(file: Path) -> Dict[str, int]:
+    stat = file.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_manifest(
+    output_file: Path, compact: bool, match_supercategory: bool
+) -> Optional[Dict[str, Any]]:
+    """Load the manifest of a merge output if the output can be appended to.
+
+    Args:
+        output_file (Path): Merge output.
+        compact (bool): Whether the output is to be written without indentation.
+        match_supercategory (bool): Whether categories are matched by supercategory.
+
+    Returns:
+        Optional[Dict[str, Any]]: The manifest, or None if it is missing, was written by
+            another version, with other settings, or the output changed since.
+    """
+    try:
+        with open(manifest_path(output_file), "r") as f:
+            manifest = json.load(f)
+        output_stat = _stat(output_file)
+    except (OSError, ValueError):
+        return None
+    if (
+        manifest.get("version") != MANIFEST_VERSION
+        or manifest.get("output") != output_stat
+        or manifest.get("compact") != compact
+        or manifest.get("match_supercategory") != match_supercategory
+    ):
+        return None
+    return manifest
+
+
+def _unchanged(shard: Shard, file: Path) -> bool:
+    stat = _stat(file)
+    if stat == {"size": shard["size"], "mtime_ns": shard["mtime_ns"]}:
+        return True
+    # A touched but identical file is still unchanged.
+    if stat["size"] == shard["size"] and content_hash(str(file)) == shard["hash"]:
+        shard["mtime_ns"] = stat["mtime_ns"]
+        return True
+    return False
+
+
+def _plan(
+    coco_files: List[str], dir_path: str, manifest: Optional[Dict[str, Any]]
+) -> Tuple[List[Shard], List[str]]:
+    """Get the shards of the manifest kept as they are and the files to append."""
+    if manifest is None:
+        return [], coco_files
+    paths = {Path(file).relative_to(dir_path).as_posix(): file for file in coco_files}
+    kept = [
+        shard
+        for shard in manifest["shards"]
+        if shard["path"] in paths and _unchanged(shard, Path(paths[shard["path"]]))
+    ]
+    kept_paths = {shard["path"] for shard in kept}
+    added = [file for path, file in paths.items() if path not in kept_paths]
+    return kept, added
+
+
+def incremental_merge(
+    dir_path: str,
+    coco_files: List[str],
+    output_file: Path,
+    compact: bool = False,
+    workers: int = 1,
+    match_supercategory: bool = False,
+) -> None:
+    """Merge annotation files, only processing those added or changed since the last run.
+
+    A manifest next to the output records, for every merged file, its path, size and
+    content hash, the image and annotation ids assigned to it, the mapping of its
+    categories and the byte span of its records in the output. On the next run the
+    records of unchanged files are copied from the previous output without decoding
+    them, the records of changed and removed files are dropped, and new and changed
+    files are appended with ids after the last ones used. Merged categories are never
+    renumbered nor removed.
+
+    Everything is merged again when there is no valid manifest, when the output was
+    modified since, or when the first file, whose info and licenses head the output,
+    changed or was removed.
+
+    Args:
+        dir_path (str): Directory the files are relative to in the manifest.
+        coco_files (List[str]): Annotation files to merge, in order.
+        output_file (Path): Merge output.
+        compact (bool, optional): Write the output without indentation. Defaults to False.
+        workers (int, optional): Number of processes parsing the files, 0 for one per CPU.
+            Defaults to 1.
+        match_supercategory (bool, optional): Match categories by name and supercategory
+            instead of only by name. Defaults to False.
+    """
+    manifest = load_manifest(output_file, compact, match_supercategory)
+    kept, added = _plan(coco_files, dir_path, manifest)
+    if manifest is not None and (
+        not kept or kept[0]["path"] != manifest["shards"][0]["path"]
+    ):
+        logger.info("The first file changed, merging every file again")
+        manifest = None
+        kept, added = [], coco_files
+    if manifest is not None and not added and len(kept) == len(manifest["shards"]):
+        logger.info(f"{output_file} is up to date")
+        return
+    logger.info(
+        f"{len(kept)} files unchanged, {len(added)} to merge"
+        + (f", {len(manifest['shards']) - len(kept)} dropped" if manifest else "")
+    )
+
+    merger = COCOMerger(match_supercategory=match_supercategory)
+    if manifest is not None:
+        merger.resume(
+            manifest["categories"],
+            manifest["next_image_id"],
+            manifest["next_annotation_id"],
+        )
+    loaded = zip(added, ordered_map(add_ann_folder_to_img_name, added, workers=workers))
+
+    new_records: List[Tuple[Shard, List[Dict[str, Any]], List[Dict[str, Any]]]] = []
+    header: Dict[str, Any] = {}
+    for file, data in loaded:
+        logger.info(f"Merging {file}.")
+        dataset = COCODataset(data)
+        if not header and manifest is None:
+            header = {
+                k: v for k, v in data.items() if k not in ("images", "annotations")
+            }
+        first_image_id = merger.next_image_id
+        first_annotation_id = merger.next_annotation_id
+        with stage("merge") as profile:
+            images, annotations, cat_id_map = merger.remap(dataset)
+            profile.records = len(images) + len(annotations)
+        shard: Shard = {
+            "path": Path(file).relative_to(dir_path).as_posix(),
+            **_stat(Path(file)),
+            "hash": content_hash(file),
+            "images": [first_image_id, merger.next_image_id],
+            "annotations": [first_annotation_id, merger.next_annotation_id],
+            "n_images": len(images),
+            "n_annotations": len(annotations),
+            "categories": sorted(cat_id_map.items()),
+        }
+        new_records.append((shard, images, annotations))
+
+    keys = list(manifest["keys"]) if manifest else [*header, "images", "annotations"]
+    tmp_file = output_file.with_name(f"{output_file.name}.tmp")
+    previous = open(output_file, "rb") if manifest is not None else None
+    try:
+        with (
+            stage("write") as profile,
+            COCOWriter(str(tmp_file), compact=compact) as writer,
+        ):
+            for key in keys:
+                if key == "categories":
+                    writer.write(key, merger.categories.categories)
+                elif key in ("images", "annotations"):
+                    singular = key[:-1]
+                    writer.begin_array(key)
+                    for shard in kept:
+                        assert previous is not None
+                        start = writer.tell()
+                        writer.copy_records(
+                            previous, shard[f"{singular}_span"], shard[f"n_{key}"]
+                        )
+                        shard[f"{singular}_span"] = [start, writer.tell()]
+                    for shard, images, annotations in new_records:
+                        start = writer.tell()
+                        for record in images if key == "images" else annotations:
+                            writer.write_record(record)
+                        shard[f"{singular}_span"] = [start, writer.tell()]
+                    writer.end_array()
+                elif manifest is not None:
+                    assert previous is not None
+                    writer.copy_value(key, previous, manifest["spans"][key])
+                else:
+                    writer.write(key, header[key])
+            profile.records = writer.records_written
+    finally:
+        if previous is not None:
+            previous.close()
+    os.replace(tmp_file, output_file)
+
+    shards = kept + [shard for shard, _, _ in new_records]
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "output": _stat(output_file),
+        "compact": compact,
+        "match_supercategory": match_supercategory,
+        "keys": keys,
+        "spans": writer.spans,
+        "categories": merger.categories.categories,
+        "next_image_id": merger.next_image_id,
+        "next_annotation_id": merger.next_annotation_id,
+        "shards": shards,
+    }
+    tmp_manifest = manifest_path(output_file).with_suffix(".tmp")
+    with open(tmp_manifest, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_manifest, manifest_path(output_file))
+    logger.info(
+        f"Merged {sum(s['n_images'] for s in shards)} images and "
+        f"{sum(s['n_annotations'] for s in shards)} annotations into {output_file}"
+    )
@@ -1,78 +1,174 @@
-import json
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
 
 import fire
 from loguru import logger
 
-from cocosuite.scripts.manipulation.coco_merge import coco_merge
+from cocosuite.core.dataset import COCODataset
+from cocosuite.core.parallel import ordered_map
+from cocosuite.scripts.manipulation.coco_merge import COCOMerger
 
 
-def add_ann_folder_to_img_name(ann_file: str) -> str:
-    """Add the parent folder to image filenames in annotation file.
+def add_ann_folder_to_img_name(ann_file: str) -> Dict[str, Any]:
+    """Load an annotation file adding its parent folder to the image filenames.
 
     Args:
         ann_file (str): Path to the annotation file.
 
     Returns:
-        str: Path to the modified version of the annotation json file.
+        Dict[str, Any]: COCO formatted data of the file with the updated image filenames.
     """
-    full_path = Path(ann_file)
-    parent_folder = full_path.parent.name
-    path_to_mod_file = f"{full_path.parent}/{Path(ann_file).stem}_to-merge.json"
-
-    with open(ann_file, "r") as f:
-        orig_data = json.load(f)
+    parent_folder = Path(ann_file).parent.name
+    orig_data = COCODataset.from_file(ann_file).to_dict()
 
     for img in orig_data["images"]:
         img["file_name"] = parent_folder + "/" + img["file_name"]
 
-    with open(path_to_mod_file, "w") as f:
-        json.dump(orig_data, f, indent=2)
+    return orig_data
+
 
-    return path_to_mod_file
+def find_coco_files(
+    dir_path: str, name_pattern: str = "*.json", exclude: Sequence[Path] = ()
+) -> List[str]:
+    """Find the annotation files in the subdirectories of a directory, sorted by path.
+
+    Args:
+        dir_path (str): Parent directory.
+        name_pattern (str, optional): Name pattern of the files. Defaults to "*.json".
+        exclude (Sequence[Path], optional): Files to leave out, e.g. the merge output.
+            Defaults to ().
+
+    Returns:
+        List[str]: Paths of the files.
+    """
+    excluded = {file.resolve() for file in exclude}
+    return sorted(
+        str(file)
+        for file in Path(dir_path).rglob(name_pattern)
+        if file.resolve() not in excluded
+    )
+
+
+def merge_coco_files(
+    coco_files: List[str],
+    workers: int = 1,
+    match_supercategory: bool = False,
+    dedup: Optional[str] = None,
+    dedup_by: str = "path",
+) -> COCODataset:
+    """Merge annotation files in memory, prefixing image names with their folder.
+
+    Duplicates are found by the image names in their own file, without the folder
+    prefix. With ``dedup_by="content"`` the images are hashed from the parent directory
+    of each annotation folder, which the prefixed image names are relative to.
 
+    Args:
+        coco_files (List[str]): Paths of the annotation files.
+        workers (int, optional): Number of processes parsing the files and converting
+            segmentations, 0 for one per CPU. Defaults to 1.
+        match_supercategory (bool, optional): Match categories by name and supercategory
+            instead of only by name. Defaults to False.
+        dedup (Optional[str], optional): Policy for duplicate images, "keep_first" or
+            "union". Defaults to None.
+        dedup_by (str, optional): Find duplicates by "path", "name" or "content".
+            Defaults to "path".
 
-def delete_merged_files(files_to_delete: list) -> None:
-    """Remove the '*_to-merge.json' files created in the 'add_ann_folder_to_ann_file' method that are no longer needed."""
-    for file in files_to_delete:
-        Path(file).unlink()
-        logger.info(f"{file} deleted.")
+    Returns:
+        COCODataset: The merged dataset.
+    """
+    merger = COCOMerger(match_supercategory, dedup, dedup_by)
+    shards = ordered_map(add_ann_folder_to_img_name, coco_files, workers=workers)
+    for file, shard in zip(coco_files, shards):
+        logger.info(f"Merging {file}.")
+        folder = Path(file).parent
+        merger.add(
+            COCODataset(shard), image_dir=str(folder.parent), prefix=folder.name + "/"
+        )
+    return COCODataset(merger.result())
 
 
 def merge_multiple_coco_files(
     dir_path: str,
     output_file: str = "merged_annotations.json",
     name_pattern: str = "*.json",
+    compact: bool = False,
+    workers: int = 1,
+    match_supercategory: bool = False,
+    incremental: bool = False,
+    dedup: Optional[str] = None,
+    dedup_by: str = "path",
+    segmentation: Optional[str] = None,
 ) -> None:
     """Fetch subdirectories looking for coco annotation files.
 
-    Merge all the coco files inside the dir_path into a single file.
+    Merge all the coco files inside the dir_path into a single file. Each file is read
+    once and the result is written once, without intermediate files. With several
+    workers the files are parsed in a process pool and merged in the same order as in
+    the serial path, so the output is identical.
+
+    In incremental mode a manifest is kept next to the output and later runs only parse
+    the files added or changed since, appending them to the previous output.
+
+    Image paths are prefixed with the folder of their file, which is left out when
+    finding duplicates, so images with the same relative path and size in several
+    files are merged once.
 
     Args:
         dir_path (str): Parent directory, contains subdirectories with their own annotations and images.
         output_file (str, optional): Name of the file resulting from doing the merge.
         name_pattern (str, optional): Name pattern of the files to merge, leaving those that do not match unmerged.
+        compact (bool, optional): Write the output without indentation. Defaults to False.
+        workers (int, optional): Number of processes parsing the files and converting
+            segmentations, 0 for one per CPU. Defaults to 1.
+        match_supercategory (bool, optional): Match categories by name and supercategory
+            instead of only by name. Defaults to False.
+        incremental (bool, optional): Only merge the files added or changed since the
+            last incremental run. Defaults to False.
+        dedup (Optional[str], optional): Merge images found in several files once,
+            dropping the annotations of the later copies with "keep_first" or keeping
+            the annotations of every copy with "union". Defaults to None.
+        dedup_by (str, optional): Find duplicates by "path" (normalized relative path
+            and size), "name" (base name and size) or "content" (hash of the image
+            files). Defaults to "path".
+        segmentation (Optional[str], optional): Convert the segmentations of the output,
+            "rle", "polygon" or "geometry", recomputing their area and bbox.
+            Defaults to None.
     """
-    coco_files = sorted([str(file) for file in Path(dir_path).rglob(name_pattern)])
+    if incremental and dedup is not None:
+        raise ValueError("Deduplication is not supported by the incremental merge")
+    if incremental and segmentation is not None:
+        raise ValueError(
+            "Converting segmentations is not supported by the incremental merge"
+        )
+
+    # Imported here, the incremental merge builds on the helpers of this module.
+    from cocosuite.scripts.manipulation.incremental_merge import (
+        incremental_merge,
+        manifest_path,
+    )
+
+    output_path = Path(dir_path, output_file)
+    coco_files = find_coco_files(
+        dir_path, name_pattern, exclude=[output_path, manifest_path(output_path)]
+    )
 
     if not coco_files:
         logger.error(f'No files with pattern "{name_pattern}" found in "{dir_path}".')
         exit()
 
-    ann_file_update = add_ann_folder_to_img_name(coco_files[0])
-    files_to_delete = [ann_file_update]
-
-    output_path = str(Path(dir_path, output_file))
-
-    for file in coco_files[1:]:
-        file_to_add = add_ann_folder_to_img_name(file)
+    if incremental:
+        incremental_merge(
+            dir_path, coco_files, output_path, compact, workers, match_supercategory
+        )
+        return
 
-        logger.info(f"Merging {file_to_add} into {ann_file_update}.")
-        coco_merge(ann_file_update, file_to_add, output_path)
-        ann_file_update = output_path
-        files_to_delete.append(file_to_add)
+    merged = merge_coco_files(coco_files, workers, match_supercategory, dedup, dedup_by)
+    if segmentation is not None:
+        # Imported here, only converting segmentations needs it.
+        from cocosuite.core.segmentation import process_segmentations
 
-    delete_merged_files(files_to_delete)
+        merged = process_segmentations(merged, segmentation, workers)
+    merged.write(str(output_path), compact=compact)
     logger.info("Merges done!")
 
 
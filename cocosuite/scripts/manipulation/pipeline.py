@@ -0,0 +1,375 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import fire
+from loguru import logger
+
+from cocosuite.core.dataset import COCODataset
+from cocosuite.core.profiling import stage
+from cocosuite.scripts.manipulation.coco_filter import filter_dataset
+from cocosuite.scripts.manipulation.coco_merge import merge_datasets
+from cocosuite.scripts.manipulation.coco_split import (
+    property_split_images,
+    random_split_images,
+    split_dataset,
+    stratified_split_images,
+)
+from cocosuite.scripts.manipulation.merge_multiple_coco_files import (
+    find_coco_files,
+    merge_coco_files,
+)
+
+STEPS = (
+    "load",
+    "merge",
+    "merge_multiple",
+    "filter",
+    "property_split",
+    "random_split",
+    "stratified_split",
+    "segmentation",
+    "save",
+)
+
+Step = Dict[str, Any]
+
+
+class COCOPipeline:
+    """Chain the manipulation tools on named datasets held in memory.
+
+    Every step reads its input datasets by name and stores its result under a new name,
+    so only the ``save`` steps write files. Split steps store one dataset per split,
+    named "<output>_train" and "<output>_val". The methods return the pipeline, so the
+    steps can be chained:
+
+    Example:
+        >>> (
+        ...     COCOPipeline()
+        ...     .merge_multiple("merged", "shards/")
+        ...     .filter("filtered", "merged", {"width": {"lt": 320}})
+        ...     .random_split("split", "filtered", train_percentage=0.9)
+        ...     .save("split_train", "train.json")
+        ...     .save("split_val", "val.json")
+        ... )
+    """
+
+    def __init__(self) -> None:
+        self.datasets: Dict[str, COCODataset] = {}
+        self.saved: List[str] = []
+
+    def __getitem__(self, name: str) -> COCODataset:
+        if name not in self.datasets:
+            raise KeyError(
+                f'Unknown dataset "{name}", available: {", ".join(self.datasets)}'
+            )
+        return self.datasets[name]
+
+    def load(self, output: str, annotations_file: str) -> "COCOPipeline":
+        """Load a COCO formatted json file.
+
+        Args:
+            output (str): Name of the loaded dataset.
+            annotations_file (str): JSON file containing COCO formatted data.
+
+        Returns:
+            COCOPipeline: The pipeline.
+        """
+        self.datasets[output] = COCODataset.from_file(annotations_file)
+        return self
+
+    def merge(
+        self,
+        output: str,
+        inputs: List[str],
+        match_supercategory: bool = False,
+        dedup: Optional[str] = None,
+        dedup_by: str = "path",
+    ) -> "COCOPipeline":
+        """Merge datasets in the order they are given.
+
+        Args:
+            output (str): Name of the merged dataset.
+            inputs (List[str]): Names of the datasets to merge.
+            match_supercategory (bool, optional): Match categories by name and
+                supercategory instead of only by name. Defaults to False.
+            dedup (Optional[str], optional): Policy for duplicate images, "keep_first"
+                or "union". Defaults to None.
+            dedup_by (str, optional): Find duplicates by "path", "name" or "content",
+                the latter only for datasets loaded from a file. Defaults to "path".
+
+        Returns:
+            COCOPipeline: The pipeline.
+        """
+        datasets = [self[name] for name in inputs]
+        self.datasets[output] = merge_datasets(
+            datasets, match_supercategory, dedup, dedup_by
+        )
+        return self
+
+    def merge_multiple(
+        self,
+        output: str,
+        dir_path: str,
+        name_pattern: str = "*.json",
+        workers: int = 1,
+        match_supercategory: bool = False,
+        dedup: Optional[str] = None,
+        dedup_by: str = "path",
+    ) -> "COCOPipeline":
+        """Merge the annotation files in the subdirectories of a directory.
+
+        Args:
+            output (str): Name of the merged dataset.
+            dir_path (str): Parent directory, contains subdirectories with their own
+                annotations and images.
+            name_pattern (str, optional): Name pattern of the files to merge.
+                Defaults to "*.json".
+            workers (int, optional): Number of processes parsing the files, 0 for one per
+                CPU. Defaults to 1.
+            match_supercategory (bool, optional): Match categories by name and
+                supercategory instead of only by name. Defaults to False.
+            dedup (Optional[str], optional): Policy for duplicate images, "keep_first"
+                or "union". Defaults to None.
+            dedup_by (str, optional): Find duplicates by "path", "name" or "content".
+                Defaults to "path".
+
+        Returns:
+            COCOPipeline: The pipeline.
+        """
+        coco_files = find_coco_files(dir_path, name_pattern)
+        if not coco_files:
+            raise FileNotFoundError(
+                f'No files with pattern "{name_pattern}" found in "{dir_path}"'
+            )
+        self.datasets[output] = merge_coco_files(
+            coco_files, workers, match_supercategory, dedup, dedup_by
+        )
+        return self
+
+    def filter(
+        self,
+        output: str,
+        input: str,
+        filter: Dict[str, Any],
+        match_all: bool = False,
+    ) -> "COCOPipeline":
+        """Remove the images matching the filter criteria and their annotations.
+
+        Args:
+            output (str): Name of the filtered dataset.
+            input (str): Name of the dataset to filter.
+            filter (Dict[str, Any]): Criteria of the images to remove, as in the filter
+                config files.
+            match_all (bool, optional): Remove only the images matching every criterion
+                instead of any of them. Defaults to False.
+
+        Returns:
+            COCOPipeline: The pipeline.
+        """
+        self.datasets[output] = filter_dataset(self[input], filter, match_all)
+        return self
+
+    def _split(self, output: str, dataset: COCODataset, splits: Dict[str, Any]) -> None:
+        for name, subset in split_dataset(dataset, splits).items():
+            self.datasets[f"{output}_{name}"] = subset
+
+    def property_split(
+        self,
+        output: str,
+        input: str,
+        criteria: Dict[str, Any],
+        match_all: bool = False,
+    ) -> "COCOPipeline":
+        """Split a dataset into train and val based on the property criteria.
+
+        Args:
+            output (str): Prefix of the names of the splits.
+            input (str): Name of the dataset to split.
+            criteria (Dict[str, Any]): Criteria of the val images, as in the split config
+                files.
+            match_all (bool, optional): Put in val only the images matching every
+                criterion instead of any of them. Defaults to False.
+
+        Returns:
+            COCOPipeline: The pipeline.
+        """
+        dataset = self[input]
+        self._split(
+            output, dataset, property_split_images(dataset, criteria, match_all)
+        )
+        return self
+
+    def random_split(
+        self,
+        output: str,
+        input: str,
+        train_percentage: float = 0.8,
+        seed: int = 47,
+    ) -> "COCOPipeline":
+        """Split a dataset randomly into train and val.
+
+        Args:
+            output (str): Prefix of the names of the splits.
+            input (str): Name of the dataset to split.
+            train_percentage (float, optional): Percentage of data to be used for
+                training. Defaults to 0.8.
+            seed (int, optional): Seed for random number generation. Defaults to 47.
+
+        Returns:
+            COCOPipeline: The pipeline.
+        """
+        dataset = self[input]
+        self._split(
+            output, dataset, random_split_images(dataset, train_percentage, seed)
+        )
+        return self
+
+    def stratified_split(
+        self,
+        output: str,
+        input: str,
+        train_percentage: float = 0.8,
+        seed: int = 47,
+    ) -> "COCOPipeline":
+        """Split a dataset into train and val balancing the annotations of each category.
+
+        Args:
+            output (str): Prefix of the names of the splits.
+            input (str): Name of the dataset to split.
+            train_percentage (float, optional): Percentage of data to be used for
+                training. Defaults to 0.8.
+            seed (int, optional): Seed for random number generation. Defaults to 47.
+
+        Returns:
+            COCOPipeline: The pipeline.
+        """
+        dataset = self[input]
+        splits = stratified_split_images(dataset, train_percentage, seed)
+        self._split(output, dataset, splits)
+        return self
+
+    def segmentation(
+        self, output: str, input: str, mode: str = "rle", workers: int = 1
+    ) -> "COCOPipeline":
+        """Convert the segmentations of a dataset, recomputing their area and bbox.
+
+        Args:
+            output (str): Name of the processed dataset.
+            input (str): Name of the dataset to process.
+            mode (str, optional): "rle" to encode polygons as compressed RLE, "polygon"
+                to trace RLE masks as polygons or "geometry" to only recompute the area
+                and bbox. Defaults to "rle".
+            workers (int, optional): Number of processes, 0 for one per CPU.
+                Defaults to 1.
+
+        Returns:
+            COCOPipeline: The pipeline.
+        """
+        # Imported here, only converting segmentations needs it.
+        from cocosuite.core.segmentation import process_segmentations
+
+        self.datasets[output] = process_segmentations(self[input], mode, workers)
+        return self
+
+    def save(
+        self, input: str, output_file: str, compact: bool = False
+    ) -> "COCOPipeline":
+        """Write a dataset into a COCO formatted json file.
+
+        Args:
+            input (str): Name of the dataset to write.
+            output_file (str): Path of the output json file.
+            compact (bool, optional): Write without indentation. Defaults to False.
+
+        Returns:
+            COCOPipeline: The pipeline.
+        """
+        Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+        self[input].write(output_file, compact=compact)
+        self.saved.append(output_file)
+        logger.info(f'Saved "{input}" into {output_file}')
+        return self
+
+    def run(self, steps: List[Step]) -> "COCOPipeline":
+        """Run the steps of a pipeline config.
+
+        Each step is a dict with the name of the method in "step" and its arguments.
+        A dataset is released as soon as no later step reads it, so intermediate
+        results do not pile up in memory.
+
+        Args:
+            steps (List[Step]): Steps to run, in order.
+
+        Returns:
+            COCOPipeline: The pipeline.
+        """
+        for i, step in enumerate(steps):
+            if step.get("step") not in STEPS:
+                raise ValueError(
+                    f'Unknown step "{step.get("step")}" at position {i}, '
+                    f"expected one of: {', '.join(STEPS)}"
+                )
+
+        last_read: Dict[str, int] = {}
+        for i, step in enumerate(steps):
+            for name in _inputs(step):
+                last_read[name] = i
+
+        for i, step in enumerate(steps):
+            arguments = {k: v for k, v in step.items() if k != "step"}
+            logger.info(f"Step {i + 1}/{len(steps)}: {step['step']}")
+            with stage(step["step"]):
+                getattr(self, step["step"])(**arguments)
+            for name in [name for name, last in last_read.items() if last == i]:
+                self.datasets.pop(name, None)
+        return self
+
+
+def _inputs(step: Step) -> List[str]:
+    names = step.get("inputs", [])
+    if "input" in step:
+        names = [step["input"], *names]
+    return names
+
+
+def load_config(config_file: str) -> Dict[str, Any]:
+    """Load a pipeline config from a JSON or YAML file.
+
+    Args:
+        config_file (str): Config file, YAML if its suffix is ".yaml" or ".yml".
+
+    Returns:
+        Dict[str, Any]: The config.
+    """
+    with open(config_file, "r") as f:
+        if Path(config_file).suffix not in (".yaml", ".yml"):
+            return json.load(f)
+        try:
+            import yaml  # type: ignore[import-untyped]
+        except ImportError as e:
+            raise ImportError(
+                "YAML pipeline configs need PyYAML: pip install cocosuite[yaml]"
+            ) from e
+        return yaml.safe_load(f)
+
+
+def run_pipeline(config_file: str) -> List[str]:
+    """Run a pipeline config, keeping every intermediate dataset in memory.
+
+    The config has a "steps" list, each step naming a method of ``COCOPipeline`` in
+    "step" next to its arguments. Only the "save" steps write files.
+
+    Args:
+        config_file (str): JSON or YAML config file.
+
+    Returns:
+        List[str]: Paths of the saved files.
+    """
+    config = load_config(config_file)
+    pipeline = COCOPipeline().run(config["steps"])
+    return pipeline.saved
+
+
+if __name__ == "__main__":
+    fire.Fire(run_pipeline)
@@ -0,0 +1,150 @@
+import json
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import fire
+from loguru import logger
+
+from cocosuite.core.dataset import COCODataset
+from cocosuite.core.image_headers import Size, image_size
+from cocosuite.core.parallel import ordered_map
+from cocosuite.core.profiling import stage
+from cocosuite.core.writer import resolve_output_path
+
+SCAN_WORKERS = 16
+SCAN_BATCH_SIZE = 256
+STATUSES = ("ok", "mismatch", "missing", "unreadable")
+
+Scan = Tuple[str, Optional[Size]]
+
+
+def _scan_batch(files: List[str]) -> List[Scan]:
+    scans: List[Scan] = []
+    for file in files:
+        try:
+            size = image_size(file)
+        except FileNotFoundError:
+            scans.append(("missing", None))
+            continue
+        except OSError:
+            size = None
+        scans.append(("unreadable", None) if size is None else ("ok", size))
+    return scans
+
+
+def scan_images(
+    images: List[Dict[str, Any]], image_dir: str, workers: int = SCAN_WORKERS
+) -> Iterator[Scan]:
+    """Read the size of every image from the header of its file.
+
+    Files are read in batches by a thread pool, the results come in image order.
+
+    Args:
+        images (List[Dict[str, Any]]): Images of a dataset.
+        image_dir (str): Directory the file names of the images are relative to.
+        workers (int, optional): Number of threads reading files. Defaults to 16.
+
+    Yields:
+        Scan: "ok" with the width and height of the image, or "missing" or
+            "unreadable" with None.
+    """
+    files = [os.path.join(image_dir, img.get("file_name", "")) for img in images]
+    batches = (
+        files[i : i + SCAN_BATCH_SIZE] for i in range(0, len(files), SCAN_BATCH_SIZE)
+    )
+    for scans in ordered_map(_scan_batch, batches, workers, threads=True):
+        yield from scans
+
+
+def verify_images(
+    annotations_file: str,
+    image_dir: Optional[str] = None,
+    workers: int = SCAN_WORKERS,
+    backfill: bool = False,
+    output_filename: str = "verified_annotations.json",
+    report_file: Optional[str] = None,
+    compact: bool = False,
+) -> Dict[str, int]:
+    """Check the width and height of the images of a COCO file against their files.
+
+    Only the headers of the PNG, JPEG, GIF, BMP and WebP files are read, the images are
+    not decoded. Missing files, files whose size cannot be read and images whose width
+    or height is wrong or missing are logged. With ``backfill`` the sizes read are
+    written into a copy of the file.
+
+    Args:
+        annotations_file (str): JSON file containing COCO formatted data.
+        image_dir (Optional[str], optional): Directory the image file names are relative
+            to. Defaults to the directory of the annotations file.
+        workers (int, optional): Number of threads reading image files. Defaults to 16.
+        backfill (bool, optional): Write the annotations with the sizes read from the
+            files. Defaults to False.
+        output_filename (str, optional): Name of the output json file.
+            Defaults to "verified_annotations.json".
+        report_file (Optional[str], optional): JSON file to save the file names of the
+            missing and unreadable images and the mismatches into. Defaults to None.
+        compact (bool, optional): Write the output without indentation. Defaults to False.
+
+    Returns:
+        Dict[str, int]: Number of images of each status, "ok", "mismatch", "missing"
+            and "unreadable".
+    """
+    dataset = COCODataset.from_file(annotations_file, streaming=True)
+    if image_dir is None:
+        image_dir = str(Path(annotations_file).parent)
+
+    counts: Counter = Counter({status: 0 for status in STATUSES})
+    report: Dict[str, List[Any]] = {"missing": [], "unreadable": [], "mismatch": []}
+    with stage("headers") as profile:
+        scans = scan_images(dataset.images, image_dir, workers)
+        for i, (img, (status, size)) in enumerate(zip(dataset.images, scans)):
+            if size is not None and size != (img.get("width"), img.get("height")):
+                status = "mismatch"
+                report["mismatch"].append(
+                    {
+                        "id": img["id"],
+                        "file_name": img.get("file_name"),
+                        "width": img.get("width"),
+                        "height": img.get("height"),
+                        "file_width": size[0],
+                        "file_height": size[1],
+                    }
+                )
+                if backfill:
+                    dataset.images[i] = dict(img, width=size[0], height=size[1])
+            elif status != "ok":
+                report[status].append(img.get("file_name"))
+            counts[status] += 1
+        profile.records = len(dataset.images)
+
+    logger.info(
+        "{} images: {} ok, {} mismatched, {} missing, {} unreadable".format(
+            len(dataset.images), *(counts[status] for status in STATUSES)
+        )
+    )
+    for status in ("missing", "unreadable"):
+        for file_name in report[status][:10]:
+            logger.warning(f"{status.capitalize()} image file: {file_name}")
+    for mismatch in report["mismatch"][:10]:
+        logger.warning(
+            "Size of {file_name} is {width}x{height}, "
+            "{file_width}x{file_height} in the file".format(**mismatch)
+        )
+
+    if report_file is not None:
+        with open(report_file, "w") as f:
+            json.dump({"counts": counts, **report}, f, indent=2, ensure_ascii=False)
+        logger.info(f"Saved the report into {report_file}")
+
+    if backfill:
+        output_file = resolve_output_path(output_filename, annotations_file)
+        dataset.write(str(output_file), compact=compact)
+        logger.info(f"Saved {counts['mismatch']} updated images into {output_file}")
+
+    return dict(counts)
+
+
+if __name__ == "__main__":
+    fire.Fire(verify_images)
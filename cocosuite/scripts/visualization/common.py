@@ -1,6 +1,27 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
 from matplotlib import pyplot as plt
+from matplotlib.colors import LogNorm
+
+Values = Union[Sequence, np.ndarray]
+
+MAX_BARS = 200
+MAX_SCATTER_POINTS = 100_000
+
+
+def show_or_save(output_file: Optional[str] = None) -> None:
+    """Show the current figure, or save it to ``output_file`` and release it.
+
+    Args:
+        output_file (Optional[str], optional): File to save the figure to, its format is
+            taken from the extension. Defaults to None.
+    """
+    if output_file is None:
+        plt.show()
+    else:
+        plt.savefig(output_file)
+        plt.close()
 
 
 def plot_bar_chart(
@@ -10,6 +31,7 @@ def plot_bar_chart(
     title: str,
     rotation: int = 45,
     figsize: Tuple = (20, 10),
+    output_file: Optional[str] = None,
 ) -> None:
     """Plot a bar chart.
 
@@ -20,6 +42,8 @@ def plot_bar_chart(
         title (str): Title of the plot.
         rotation (int, optional): Rotation of the x-axis labels. Defaults to 45.
         figsize (Tuple, optional): Size of the figure. Defaults to (20, 10).
+        output_file (Optional[str], optional): Save the chart to this file instead of
+            showing it. Defaults to None.
     """
     plt.figure(figsize=figsize)
     plt.bar(data.keys(), data.values())
@@ -28,44 +52,145 @@ def plot_bar_chart(
     plt.ylabel(y_label)
     plt.title(title)
     plt.tight_layout()
-    plt.show()
+    show_or_save(output_file)
+
+
+def plot_histogram(
+    values: Values,
+    x_label: str,
+    y_label: str,
+    title: str,
+    bins: int = 50,
+    figsize: Tuple = (20, 10),
+    output_file: Optional[str] = None,
+) -> None:
+    """Plot a histogram, binned with NumPy so only the bin counts reach matplotlib.
+
+    Args:
+        values (Values): Values to count.
+        x_label (str): Label for the x-axis.
+        y_label (str): Label for the y-axis.
+        title (str): Title of the plot.
+        bins (int, optional): Number of bins. Integer values spanning fewer distinct
+            numbers get one bin each. Defaults to 50.
+        figsize (Tuple, optional): Size of the figure. Defaults to (20, 10).
+        output_file (Optional[str], optional): Save the chart to this file instead of
+            showing it. Defaults to None.
+    """
+    array = np.asarray(values)
+    edges: object = bins
+    if array.dtype.kind in "iu" and len(array):
+        low, high = int(array.min()), int(array.max())
+        if high - low < bins:
+            edges = np.arange(low, high + 2) - 0.5
+    counts, edges = np.histogram(array, bins=edges)  # type: ignore[arg-type]
+
+    plt.figure(figsize=figsize)
+    plt.stairs(counts, edges, fill=True)
+    plt.xlabel(x_label)
+    plt.ylabel(y_label)
+    plt.title(title)
+    plt.tight_layout()
+    show_or_save(output_file)
+
+
+def _label_codes(
+    labels: Values, label_names: Optional[List]
+) -> Tuple[np.ndarray, List]:
+    if label_names is not None:
+        return np.asarray(labels, dtype=np.int64), list(label_names)
+    names = list(dict.fromkeys(labels))
+    index = {name: i for i, name in enumerate(names)}
+    codes = np.fromiter((index[label] for label in labels), np.int64, len(labels))
+    return codes, names
 
 
 def plot_scatter_chart(
-    x_data: List,
-    y_data: List,
-    labels: List,
+    x_data: Values,
+    y_data: Values,
+    labels: Values,
     x_label: str,
     y_label: str,
     title: str,
     legend_title: Optional[str] = None,
     figsize: Tuple = (20, 10),
+    output_file: Optional[str] = None,
+    label_names: Optional[List] = None,
+    mode: str = "auto",
+    max_points: Optional[int] = None,
+    bins: int = 100,
+    seed: int = 47,
 ) -> None:
-    """Plot a scatter chart.
+    """Plot a scatter chart, or its density for large amounts of points.
+
+    In "scatter" mode the points are grouped by label with NumPy and drawn with one call
+    per label. In "hist2d" mode they are binned with ``np.histogram2d`` and in "hexbin"
+    mode with hexagonal bins, both on a log color scale and regardless of their label.
 
     Args:
-        x_data (List): Data for the x-axis.
-        y_data (List): Data for the y-axis.
-        labels (List): Labels for each data point.
+        x_data (Values): Data for the x-axis.
+        y_data (Values): Data for the y-axis.
+        labels (Values): Labels for each data point.
         x_label (str): Label for the x-axis.
         y_label (str): Label for the y-axis.
         title (str): Title of the plot.
         legend_title (str, optional): Title of the legend. Defaults to None.
         figsize (Tuple, optional): Size of the figure. Defaults to (20, 10).
+        output_file (Optional[str], optional): Save the chart to this file instead of
+            showing it. Defaults to None.
+        label_names (Optional[List], optional): Names of the labels, when ``labels`` are
+            positions in this list instead of the labels themselves. Defaults to None.
+        mode (str, optional): "scatter", "hist2d", "hexbin" or "auto", which is
+            "scatter" up to ``MAX_SCATTER_POINTS`` points (after downsampling) and
+            "hist2d" above. Defaults to "auto".
+        max_points (Optional[int], optional): Draw a random sample of at most this many
+            points in "scatter" mode. Defaults to None.
+        bins (int, optional): Number of bins per axis of the density modes.
+            Defaults to 100.
+        seed (int, optional): Seed of the downsampling. Defaults to 47.
     """
-    unique_categories = List(set(labels))
+    x = np.asarray(x_data, dtype=np.float64)
+    y = np.asarray(y_data, dtype=np.float64)
+    if mode == "auto":
+        n_points = min(len(x), max_points) if max_points else len(x)
+        mode = "scatter" if n_points <= MAX_SCATTER_POINTS else "hist2d"
     plt.figure(figsize=figsize)
 
-    for category in unique_categories:
-        idx = [i for i, label in enumerate(labels) if label == category]
-        x_values = [x_data[i] for i in idx]
-        y_values = [y_data[i] for i in idx]
-        plt.scatter(x_values, y_values, label=category)
+    if mode == "scatter":
+        codes, names = _label_codes(labels, label_names)
+        if max_points is not None and len(x) > max_points:
+            rng = np.random.default_rng(seed)
+            sample = np.sort(rng.choice(len(x), max_points, replace=False))
+            x, y, codes = x[sample], y[sample], codes[sample]
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(names) + 1))
+        # Labels are drawn in order of first appearance, as the colors are assigned.
+        first = np.full(len(names), len(codes))
+        np.minimum.at(first, codes, np.arange(len(codes)))
+        for code in np.argsort(first, kind="stable").tolist():
+            start, end = bounds[code], bounds[code + 1]
+            if start < end:
+                idx = order[start:end]
+                plt.scatter(x[idx], y[idx], label=names[code])
+        if legend_title:
+            plt.legend(title=legend_title, loc="upper left", bbox_to_anchor=(1, 1))
+    elif mode == "hist2d":
+        counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+        if counts.any():
+            mesh = plt.pcolormesh(
+                x_edges, y_edges, np.ma.masked_equal(counts.T, 0), norm=LogNorm()
+            )
+            plt.colorbar(mesh, label="Count")
+    elif mode == "hexbin":
+        if len(x):
+            plt.colorbar(
+                plt.hexbin(x, y, gridsize=bins, mincnt=1, bins="log"), label="Count"
+            )
+    else:
+        raise ValueError(f'Unknown plot mode "{mode}"')
 
     plt.xlabel(x_label)
     plt.ylabel(y_label)
     plt.title(title)
-    if legend_title:
-        plt.legend(title=legend_title, loc="upper left", bbox_to_anchor=(1, 1))
     plt.tight_layout()
-    plt.show()
+    show_or_save(output_file)
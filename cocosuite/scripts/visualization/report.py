@@ -0,0 +1,156 @@
+import html
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import fire
+import matplotlib
+from loguru import logger
+
+from cocosuite.core.parallel import ordered_map
+from cocosuite.core.profiling import stage
+from cocosuite.core.statistics import DatasetStatistics
+from cocosuite.scripts.visualization.visualization import (
+    plot_annotations_per_img,
+    plot_bbox_size_distribution_by_category,
+    plot_cat_distribution,
+    plot_img_size_distribution,
+    plot_img_size_distribution_by_category,
+)
+
+CHARTS: Dict[str, Tuple[str, Callable]] = {
+    "categories": ("Category distribution", plot_cat_distribution),
+    "image_sizes": ("Image size distribution", plot_img_size_distribution),
+    "annotations_per_image": ("Annotations per image", plot_annotations_per_img),
+    "image_sizes_by_category": (
+        "Image size distribution by category",
+        plot_img_size_distribution_by_category,
+    ),
+    "bbox_sizes_by_category": (
+        "Bounding box size distribution by category",
+        plot_bbox_size_distribution_by_category,
+    ),
+}
+
+ReportTask = Tuple[str, str, str]
+
+_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>COCO dataset report</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+img {{ max-width: 100%; border: 1px solid #ddd; }}
+</style>
+</head>
+<body>
+<h1>COCO dataset report</h1>
+{sections}
+</body>
+</html>
+"""
+
+
+def render_charts(task: ReportTask) -> str:
+    """Load an annotation file and render all its charts into a directory.
+
+    The charts are drawn with the non-interactive Agg backend, since they are only
+    saved to files.
+
+    Args:
+        task (ReportTask): Annotation file, output directory and image format.
+
+    Returns:
+        str: Summary of the numbers of images, annotations and categories of the file.
+    """
+    annotations_file, chart_dir, image_format = task
+    matplotlib.use("Agg")
+    stats = DatasetStatistics.from_file(annotations_file)
+    Path(chart_dir).mkdir(parents=True, exist_ok=True)
+    for chart, (_, plot) in CHARTS.items():
+        with stage(f"render {chart}"):
+            plot(stats, output_file=str(Path(chart_dir, f"{chart}.{image_format}")))
+    return (
+        f"{len(stats.image_names)} images, {stats.n_annotations} annotations, "
+        f"{len(stats.category_names)} categories"
+    )
+
+
+def _chart_dirs(annotations_files: Sequence[str], output_dir: Path) -> List[Path]:
+    dirs: List[Path] = []
+    for annotations_file in annotations_files:
+        chart_dir = output_dir / Path(annotations_file).stem
+        if chart_dir in dirs:
+            chart_dir = chart_dir.with_name(f"{chart_dir.name}_{len(dirs)}")
+        dirs.append(chart_dir)
+    return dirs
+
+
+def _html_section(
+    annotations_file: str, summary: str, chart_dir: str, image_format: str
+) -> str:
+    figures = "\n".join(
+        f'<figure><img src="{html.escape(f"{chart_dir}/{chart}.{image_format}")}" '
+        f'alt="{title}"><figcaption>{title}</figcaption></figure>'
+        for chart, (title, _) in CHARTS.items()
+    )
+    return (
+        f"<section>\n<h2>{html.escape(annotations_file)}</h2>\n"
+        f"<p>{summary}</p>\n{figures}\n</section>"
+    )
+
+
+def report(
+    *annotations_files: str,
+    output_dir: str = "report",
+    image_format: str = "png",
+    workers: int = 0,
+) -> str:
+    """Render every chart of one or many annotation files and an HTML index of them.
+
+    The charts are drawn with a non-interactive backend, so no display is needed. The
+    files are processed in a process pool, each worker loading a file once and
+    rendering all its charts.
+
+    Args:
+        *annotations_files (str): JSON files containing COCO formatted data.
+        output_dir (str, optional): Directory of the report. Defaults to "report".
+        image_format (str, optional): Format of the charts, e.g. "png" or "svg".
+            Defaults to "png".
+        workers (int, optional): Number of processes, 0 for one per CPU. Defaults to 0.
+
+    Returns:
+        str: Path of the HTML index.
+    """
+    report_dir = Path(output_dir)
+    chart_dirs = _chart_dirs(annotations_files, report_dir)
+    tasks = [
+        (annotations_file, str(chart_dir), image_format)
+        for annotations_file, chart_dir in zip(annotations_files, chart_dirs)
+    ]
+    summaries: List[str] = []
+    for annotations_file, summary in zip(
+        annotations_files, ordered_map(render_charts, tasks, workers, prefetch=1)
+    ):
+        logger.info(f"Rendered the charts of {annotations_file}")
+        summaries.append(summary)
+
+    sections = [
+        _html_section(
+            annotations_file,
+            summary,
+            chart_dir.relative_to(report_dir).as_posix(),
+            image_format,
+        )
+        for annotations_file, summary, chart_dir in zip(
+            annotations_files, summaries, chart_dirs
+        )
+    ]
+    index_file = report_dir / "index.html"
+    index_file.write_text(_PAGE.format(sections="\n".join(sections)), encoding="utf-8")
+    logger.info(f"Report saved into {index_file}")
+    return str(index_file)
+
+
+if __name__ == "__main__":
+    fire.Fire(report)
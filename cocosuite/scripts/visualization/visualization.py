@@ -1,129 +1,197 @@
-import json
+from typing import Optional, Union
 
-from common import plot_bar_chart, plot_scatter_chart
+from cocosuite.core.statistics import DatasetStatistics
+from cocosuite.scripts.visualization.common import (
+    MAX_BARS,
+    plot_bar_chart,
+    plot_histogram,
+    plot_scatter_chart,
+)
 
+StatisticsSource = Union[str, DatasetStatistics]
 
-def plot_cat_distribution(annotations_file: str) -> None:
-    """Plot the distribution of categories in the input json file.
+
+def load_statistics(source: StatisticsSource) -> DatasetStatistics:
+    """Get the statistics of a dataset, computing them if a file is given.
 
     Args:
-        annotations_file (str): JSON file containing COCO formatted data.
+        source (StatisticsSource): JSON file containing COCO formatted data or its
+            already computed statistics.
+
+    Returns:
+        DatasetStatistics: The statistics of the dataset.
     """
-    with open(annotations_file, "r") as f:
-        coco_data = json.load(f)
+    if isinstance(source, DatasetStatistics):
+        return source
+    return DatasetStatistics.from_file(source)
 
-    categories = {cat["name"]: 0 for cat in coco_data["categories"]}
-    for ann in coco_data["annotations"]:
-        categories[coco_data["categories"][ann["category_id"] - 1]["name"]] += 1
 
-    plot_bar_chart(categories, "Categories", "Count", "Category Distribution")
+def plot_cat_distribution(
+    annotations_file: StatisticsSource, output_file: Optional[str] = None
+) -> None:
+    """Plot the distribution of categories in the input json file.
 
+    Args:
+        annotations_file (StatisticsSource): JSON file containing COCO formatted data or
+            its statistics.
+        output_file (Optional[str], optional): Save the chart to this file instead of
+            showing it. Defaults to None.
+    """
+    stats = load_statistics(annotations_file)
 
-def plot_img_size_distribution(annotation_file: str) -> None:
+    plot_bar_chart(
+        stats.category_distribution(),
+        "Categories",
+        "Count",
+        "Category Distribution",
+        output_file=output_file,
+    )
+
+
+def plot_img_size_distribution(
+    annotation_file: StatisticsSource, output_file: Optional[str] = None
+) -> None:
     """Plot the distribution of image sizes in the input json file.
 
     Args:
-        annotation_file (str): JSON file containing COCO formatted data.
+        annotation_file (StatisticsSource): JSON file containing COCO formatted data or
+            its statistics.
+        output_file (Optional[str], optional): Save the chart to this file instead of
+            showing it. Defaults to None.
     """
-    with open(annotation_file, "r") as f:
-        coco_data = json.load(f)
-
-    image_sizes: dict = {}
-    for image in coco_data["images"]:
-        size = (image["width"], image["height"])
-        if size in image_sizes:
-            image_sizes[size] += 1
-        else:
-            image_sizes[size] = 1
+    stats = load_statistics(annotation_file)
 
-    img_data = {f"{size[0]}x{size[1]}": count for size, count in image_sizes.items()}
-
-    plot_bar_chart(img_data, "Image Size", "Count", "Image Size Distribution")
+    plot_bar_chart(
+        stats.image_size_distribution(),
+        "Image Size",
+        "Count",
+        "Image Size Distribution",
+        output_file=output_file,
+    )
 
 
-def plot_annotations_per_img(annotation_file: str) -> None:
+def plot_annotations_per_img(
+    annotation_file: StatisticsSource,
+    output_file: Optional[str] = None,
+    mode: str = "auto",
+) -> None:
     """Plot the number of annotations per image in the input json file.
 
     Args:
-        annotation_file (str): JSON file containing COCO formatted data.
+        annotation_file (StatisticsSource): JSON file containing COCO formatted data or
+            its statistics.
+        output_file (Optional[str], optional): Save the chart to this file instead of
+            showing it. Defaults to None.
+        mode (str, optional): "bar" for one bar per image, "histogram" for the number of
+            images by annotation count or "auto", which is "bar" up to ``MAX_BARS``
+            images. Defaults to "auto".
     """
-    with open(annotation_file, "r") as f:
-        coco_data = json.load(f)
-
-    annotations_per_img = {img["file_name"]: 0 for img in coco_data["images"]}
-    for ann in coco_data["annotations"]:
-        annotations_per_img[coco_data["images"][ann["image_id"] - 1]["file_name"]] += 1
+    stats = load_statistics(annotation_file)
+
+    if mode == "auto":
+        mode = "bar" if len(stats.image_names) <= MAX_BARS else "histogram"
+    if mode == "histogram":
+        plot_histogram(
+            stats.annotations_per_image,
+            "Number of Annotations",
+            "Images",
+            "Number of Annotations per Image",
+            output_file=output_file,
+        )
+        return
+    if mode != "bar":
+        raise ValueError(f'Unknown plot mode "{mode}"')
 
     plot_bar_chart(
-        annotations_per_img,
+        stats.annotations_per_image_distribution(),
         "Images",
         "Number of Annotations",
         "Number of Annotations per Image",
+        output_file=output_file,
     )
 
 
-def plot_img_size_distribution_by_category(annotation_file: str) -> None:
+def plot_img_size_distribution_by_category(
+    annotation_file: StatisticsSource,
+    output_file: Optional[str] = None,
+    mode: str = "auto",
+    max_points: Optional[int] = None,
+) -> None:
     """Plot the distribution of image sizes by category in the input json file.
 
     Args:
-        annotation_file (str): JSON file containing COCO formatted data.
+        annotation_file (StatisticsSource): JSON file containing COCO formatted data or
+            its statistics.
+        output_file (Optional[str], optional): Save the chart to this file instead of
+            showing it. Defaults to None.
+        mode (str, optional): "scatter", "hist2d", "hexbin" or "auto", see
+            ``plot_scatter_chart``. Defaults to "auto".
+        max_points (Optional[int], optional): Draw a random sample of at most this many
+            points in "scatter" mode. Defaults to None.
     """
-    with open(annotation_file, "r") as f:
-        coco_data = json.load(f)
-
-    category_names = {cat["id"]: cat["name"] for cat in coco_data["categories"]}
-
-    widths = []
-    heights = []
-    categories = []
-
-    for ann in coco_data["annotations"]:
-        image = next(
-            (img for img in coco_data["images"] if img["id"] == ann["image_id"]), None
-        )
-        if image:
-            widths.append(image["width"])
-            heights.append(image["height"])
-            categories.append(category_names[ann["category_id"]])
+    stats = load_statistics(annotation_file)
 
     plot_scatter_chart(
-        widths,
-        heights,
-        categories,
+        stats.ann_image_width,
+        stats.ann_image_height,
+        stats.ann_image_category,
         "Width",
         "Height",
         "Image Size Distribution by Category",
         "Categories",
+        output_file=output_file,
+        label_names=stats.category_names,
+        mode=mode,
+        max_points=max_points,
     )
 
 
-def plot_bbox_size_distribution_by_category(annotation_file: str) -> None:
+def plot_bbox_size_distribution_by_category(
+    annotation_file: StatisticsSource,
+    output_file: Optional[str] = None,
+    mode: str = "auto",
+    max_points: Optional[int] = None,
+) -> None:
     """Plot the distribution of bounding box sizes by category in the input json file.
 
     Args:
-        annotation_file (str): JSON file containing COCO formatted data.
+        annotation_file (StatisticsSource): JSON file containing COCO formatted data or
+            its statistics.
+        output_file (Optional[str], optional): Save the chart to this file instead of
+            showing it. Defaults to None.
+        mode (str, optional): "scatter", "hist2d", "hexbin" or "auto", see
+            ``plot_scatter_chart``. Defaults to "auto".
+        max_points (Optional[int], optional): Draw a random sample of at most this many
+            points in "scatter" mode. Defaults to None.
     """
-    with open(annotation_file, "r") as f:
-        coco_data = json.load(f)
-
-    category_names = {cat["id"]: cat["name"] for cat in coco_data["categories"]}
-
-    bbox_widths = []
-    bbox_heights = []
-    categories = []
-
-    for ann in coco_data["annotations"]:
-        bbox = ann["bbox"]
-        bbox_widths.append(bbox[2])
-        bbox_heights.append(bbox[3])
-        categories.append(category_names[ann["category_id"]])
+    stats = load_statistics(annotation_file)
 
     plot_scatter_chart(
-        bbox_widths,
-        bbox_heights,
-        categories,
+        stats.bbox_width,
+        stats.bbox_height,
+        stats.bbox_category,
         "Width",
         "Height",
         "Bounding Box Size Distribution",
         "Categories",
+        output_file=output_file,
+        label_names=stats.category_names,
+        mode=mode,
+        max_points=max_points,
     )
+
+
+def plot_all(annotation_file: StatisticsSource) -> None:
+    """Plot every chart of the input json file, loading it only once.
+
+    Args:
+        annotation_file (StatisticsSource): JSON file containing COCO formatted data or
+            its statistics.
+    """
+    stats = load_statistics(annotation_file)
+
+    plot_cat_distribution(stats)
+    plot_img_size_distribution(stats)
+    plot_annotations_per_img(stats)
+    plot_img_size_distribution_by_category(stats)
+    plot_bbox_size_distribution_by_category(stats)
@@ -1,3 +1,6 @@
+import json
+from pathlib import Path
+
 import pytest
 
 
@@ -62,3 +65,14 @@ def sample_config():
         "filter": {"file_name": ["image1"], "width": [800, 1024]},
         "match_all": True,
     }
+
+
+@pytest.fixture
+def write_json():
+    def write(path, data):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data))
+        return str(path)
+
+    return write
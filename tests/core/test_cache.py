@@ -0,0 +1,74 @@
+import json
+import os
+from pathlib import Path
+
+from cocosuite.core import dataset as dataset_module
+from cocosuite.core.cache import build_cache, cache_path, load_cache, save_cache
+from cocosuite.core.dataset import COCODataset
+
+
+def test_cache_round_trip(sample_data, tmp_path, write_json):
+    sample_data["images"][0].update(license=1, flickr_url="http://example.com/ñ.jpg")
+    sample_data["images"][1]["coco_url"] = None
+    sample_data["annotations"][0].update(
+        bbox=[1, 2, 3.5, 4], area=14.0, iscrowd=0, segmentation=[[1, 2, 3, 4, 5, 6]]
+    )
+    sample_data["annotations"][1].update(area=2, iscrowd=True, big=2**70)
+    sample_data["annotations"][2]["segmentation"] = {"counts": "abc", "size": [2, 2]}
+    sample_data["annotations"][3]["bbox"] = [0, 0, 2**63, 1.0]
+    sample_data["categories"].append({})
+    annotations_file = write_json(tmp_path / "ann.json", sample_data)
+
+    save_cache(COCODataset(json.loads(json.dumps(sample_data))), annotations_file)
+    data = load_cache(annotations_file)
+
+    assert data == sample_data
+    assert list(data) == list(sample_data)
+    assert [list(img) for img in data["images"]] == [
+        list(img) for img in sample_data["images"]
+    ]
+    assert data["annotations"][1]["iscrowd"] is True
+    assert type(data["annotations"][0]["area"]) is float
+    assert [type(v) for v in data["annotations"][0]["bbox"]] == [int, int, float, int]
+
+
+def test_cache_used_by_from_file(sample_data, tmp_path, monkeypatch, write_json):
+    annotations_file = write_json(tmp_path / "ann.json", sample_data)
+    assert build_cache(annotations_file) == str(cache_path(annotations_file))
+
+    def fail(f):
+        raise AssertionError("the JSON file should not be parsed")
+
+    monkeypatch.setattr(dataset_module.json, "load", fail)
+    assert COCODataset.from_file(annotations_file).to_dict() == sample_data
+
+
+def test_cache_invalidated_by_changes(sample_data, tmp_path, write_json):
+    annotations_file = write_json(tmp_path / "ann.json", sample_data)
+    build_cache(annotations_file)
+    stat = os.stat(annotations_file)
+
+    sample_data["images"][0]["file_name"] = "image0.jpg"
+    write_json(annotations_file, sample_data)
+    os.utime(annotations_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert load_cache(annotations_file) is None
+    assert COCODataset.from_file(annotations_file).to_dict() == sample_data
+
+
+def test_cache_missing_or_corrupt(sample_data, tmp_path, write_json):
+    annotations_file = write_json(tmp_path / "ann.json", sample_data)
+    assert load_cache(annotations_file) is None
+
+    cache_path(annotations_file).write_bytes(b"not a cache")
+    assert load_cache(annotations_file) is None
+    assert COCODataset.from_file(annotations_file).to_dict() == sample_data
+
+
+def test_cache_truncated(sample_data, tmp_path, write_json):
+    annotations_file = write_json(tmp_path / "ann.json", sample_data)
+    cache_file = Path(build_cache(annotations_file))
+    cache_file.write_bytes(cache_file.read_bytes()[: cache_file.stat().st_size // 2])
+
+    assert load_cache(annotations_file) is None
+    assert COCODataset.from_file(annotations_file).to_dict() == sample_data
@@ -0,0 +1,30 @@
+from cocosuite.core.categories import CategoryRegistry
+
+
+def test_registry_matches_by_name():
+    registry = CategoryRegistry()
+    first = [{"id": 3, "name": "dog"}, {"id": 7, "name": "cat"}]
+    second = [{"id": 1, "name": "cat"}, {"id": 2, "name": "bird"}]
+
+    assert registry.remap(first, keep_ids=True) == {3: 3, 7: 7}
+    assert registry.remap(second) == {1: 7, 2: 8}
+    assert [cat["id"] for cat in registry.categories] == [3, 7, 8]
+    assert second[1]["id"] == 2
+
+
+def test_registry_keep_ids_on_conflict():
+    registry = CategoryRegistry()
+    registry.register({"id": 1, "name": "dog"}, keep_id=True)
+
+    assert registry.register({"id": 1, "name": "cat"}, keep_id=True) == 2
+    assert len(registry) == 2
+
+
+def test_registry_match_supercategory():
+    categories = [
+        {"id": 1, "name": "bat", "supercategory": "animal"},
+        {"id": 2, "name": "bat", "supercategory": "sports"},
+    ]
+
+    assert CategoryRegistry().remap(categories) == {1: 1, 2: 1}
+    assert CategoryRegistry(match_supercategory=True).remap(categories) == {1: 1, 2: 2}
@@ -0,0 +1,90 @@
+import numpy as np
+
+from cocosuite.core import columns as columns_module
+from cocosuite.core.columns import COCOColumns, positions
+from cocosuite.core.dataset import COCODataset
+
+
+def test_columns_from_dataset(sample_data):
+    sample_data["annotations"][0].update(bbox=[1, 2, 3.5, 4], area=14.0, iscrowd=1)
+    sample_data["annotations"][1]["image_id"] = 99
+
+    columns = COCODataset(sample_data).columns
+
+    assert len(columns) == 10
+    assert columns.n_images == 10
+    assert columns.n_categories == 2
+    assert columns.ann_image_id.dtype == np.int64
+    assert columns.ann_bbox.shape == (10, 4)
+    assert columns.ann_bbox.dtype == np.float32
+    assert columns.ann_bbox[0].tolist() == [1, 2, 3.5, 4]
+    assert np.isnan(columns.ann_bbox[1]).all()
+    assert columns.ann_area[0] == 14.0
+    assert np.isnan(columns.ann_area[1])
+    assert columns.ann_iscrowd.tolist() == [1] + [0] * 9
+    assert columns.img_width.tolist()[:3] == [800, 800, 1024]
+    assert columns.ann_image_index.tolist()[:3] == [0, -1, 2]
+    assert columns.ann_category_index.tolist()[:2] == [0, 1]
+    assert columns.cat_names == ["cat1", "cat2"]
+
+
+def test_columns_chunked_build(sample_data, monkeypatch):
+    monkeypatch.setattr(columns_module, "CHUNK_SIZE", 3)
+
+    columns = COCOColumns(
+        sample_data["images"],
+        iter(sample_data["annotations"]),
+        sample_data["categories"],
+    )
+
+    assert columns.ann_id.tolist() == list(range(1, 11))
+
+
+def test_columns_empty(empty_sample_data):
+    columns = COCODataset(empty_sample_data).columns
+
+    assert len(columns) == 0
+    assert columns.ann_bbox.shape == (0, 4)
+
+
+def test_positions():
+    ids = np.array([30, 10, 20])
+
+    assert positions(ids, np.array([10, 20, 30, 40])).tolist() == [1, 2, 0, -1]
+    assert positions(np.array([], dtype=np.int64), np.array([1])).tolist() == [-1]
+
+
+def test_columns_null_values(sample_data):
+    sample_data["images"][0]["width"] = None
+    sample_data["images"][1]["height"] = "480"
+    sample_data["images"][2]["width"] = 1024.0
+    sample_data["annotations"][0]["area"] = None
+    sample_data["annotations"][1]["iscrowd"] = None
+    sample_data["annotations"][2]["bbox"] = [1, None, 3, "4"]
+
+    columns = COCODataset(sample_data).columns
+
+    assert columns.img_width.tolist()[:3] == [-1, 800, 1024]
+    assert columns.img_height.tolist()[:2] == [600, -1]
+    assert np.isnan(columns.ann_area[0])
+    assert columns.ann_iscrowd[1] == 0
+    assert columns.ann_bbox[2, [0, 2]].tolist() == [1, 3]
+    assert np.isnan(columns.ann_bbox[2, [1, 3]]).all()
+
+
+def test_columns_string_ids(sample_data):
+    for img in sample_data["images"]:
+        img["id"] = f"img_{img['id']}"
+    for ann in sample_data["annotations"]:
+        ann["image_id"] = f"img_{ann['image_id']}"
+    sample_data["annotations"][0]["image_id"] = "img_99"
+    sample_data["annotations"][1]["image_id"] = 2
+
+    columns = COCODataset(sample_data).columns
+
+    assert columns.ann_image_index.tolist() == [-1, -1] + list(range(2, 10))
+    assert columns.ids(["img_3", "img_99", 3]).tolist() == [
+        columns.img_id[2],
+        columns.ann_image_id[0],
+        3,
+    ]
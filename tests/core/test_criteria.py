@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from cocosuite.core.criteria import Predicate, compile_criteria
+
+IMAGES = [
+    {"id": 1, "file_name": "a/image1.jpg", "height": 480},
+    {"id": 2, "file_name": "a/image2.png", "height": 1480},
+    {"id": 3, "file_name": "b/image3.jpg", "height": 720},
+    {"id": 4, "file_name": "b/image14.jpg"},
+]
+
+
+def matches(criteria, match_all=False):
+    return compile_criteria(criteria, match_all).evaluate(IMAGES).tolist()
+
+
+def test_legacy_substring_criteria():
+    assert matches({"height": [480]}) == [True, True, False, False]
+    assert matches({"file_name": ["image1"], "height": [480]}, True) == [
+        True,
+        False,
+        False,
+        False,
+    ]
+
+
+@pytest.mark.parametrize(
+    "criteria, expected",
+    [
+        ({"height": {"in": [480]}}, [True, False, False, False]),
+        ({"height": {"in": 720}}, [False, False, True, False]),
+        ({"file_name": {"prefix": "b/"}}, [False, False, True, True]),
+        ({"file_name": {"suffix": [".png"]}}, [False, True, False, False]),
+        ({"file_name": {"regex": r"image\d\."}}, [True, True, True, False]),
+        ({"height": {"range": [480, 720]}}, [True, False, True, False]),
+        ({"height": {"gt": 480, "lte": 1480}}, [False, True, True, False]),
+        ({"height": {"lt": 720}}, [True, False, False, False]),
+    ],
+)
+def test_operators(criteria, expected):
+    assert matches(criteria) == expected
+
+
+def test_boolean_combinators():
+    criteria = {
+        "$and": [
+            {"file_name": {"prefix": "a/"}},
+            {"$not": {"height": {"gte": 1000}}},
+        ],
+        "$or": [{"id": {"in": [4]}}],
+    }
+
+    assert matches(criteria) == [True, False, False, True]
+    assert matches(criteria, match_all=True) == [False, False, False, False]
+
+
+def test_single_image_and_unknown_operator():
+    predicate = compile_criteria({"height": {"in": [480]}})
+
+    assert predicate(IMAGES[0])
+    assert not predicate(IMAGES[3])
+    assert isinstance(predicate.evaluate([]), np.ndarray)
+    with pytest.raises(ValueError):
+        compile_criteria({"height": {"between": [1, 2]}})
+
+
+def test_predicate_is_abstract():
+    with pytest.raises(TypeError):
+        Predicate()
@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from cocosuite.core.dataset import COCODataset
+
+
+def test_dataset_from_file(sample_data):
+    with TemporaryDirectory() as temp_dir:
+        temp_file = Path(temp_dir) / "coco_data.json"
+        temp_file.write_text(json.dumps(sample_data))
+
+        dataset = COCODataset.from_file(str(temp_file))
+
+    assert dataset.images == sample_data["images"]
+    assert dataset.annotations == sample_data["annotations"]
+    assert dataset.categories == sample_data["categories"]
+    assert dataset.info == sample_data["info"]
+
+
+def test_dataset_indexes(sample_data):
+    dataset = COCODataset(sample_data)
+
+    assert dataset.imgs[3] == sample_data["images"][2]
+    assert dataset.cats[2]["name"] == "cat2"
+    assert dataset.img_to_anns[4] == [sample_data["annotations"][3]]
+    assert len(dataset.cat_to_anns[1]) == 5
+    assert all(ann["category_id"] == 1 for ann in dataset.cat_to_anns[1])
+
+
+def test_dataset_subset_non_contiguous_ids(sample_data):
+    for image in sample_data["images"]:
+        image["id"] *= 100
+    for ann in sample_data["annotations"]:
+        ann["image_id"] *= 100
+    dataset = COCODataset(sample_data)
+
+    images = [sample_data["images"][4], sample_data["images"][1]]
+    subset = dataset.subset(images)
+
+    assert subset.images == images
+    assert subset.annotations == [
+        sample_data["annotations"][4],
+        sample_data["annotations"][1],
+    ]
+    assert subset.categories == sample_data["categories"]
+
+
+def test_dataset_missing_sections():
+    dataset = COCODataset({"images": [{"id": 1, "file_name": "a.jpg"}]})
+
+    assert dataset.annotations == []
+    assert dataset.categories == []
+    assert dataset.get_annotations([1]) == []
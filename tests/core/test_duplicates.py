@@ -0,0 +1,86 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from cocosuite.core.duplicates import (
+    DuplicateIndex,
+    normalize_file_name,
+    normalize_path,
+)
+
+
+def test_normalize_file_name():
+    assert normalize_file_name("shard_a/IMG_01.JPG") == "img_01.jpg"
+    assert normalize_file_name("C:\\data\\img_01.jpg") == "img_01.jpg"
+    assert normalize_file_name("cafe\u0301.jpg") == normalize_file_name("café.jpg")
+
+
+def test_normalize_path():
+    assert normalize_path("./vendorA/x/../000001.jpg") == "vendorA/000001.jpg"
+    assert normalize_path("vendorA\\000001.jpg") == "vendorA/000001.jpg"
+    assert normalize_path("cafe\u0301.jpg") == normalize_path("café.jpg")
+
+
+def test_duplicate_index_by_path():
+    index = DuplicateIndex()
+    images = [
+        {"id": 1, "file_name": "vendorA/000001.jpg", "width": 640, "height": 480},
+        {"id": 2, "file_name": "vendorB/000001.jpg", "width": 640, "height": 480},
+        {"id": 3, "file_name": "./vendorA/000001.jpg", "width": 640, "height": 480},
+        {"id": 4, "file_name": "vendorC/000001.jpg"},
+        {"id": 5, "file_name": "vendorC/000001.jpg"},
+    ]
+    keys = index.keys(images)
+
+    assert index.find_or_add(keys[0], 10) is None
+    assert index.find_or_add(keys[1], 11) is None
+    assert index.find_or_add(keys[2], 12) == 10
+    # Without a size images are never duplicates.
+    assert keys[3] is None
+    assert index.find_or_add(keys[3], 13) is None
+    assert index.find_or_add(keys[4], 14) is None
+    assert len(index) == 2
+
+    # The folder prefix of merge-multiple is left out of the keys.
+    assert index.keys(images[1:2], prefix="vendorB/") == index.keys(
+        [dict(images[0], file_name="000001.jpg")]
+    )
+
+
+def test_duplicate_index_by_name():
+    index = DuplicateIndex(by="name")
+    images = [
+        {"id": 1, "file_name": "a/img.jpg", "width": 640, "height": 480},
+        {"id": 2, "file_name": "b/IMG.jpg", "width": 640, "height": 480},
+        {"id": 3, "file_name": "b/img.jpg", "width": 800, "height": 600},
+    ]
+    keys = index.keys(images)
+
+    assert index.find_or_add(keys[0], 10) is None
+    assert index.find_or_add(keys[1], 11) == 10
+    assert index.find_or_add(keys[2], 12) is None
+    assert len(index) == 2
+
+
+def test_duplicate_index_by_content():
+    with TemporaryDirectory() as temp_dir:
+        Path(temp_dir, "one.jpg").write_bytes(b"same")
+        Path(temp_dir, "two.jpg").write_bytes(b"same")
+        Path(temp_dir, "three.jpg").write_bytes(b"other")
+        images = [
+            {"id": 1, "file_name": "one.jpg"},
+            {"id": 2, "file_name": "two.jpg"},
+            {"id": 3, "file_name": "three.jpg"},
+            {"id": 4, "file_name": "missing.jpg"},
+        ]
+        keys = DuplicateIndex(by="content", workers=2).keys(images, temp_dir)
+
+    assert keys[0] == keys[1]
+    assert keys[0] != keys[2]
+    assert keys[3] is None
+
+    with pytest.raises(ValueError):
+        DuplicateIndex(by="content").keys(images)
+    with pytest.raises(ValueError):
+        DuplicateIndex(by="size")
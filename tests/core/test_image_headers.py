@@ -0,0 +1,41 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+from PIL import Image
+
+from cocosuite.core.image_headers import image_size
+
+
+@pytest.mark.parametrize(
+    "image_format, mode, options",
+    [
+        ("PNG", "RGBA", {}),
+        ("JPEG", "RGB", {}),
+        ("JPEG", "RGB", {"progressive": True, "exif": b"Exif\x00\x00" + b"\x00" * 64}),
+        ("GIF", "P", {}),
+        ("BMP", "RGB", {}),
+        ("WEBP", "RGB", {}),
+        ("WEBP", "RGBA", {"lossless": True}),
+        ("WEBP", "RGBA", {"exif": b"Exif\x00\x00" + b"\x00" * 64}),
+    ],
+)
+def test_image_size(image_format: str, mode: str, options: dict):
+    with TemporaryDirectory() as temp_dir:
+        file = Path(temp_dir, "image")
+        Image.new(mode, (321, 123)).save(file, image_format, **options)
+
+        assert image_size(str(file)) == (321, 123)
+
+
+def test_image_size_unsupported():
+    with TemporaryDirectory() as temp_dir:
+        text_file = Path(temp_dir, "image.txt")
+        text_file.write_text("not an image")
+        truncated_file = Path(temp_dir, "image.jpg")
+        truncated_file.write_bytes(b"\xff\xd8\xff\xe0\x00\x10JFIF")
+
+        assert image_size(str(text_file)) is None
+        assert image_size(str(truncated_file)) is None
+        with pytest.raises(OSError):
+            image_size(str(Path(temp_dir, "missing.png")))
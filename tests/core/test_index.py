@@ -0,0 +1,66 @@
+import json
+import os
+
+import pytest
+
+from cocosuite.core.dataset import COCODataset
+from cocosuite.core.index import COCOIndex, build_index, index_path
+from cocosuite.core.reader import iter_record_spans
+
+
+@pytest.fixture
+def annotations_file(sample_data, tmp_path):
+    sample_data["images"][0]["file_name"] = "imágen 1.jpg"
+    sample_data["images"].reverse()
+    sample_data["annotations"].append({"id": 11, "image_id": 1, "category_id": 2})
+    sample_data["annotations"].append({"id": 12, "image_id": 99, "category_id": 2})
+    annotations_file = tmp_path / "ann.json"
+    text = json.dumps(sample_data, indent=2, ensure_ascii=False).replace("\n", "\r\n")
+    annotations_file.write_bytes(text.encode("utf-8"))
+    return str(annotations_file)
+
+
+def test_iter_record_spans(annotations_file, sample_data):
+    data = open(annotations_file, "rb").read()
+
+    spans = list(iter_record_spans(annotations_file, chunk_size=5))
+
+    images = [json.loads(data[s:e]) for k, _, s, e in spans if k == "images"]
+    assert images == sample_data["images"]
+    info = [json.loads(data[s:e]) for k, _, s, e in spans if k == "info"]
+    assert info == [sample_data["info"]]
+
+
+def test_index_lookup(annotations_file, sample_data):
+    assert build_index(annotations_file) == str(index_path(annotations_file))
+
+    with COCOIndex(annotations_file) as index:
+        assert len(index) == 10
+        assert 1 in index and 99 not in index
+        assert index.get_image(1)["file_name"] == "imágen 1.jpg"
+        assert [a["id"] for a in index.get_annotations(1)] == [1, 11]
+        assert index.get_annotations(2) == [sample_data["annotations"][1]]
+        assert index.categories == sample_data["categories"]
+        with pytest.raises(KeyError):
+            index.get_annotations(99)
+
+        subset = index.subset([3, 1])
+
+    expected = COCODataset(sample_data).subset(
+        [sample_data["images"][i] for i in (7, 9)]
+    )
+    assert subset.images == expected.images
+    assert subset.annotations == expected.annotations
+    assert subset.info == sample_data["info"]
+
+
+def test_index_outdated(annotations_file, tmp_path):
+    COCOIndex.build(annotations_file, str(tmp_path / "index")).close()
+    with open(annotations_file, "ab") as f:
+        f.write(b"\n")
+
+    with pytest.raises(ValueError):
+        COCOIndex(annotations_file, str(tmp_path / "index"))
+    with pytest.raises(FileNotFoundError):
+        COCOIndex(annotations_file)
+    assert os.path.isdir(tmp_path / "index")
@@ -0,0 +1,20 @@
+import pytest
+
+from cocosuite.core.parallel import ordered_map
+
+
+def square(x):
+    return x * x
+
+
+@pytest.mark.parametrize("workers, threads", [(1, False), (3, True), (2, False)])
+def test_ordered_map_keeps_input_order(workers, threads):
+    items = list(range(20))
+
+    results = list(ordered_map(square, items, workers=workers, threads=threads))
+
+    assert results == [x * x for x in items]
+
+
+def test_ordered_map_empty():
+    assert list(ordered_map(square, [], workers=4, threads=True)) == []
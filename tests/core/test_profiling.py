@@ -0,0 +1,82 @@
+import json
+
+import numpy as np
+import pytest
+
+from cocosuite.core.profiling import Profiler, _reset_peak_rss, stage
+from cocosuite.scripts.manipulation.coco_filter import filter_annotations
+
+
+def test_stage_without_profiler():
+    with stage("load") as profile:
+        profile.records = 3
+
+    assert profile.wall_seconds == 0.0
+
+
+def test_nested_stages(tmp_path):
+    output_file = tmp_path / "profile.json"
+
+    with Profiler("test", output_file=str(output_file)) as profiler:
+        with stage("outer") as outer:
+            with stage("inner") as inner:
+                inner.records = 5
+            sum(range(100_000))
+
+    assert [(s.name, s.depth) for s in profiler.stages] == [("outer", 0), ("inner", 1)]
+    assert outer.wall_seconds >= inner.wall_seconds > 0
+    assert profiler.total.wall_seconds >= outer.wall_seconds
+    assert outer.peak_rss_mb >= inner.peak_rss_mb > 0
+
+    metrics = json.loads(output_file.read_text())
+    assert metrics["name"] == "test"
+    assert metrics["stages"][1]["records"] == 5
+    assert set(metrics["stages"][0]) == {
+        "name",
+        "depth",
+        "wall_seconds",
+        "cpu_seconds",
+        "peak_rss_mb",
+        "records",
+    }
+
+
+def test_nested_stage_keeps_outer_peak():
+    if not _reset_peak_rss():
+        pytest.skip("The peak RSS can only be reset on Linux")
+
+    with Profiler("test") as profiler:
+        with stage("outer") as outer:
+            allocation = np.ones(200 << 20, dtype=np.uint8)
+            del allocation
+            with stage("inner") as inner:
+                pass
+
+    assert outer.peak_rss_mb - inner.peak_rss_mb > 150
+    assert profiler.total.peak_rss_mb >= outer.peak_rss_mb
+
+
+def test_stages_of_a_tool(sample_data, sample_config, tmp_path, write_json):
+    annotations_file = write_json(tmp_path / "ann.json", sample_data)
+    config_file = write_json(tmp_path / "config.json", sample_config)
+
+    with Profiler() as profiler:
+        filter_annotations(annotations_file, config_file, "filtered.json")
+
+    records = {s.name: s.records for s in profiler.stages}
+    assert list(records) == ["load", "filter", "write"]
+    assert records["load"] == 20
+    assert records["filter"] == 10
+
+
+def test_stage_records_exception():
+    profiler = Profiler()
+    try:
+        with profiler:
+            with stage("failing"):
+                raise ValueError
+    except ValueError:
+        pass
+
+    assert [s.name for s in profiler.stages] == ["failing"]
+    assert profiler.total.wall_seconds > 0
@@ -0,0 +1,65 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from cocosuite.core.dataset import COCODataset
+from cocosuite.core.reader import iter_records, load_header
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_iter_records(sample_data, chunk_size, indent):
+    sample_data["images"][0]["file_name"] = "imágen 1.jpg"
+    sample_data["annotations"][0]["area"] = 123456.75
+    with TemporaryDirectory() as temp_dir:
+        temp_file = Path(temp_dir) / "coco_data.json"
+        temp_file.write_text(
+            json.dumps(sample_data, indent=indent, ensure_ascii=False), encoding="utf-8"
+        )
+
+        records = list(iter_records(str(temp_file), chunk_size=chunk_size))
+
+    assert [r for k, r in records if k == "images"] == sample_data["images"]
+    assert [r for k, r in records if k == "annotations"] == sample_data["annotations"]
+    assert [r for k, r in records if k == "categories"] == sample_data["categories"]
+    assert not any(k == "info" for k, _ in records)
+
+
+def test_load_header_skips_annotations(sample_data):
+    with TemporaryDirectory() as temp_dir:
+        temp_file = Path(temp_dir) / "coco_data.json"
+        temp_file.write_text(json.dumps(sample_data))
+
+        header = load_header(str(temp_file), chunk_size=16)
+
+    assert "annotations" not in header
+    assert header["images"] == sample_data["images"]
+    assert header["info"] == sample_data["info"]
+    assert header["licenses"] == sample_data["licenses"]
+
+
+def test_iter_records_invalid_json():
+    with TemporaryDirectory() as temp_dir:
+        temp_file = Path(temp_dir) / "coco_data.json"
+        temp_file.write_text('{"images": [{"id": 1} {"id": 2}]}')
+
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_records(str(temp_file)))
+
+
+def test_streaming_dataset_partition(sample_data):
+    with TemporaryDirectory() as temp_dir:
+        temp_file = Path(temp_dir) / "coco_data.json"
+        temp_file.write_text(json.dumps(sample_data))
+
+        dataset = COCODataset.from_file(str(temp_file), streaming=True)
+        images = sample_data["images"]
+        train, val = dataset.partition([images[3:], images[:3]])
+
+    assert dataset.streaming
+    with pytest.raises(RuntimeError):
+        dataset.annotations
+    assert train.annotations == sample_data["annotations"][3:]
+    assert val.annotations == sample_data["annotations"][:3]
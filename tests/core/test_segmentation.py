@@ -0,0 +1,167 @@
+import numpy as np
+import pytest
+
+from cocosuite.core.dataset import COCODataset
+from cocosuite.core.segmentation import (
+    decode_counts,
+    encode_counts,
+    mask_to_rle,
+    polygons_to_rle,
+    process_annotation,
+    process_annotations,
+    process_segmentations,
+    rle_area,
+    rle_bbox,
+    rle_to_mask,
+    rle_to_polygons,
+)
+
+SQUARE = [0, 0, 10, 0, 10, 10, 0, 10]
+
+
+def test_counts_round_trip():
+    counts = [0, 3, 2, 10, 0, 1000, 31, 32, 123456]
+    string = encode_counts(counts)
+
+    assert encode_counts([0, 3, 2, 10]) == "0327"
+    assert decode_counts(string).tolist() == counts
+
+
+def test_mask_round_trip():
+    rng = np.random.default_rng(0)
+    mask = (rng.random((13, 17)) > 0.5).astype(np.uint8)
+    rle = mask_to_rle(mask)
+
+    assert rle["size"] == [13, 17]
+    assert isinstance(rle["counts"], str)
+    assert np.array_equal(rle_to_mask(rle), mask)
+    assert rle_area(rle) == mask.sum()
+
+
+def test_polygons_to_rle():
+    rle = polygons_to_rle([SQUARE], 20, 20)
+    mask = rle_to_mask(rle)
+
+    assert rle == {"size": [20, 20], "counts": "0::00000000000000000X6"}
+    assert rle_area(rle) == 100
+    assert rle_bbox(rle) == [0.0, 0.0, 10.0, 10.0]
+    assert mask[:10, :10].all() and mask.sum() == 100
+
+
+def test_rle_to_polygons():
+    mask = np.zeros((5, 6), dtype=np.uint8)
+    mask[1:4, 1:5] = 1
+    mask[2, 2] = 0
+    polygons = rle_to_polygons(mask_to_rle(mask))
+
+    # Holes are filled and the polygons follow the borders of the pixels.
+    assert polygons == [[1.0, 1.0, 5.0, 1.0, 5.0, 4.0, 1.0, 4.0]]
+    assert rle_area(polygons_to_rle(polygons, 5, 6)) == 12
+
+
+def test_rle_to_polygons_round_trip():
+    mask = np.zeros((30, 40), dtype=np.uint8)
+    mask[2:10, 3:12] = 1
+    mask[15:28, 20:38] = 1
+    mask[20:25, 25:30] = 0
+    mask[12, 5] = 1
+    polygons = rle_to_polygons(mask_to_rle(mask))
+    filled = rle_to_mask(polygons_to_rle(polygons, 30, 40))
+
+    mask[20:25, 25:30] = 1
+    assert len(polygons) == 3
+    assert np.array_equal(filled, mask)
+
+
+def test_process_annotation_rle():
+    annotation = {"id": 1, "image_id": 1, "segmentation": [SQUARE], "area": 1}
+    processed = process_annotation(annotation, (20, 20), "rle")
+
+    assert processed["segmentation"] == {
+        "size": [20, 20],
+        "counts": "0::00000000000000000X6",
+    }
+    assert processed["area"] == 100.0
+    assert processed["bbox"] == [0.0, 0.0, 10.0, 10.0]
+    assert annotation["segmentation"] == [SQUARE]
+
+
+def test_process_annotation_polygon():
+    rle = {"size": [4, 4], "counts": [5, 2, 2, 2, 5]}
+    annotation = {"id": 1, "image_id": 1, "segmentation": rle}
+    crowd = dict(annotation, iscrowd=1)
+
+    processed = process_annotation(annotation, (4, 4), "polygon")
+    processed_crowd = process_annotation(crowd, (4, 4), "polygon")
+
+    assert processed["segmentation"] == [[1.0, 1.0, 3.0, 1.0, 3.0, 3.0, 1.0, 3.0]]
+    assert processed["area"] == 4.0
+    assert processed["bbox"] == [1.0, 1.0, 2.0, 2.0]
+    assert processed_crowd["segmentation"] == {"size": [4, 4], "counts": "52203"}
+    assert processed_crowd["bbox"] == [1.0, 1.0, 2.0, 2.0]
+
+
+def test_process_annotation_geometry():
+    annotation = {
+        "id": 1,
+        "image_id": 1,
+        "segmentation": [SQUARE],
+        "bbox": [0, 0, 1, 1],
+    }
+    processed = process_annotation(annotation, (20, 20), "geometry")
+
+    assert processed["segmentation"] == [SQUARE]
+    assert processed["area"] == 100.0
+    assert processed["bbox"] == [0.0, 0.0, 10.0, 10.0]
+
+
+def test_process_annotation_unknown():
+    annotation = {"id": 1, "image_id": 1, "category_id": 1}
+    unknown_size = {"id": 2, "image_id": 2, "segmentation": [SQUARE]}
+
+    assert process_annotation(annotation, (20, 20), "rle") == annotation
+    assert process_annotation(unknown_size, None, "rle") == unknown_size
+
+
+def test_process_annotations_workers():
+    rng = np.random.default_rng(1)
+    annotations = [
+        {
+            "id": i,
+            "image_id": i % 3,
+            "segmentation": [rng.uniform(0, 50, 2 * rng.integers(3, 8)).tolist()],
+        }
+        for i in range(2500)
+    ]
+    sizes = {0: (50, 60), 1: (60, 50), 2: (40, 40)}
+
+    serial = list(process_annotations(annotations, sizes, "rle"))
+    parallel = list(process_annotations(annotations, sizes, "rle", workers=2))
+
+    assert parallel == serial
+    assert [ann["id"] for ann in serial] == list(range(2500))
+    for annotation in serial[:50]:
+        height, width = sizes[annotation["image_id"]]
+        expected = polygons_to_rle(
+            annotations[annotation["id"]]["segmentation"], height, width
+        )
+        assert annotation["segmentation"] == expected
+        assert annotation["area"] == rle_area(expected)
+
+
+def test_process_segmentations(sample_data: dict):
+    sample_data["annotations"][0]["segmentation"] = [SQUARE]
+    dataset = COCODataset(sample_data)
+    processed = process_segmentations(dataset, "rle")
+
+    assert processed.images == sample_data["images"]
+    assert processed.categories == sample_data["categories"]
+    assert processed.annotations[0]["segmentation"]["size"] == [600, 800]
+    assert processed.annotations[0]["area"] == 100.0
+    assert processed.annotations[1:] == sample_data["annotations"][1:]
+    assert dataset.annotations[0]["segmentation"] == [SQUARE]
+
+
+def test_process_segmentations_invalid_mode(sample_data: dict):
+    with pytest.raises(ValueError):
+        process_segmentations(COCODataset(sample_data), "mask")
@@ -0,0 +1,41 @@
+from cocosuite.core.dataset import COCODataset
+from cocosuite.core.statistics import DatasetStatistics
+
+
+def test_statistics(sample_data):
+    for cat in sample_data["categories"]:
+        cat["id"] += 10
+    for ann in sample_data["annotations"]:
+        ann["category_id"] += 10
+        ann["bbox"] = [0, 0, ann["id"], 2 * ann["id"]]
+    sample_data["annotations"][0]["image_id"] = 99
+    del sample_data["annotations"][1]["bbox"]
+    del sample_data["images"][9]["width"]
+
+    stats = DatasetStatistics(COCODataset(sample_data))
+
+    assert stats.category_distribution() == {"cat1": 5, "cat2": 5}
+    assert stats.image_size_distribution() == {
+        "800x600": 2,
+        "1024x768": 3,
+        "640x480": 4,
+    }
+    per_image = stats.annotations_per_image_distribution()
+    assert per_image["image1.jpg"] == 0
+    assert per_image["image2.jpg"] == 1
+    assert stats.ann_image_width.tolist()[:2] == [800, 1024]
+    assert stats.ann_image_category.tolist()[:2] == [1, 0]
+    # The annotation of the image without width is left out.
+    assert len(stats.ann_image_width) == len(stats.ann_image_height) == 8
+    assert stats.ann_image_width.min() > 0 and stats.ann_image_height.min() > 0
+    assert stats.bbox_width.tolist() == [1, 3, 4, 5, 6, 7, 8, 9, 10]
+    assert stats.bbox_height.tolist()[:2] == [2, 6]
+    assert stats.bbox_category.tolist()[:2] == [0, 0]
+
+
+def test_statistics_empty(empty_sample_data):
+    stats = DatasetStatistics(COCODataset(empty_sample_data))
+
+    assert stats.category_distribution() == {}
+    assert stats.image_size_distribution() == {}
+    assert len(stats.bbox_width) == 0
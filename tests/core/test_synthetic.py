@@ -0,0 +1,50 @@
+import json
+
+from cocosuite.core.dataset import COCODataset
+from cocosuite.core.synthetic import generate_coco, write_synthetic
+
+
+def materialize(data):
+    return dict(data, annotations=list(data["annotations"]))
+
+
+def test_generate_coco_is_deterministic():
+    first = materialize(generate_coco(50, id_sparsity=0.5, segmentation_points=8))
+    second = materialize(generate_coco(50, id_sparsity=0.5, segmentation_points=8))
+    other = materialize(
+        generate_coco(50, id_sparsity=0.5, segmentation_points=8, seed=1)
+    )
+
+    assert first == second
+    assert first != other
+
+
+def test_generate_coco_shape():
+    data = materialize(
+        generate_coco(200, annotations_per_image=3, n_categories=7, id_sparsity=0.5)
+    )
+    dataset = COCODataset(data)
+
+    assert len(dataset.images) == 200
+    assert len(dataset.categories) == 7
+    assert 400 < len(dataset.annotations) < 800
+    assert max(dataset.imgs) > 200
+    assert len({ann["id"] for ann in dataset.annotations}) == len(dataset.annotations)
+    assert all(ann["category_id"] in dataset.cats for ann in dataset.annotations)
+    for ann in dataset.annotations:
+        img = dataset.imgs[ann["image_id"]]
+        x, y, w, h = ann["bbox"]
+        assert 0 <= x and x + w <= img["width"] + 0.01
+        assert 0 <= y and y + h <= img["height"] + 0.01
+        assert "segmentation" not in ann
+
+
+def test_write_synthetic(tmp_path):
+    output_file = write_synthetic(
+        str(tmp_path / "synthetic.json"), 10, segmentation_points=5
+    )
+
+    data = json.loads((tmp_path / "synthetic.json").read_text())
+    assert output_file == str(tmp_path / "synthetic.json")
+    assert data == materialize(generate_coco(10, segmentation_points=5))
+    assert all(len(ann["segmentation"][0]) == 10 for ann in data["annotations"])
@@ -0,0 +1,121 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from cocosuite.core.dataset import COCODataset
+from cocosuite.core.writer import (
+    COCOWriter,
+    resolve_output_path,
+    write_coco,
+    write_coco_files,
+)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 1000])
+def test_write_coco_matches_json_dump(sample_data, chunk_size):
+    sample_data["images"][0]["file_name"] = "imágen 1.jpg"
+    sample_data["licenses"] = []
+    sample_data["annotations"][0]["bbox"] = [1.5, 2, 3, 4]
+    with TemporaryDirectory() as temp_dir:
+        output_file = Path(temp_dir) / "output.json"
+        write_coco(str(output_file), sample_data, chunk_size=chunk_size)
+
+        expected = json.dumps(sample_data, indent=2, ensure_ascii=False)
+        assert output_file.read_text(encoding="utf-8") == expected
+
+
+def test_write_coco_compact(sample_data):
+    with TemporaryDirectory() as temp_dir:
+        output_file = Path(temp_dir) / "output.json"
+        data = dict(sample_data, annotations=iter(sample_data["annotations"]))
+        write_coco(str(output_file), data, compact=True)
+
+        text = output_file.read_text(encoding="utf-8")
+        assert "\n" not in text
+        assert json.loads(text) == sample_data
+
+
+def test_write_coco_empty(empty_sample_data):
+    with TemporaryDirectory() as temp_dir:
+        output_file = Path(temp_dir) / "output.json"
+        write_coco(str(output_file), empty_sample_data)
+        assert output_file.read_text() == json.dumps(empty_sample_data, indent=2)
+
+        write_coco(str(output_file), {})
+        assert output_file.read_text() == "{}"
+
+
+def test_write_partition_streaming(sample_data):
+    with TemporaryDirectory() as temp_dir:
+        temp_file = Path(temp_dir) / "coco_data.json"
+        temp_file.write_text(json.dumps(sample_data))
+        images = sample_data["images"]
+        output_files = [str(Path(temp_dir) / f"part_{i}.json") for i in range(2)]
+
+        dataset = COCODataset.from_file(str(temp_file), streaming=True)
+        dataset.write_partition([images[:4], images[4:]], output_files)
+
+        in_memory = COCODataset(sample_data).partition([images[:4], images[4:]])
+        for output_file, expected in zip(output_files, in_memory):
+            with open(output_file, "r") as f:
+                assert json.load(f) == expected.to_dict()
+
+
+def test_resolve_output_path():
+    assert resolve_output_path("out.json", "/data/coco.json") == Path("/data/out.json")
+    assert resolve_output_path("/tmp/out.json", "/data/coco.json") == Path(
+        "/tmp/out.json"
+    )
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_copy_records(sample_data, compact, tmp_path):
+    sample_data["images"][0]["file_name"] = "imágen 1.jpg"
+    source_file = tmp_path / "source.json"
+    images = sample_data["images"]
+    with COCOWriter(str(source_file), compact=compact) as writer:
+        writer.write("info", sample_data["info"])
+        writer.begin_array("images")
+        spans = []
+        for group in (images[:4], images[4:]):
+            start = writer.tell()
+            for image in group:
+                writer.write_record(image)
+            spans.append((start, writer.tell()))
+        writer.end_array()
+    info_span = writer.spans["info"]
+
+    output_file = tmp_path / "output.json"
+    with (
+        open(source_file, "rb") as source,
+        COCOWriter(str(output_file), compact=compact) as writer,
+    ):
+        writer.copy_value("info", source, info_span)
+        writer.begin_array("images")
+        writer.copy_records(source, spans[1], len(images) - 4)
+        writer.copy_records(source, spans[0], 4)
+        writer.write_record({"id": 11})
+        writer.end_array()
+
+    expected = {"info": sample_data["info"], "images": images[4:] + images[:4]}
+    expected["images"].append({"id": 11})
+    output_text = output_file.read_text(encoding="utf-8")
+    assert json.loads(output_text) == expected
+    write_coco(str(tmp_path / "expected.json"), expected, compact=compact)
+    assert output_text == (tmp_path / "expected.json").read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_write_coco_files(sample_data, workers, tmp_path):
+    outputs = [
+        (str(tmp_path / f"part_{i}.json"), dict(sample_data, images=images))
+        for i, images in enumerate((sample_data["images"][:4], []))
+    ]
+
+    written = list(write_coco_files(iter(outputs), compact=True, workers=workers))
+
+    assert written == [output_file for output_file, _ in outputs]
+    for output_file, data in outputs:
+        assert json.loads(Path(output_file).read_text()) == data
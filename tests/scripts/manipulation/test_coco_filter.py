@@ -47,3 +47,58 @@ def test_filter_annotations_match_any(sample_data, sample_config):
 
     assert filtered_data["images"] == expected_filtered_images
     assert filtered_data["annotations"] == expected_filtered_annotations
+
+
+def test_filter_annotations_streaming(sample_data, sample_config):
+    with TemporaryDirectory() as temp_dir:
+        temp_file = Path(temp_dir) / "coco_data.json"
+        temp_file.write_text(json.dumps(sample_data))
+        filter_config_file = Path(temp_dir) / "filter_config.json"
+        filter_config_file.write_text(json.dumps(sample_config))
+
+        output_file = Path(temp_dir) / "filtered_annotations.json"
+        filter_annotations(
+            str(temp_file), str(filter_config_file), str(output_file), streaming=True
+        )
+
+        with open(output_file, "r") as f:
+            filtered_data = json.load(f)
+
+    assert filtered_data["images"] == sample_data["images"][1:]
+    assert filtered_data["annotations"] == sample_data["annotations"][1:]
+
+
+def test_filter_annotations_exact_match(sample_data):
+    sample_data["images"][4]["height"] = 1480
+    config = {"filter": {"height": {"in": [480]}}, "match_all": True}
+
+    filtered_data = run_filter_annotations_test(sample_data, config)
+
+    assert filtered_data["images"] == sample_data["images"][:5]
+    assert filtered_data["annotations"] == sample_data["annotations"][:5]
+
+
+def test_filter_annotations_segmentation(sample_data, sample_config):
+    sample_data["annotations"][1]["segmentation"] = [[0, 0, 10, 0, 10, 10, 0, 10]]
+    with TemporaryDirectory() as temp_dir:
+        temp_file = Path(temp_dir) / "coco_data.json"
+        temp_file.write_text(json.dumps(sample_data))
+        filter_config_file = Path(temp_dir) / "filter_config.json"
+        filter_config_file.write_text(json.dumps(sample_config))
+
+        output_file = Path(temp_dir) / "filtered_annotations.json"
+        filter_annotations(
+            str(temp_file),
+            str(filter_config_file),
+            str(output_file),
+            streaming=True,
+            segmentation="geometry",
+        )
+
+        with open(output_file, "r") as f:
+            filtered_data = json.load(f)
+
+    assert filtered_data["images"] == sample_data["images"][1:]
+    assert filtered_data["annotations"][0]["area"] == 100.0
+    assert filtered_data["annotations"][0]["bbox"] == [0.0, 0.0, 10.0, 10.0]
+    assert filtered_data["annotations"][1:] == sample_data["annotations"][2:]
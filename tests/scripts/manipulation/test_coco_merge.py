@@ -3,7 +3,10 @@ import json
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
-from cocosuite.scripts.manipulation.coco_merge import coco_merge
+import pytest
+
+from cocosuite.core.dataset import COCODataset
+from cocosuite.scripts.manipulation.coco_merge import COCOMerger, coco_merge
 
 
 def prepare_and_merge_coco_files(data1: dict, data2: dict, temp_dir: Path) -> dict:
@@ -53,3 +56,130 @@ def test_coco_merge_with_empty_file(sample_data: dict, empty_sample_data: dict):
         assert len(merged_data["images"]) == expected_num_images
         assert len(merged_data["annotations"]) == expected_num_annotations
         assert len(merged_data["categories"]) == expected_num_categories
+
+
+def test_coco_merge_does_not_modify_inputs(sample_data: dict):
+    data1 = copy.deepcopy(sample_data)
+    data2 = copy.deepcopy(sample_data)
+    data2["categories"] = [{"id": 5, "name": "cat3"}, {"id": 6, "name": "cat1"}]
+    for ann in data2["annotations"]:
+        ann["category_id"] += 4
+    expected = copy.deepcopy(data2)
+
+    merger = COCOMerger()
+    merger.add(COCODataset(data1))
+    merger.add(COCODataset(data2))
+    merged_data = merger.result()
+
+    assert data2 == expected
+    assert [cat["id"] for cat in merged_data["categories"]] == [1, 2, 3]
+    n_anns = len(data1["annotations"])
+    assert merged_data["annotations"][n_anns]["category_id"] == 3
+    assert merged_data["annotations"][n_anns + 1]["category_id"] == 1
+
+
+def test_coco_merge_dedup(sample_data: dict):
+    data1 = copy.deepcopy(sample_data)
+    data2 = copy.deepcopy(sample_data)
+    data2["images"] = data2["images"][:2]
+    data2["images"][0]["file_name"] = "other/IMAGE1.jpg"
+    data2["annotations"] = [ann for ann in data2["annotations"] if ann["image_id"] <= 2]
+
+    n_images = len(data1["images"])
+    n_annotations = len(data1["annotations"])
+    first_image_annotations = [
+        ann for ann in data1["annotations"] if ann["image_id"] == 1
+    ]
+
+    merger = COCOMerger(dedup="keep_first", dedup_by="name")
+    merger.add(COCODataset(data1))
+    merger.add(COCODataset(data2))
+    kept = merger.result()
+
+    assert len(kept["images"]) == n_images
+    assert len(kept["annotations"]) == n_annotations
+    assert merger.n_duplicates == 2
+
+    merger = COCOMerger(dedup="union", dedup_by="name")
+    merger.add(COCODataset(data1))
+    merger.add(COCODataset(data2))
+    union = merger.result()
+
+    assert len(union["images"]) == n_images
+    assert len(union["annotations"]) == n_annotations + len(data2["annotations"])
+    first_id = union["images"][0]["id"]
+    assert sum(ann["image_id"] == first_id for ann in union["annotations"]) == 2 * len(
+        first_image_annotations
+    )
+
+    with pytest.raises(ValueError):
+        COCOMerger(dedup="keep_last")
+
+
+def test_coco_merge_dedup_keeps_folders_apart(sample_data: dict):
+    data1 = copy.deepcopy(sample_data)
+    data2 = copy.deepcopy(sample_data)
+    for data, folder in ((data1, "vendorA"), (data2, "vendorB")):
+        for img in data["images"]:
+            img["file_name"] = f"{folder}/{img['file_name']}"
+
+    merger = COCOMerger(dedup="keep_first")
+    merger.add(COCODataset(data1))
+    merger.add(COCODataset(data2))
+    merged = merger.result()
+
+    assert merger.n_duplicates == 0
+    assert len(merged["images"]) == 2 * len(sample_data["images"])
+    assert len(merged["annotations"]) == 2 * len(sample_data["annotations"])
+
+    merger = COCOMerger(dedup="keep_first")
+    merger.add(COCODataset(data1))
+    merger.add(COCODataset(data1))
+
+    assert merger.n_duplicates == len(sample_data["images"])
+
+
+def test_coco_merge_dedup_by_content(sample_data: dict):
+    data1 = copy.deepcopy(sample_data)
+    data2 = copy.deepcopy(sample_data)
+    for img in data2["images"]:
+        img["file_name"] = "renamed_" + img["file_name"]
+
+    with TemporaryDirectory() as temp_dir:
+        for img in data1["images"]:
+            Path(temp_dir, img["file_name"]).write_bytes(img["file_name"].encode())
+            Path(temp_dir, "renamed_" + img["file_name"]).write_bytes(
+                img["file_name"].encode()
+            )
+        coco_1 = Path(temp_dir, "coco_1.json")
+        coco_2 = Path(temp_dir, "coco_2.json")
+        coco_1.write_text(json.dumps(data1))
+        coco_2.write_text(json.dumps(data2))
+
+        result_file = coco_merge(
+            str(coco_1), str(coco_2), dedup="keep_first", dedup_by="content"
+        )
+        with open(result_file, "r") as f:
+            merged_data = json.load(f)
+
+    assert len(merged_data["images"]) == len(data1["images"])
+    assert len(merged_data["annotations"]) == len(data1["annotations"])
+
+
+def test_coco_merge_segmentation(sample_data: dict):
+    data = copy.deepcopy(sample_data)
+    data["annotations"][0]["segmentation"] = [[0, 0, 10, 0, 10, 10, 0, 10]]
+
+    with TemporaryDirectory() as temp_dir:
+        coco_1 = Path(temp_dir) / "coco_1.json"
+        coco_1.write_text(json.dumps(data))
+        coco_2 = Path(temp_dir) / "coco_2.json"
+        coco_2.write_text(json.dumps(sample_data))
+
+        result_file = coco_merge(str(coco_1), str(coco_2), segmentation="rle")
+        with open(result_file, "r") as f:
+            merged_data = json.load(f)
+
+    assert merged_data["annotations"][0]["segmentation"]["size"] == [600, 800]
+    assert merged_data["annotations"][0]["area"] == 100.0
+    assert "segmentation" not in merged_data["annotations"][1]
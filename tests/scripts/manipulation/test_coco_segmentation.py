@@ -0,0 +1,33 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from cocosuite.scripts.manipulation.coco_segmentation import convert_segmentations
+
+SQUARE = [0, 0, 10, 0, 10, 10, 0, 10]
+
+
+def test_convert_segmentations(sample_data):
+    sample_data["annotations"][0]["segmentation"] = [SQUARE]
+    with TemporaryDirectory() as temp_dir:
+        temp_file = Path(temp_dir) / "coco_data.json"
+        temp_file.write_text(json.dumps(sample_data))
+
+        output_file = convert_segmentations(str(temp_file), "rle", streaming=True)
+        with open(output_file, "r") as f:
+            rle_data = json.load(f)
+        polygon_file = convert_segmentations(
+            output_file, "polygon", output_filename="polygon_annotations.json"
+        )
+        with open(polygon_file, "r") as f:
+            polygon_data = json.load(f)
+
+    assert Path(output_file).name == "segmentation_annotations.json"
+    assert rle_data["images"] == sample_data["images"]
+    assert rle_data["annotations"][0]["segmentation"]["size"] == [600, 800]
+    assert rle_data["annotations"][0]["area"] == 100.0
+    assert rle_data["annotations"][0]["bbox"] == [0.0, 0.0, 10.0, 10.0]
+    assert rle_data["annotations"][1:] == sample_data["annotations"][1:]
+    assert polygon_data["annotations"][0]["segmentation"] == [
+        [0.0, 0.0, 10.0, 0.0, 10.0, 10.0, 0.0, 10.0]
+    ]
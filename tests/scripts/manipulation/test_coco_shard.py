@@ -0,0 +1,76 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+import pytest
+
+from cocosuite.core.dataset import COCODataset
+from cocosuite.scripts.manipulation.coco_shard import (
+    greedy_shards,
+    image_weights,
+    shard_dataset,
+)
+
+
+def test_greedy_shards_balanced():
+    weights = np.random.default_rng(0).integers(0, 30, 10000)
+    shards = greedy_shards(weights, 16)
+    loads = np.bincount(shards, weights=weights, minlength=16)
+
+    assert loads.max() - loads.min() <= weights.max()
+    # Items without weight go round robin.
+    shards = greedy_shards(np.zeros(7, dtype=np.int64), 3)
+    assert shards.tolist() == [0, 1, 2, 0, 1, 2, 0]
+    with pytest.raises(ValueError):
+        greedy_shards(weights, 0)
+
+
+def test_image_weights(sample_data):
+    sample_data["annotations"].append({"id": 11, "image_id": 3, "category_id": 1})
+    dataset = COCODataset(sample_data)
+
+    weights, counts = image_weights(dataset)
+    byte_weights, _ = image_weights(dataset, "bytes")
+
+    assert counts.tolist() == [1, 1, 2, 1, 1, 1, 1, 1, 1, 1]
+    assert weights.tolist() == counts.tolist()
+    assert byte_weights[2] > byte_weights[3] > 0
+    with pytest.raises(ValueError):
+        image_weights(dataset, "images")
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_shard_dataset(sample_data, streaming):
+    for i in range(3):
+        sample_data["annotations"].append(
+            {"id": 20 + i, "image_id": 1, "category_id": 1}
+        )
+
+    with TemporaryDirectory() as temp_dir:
+        temp_file = Path(temp_dir) / "coco_data.json"
+        temp_file.write_text(json.dumps(sample_data))
+
+        index_file = shard_dataset(str(temp_file), 4, workers=2, streaming=streaming)
+        with open(index_file, "r") as f:
+            index = json.load(f)
+        shards = []
+        for shard in index["shards"]:
+            with open(Path(temp_dir) / shard["file"], "r") as f:
+                shards.append(json.load(f))
+
+    assert Path(index_file).name == "shard_index.json"
+    assert [shard["file"] for shard in index["shards"]] == [
+        f"shard_{i}.json" for i in range(4)
+    ]
+    assert [shard["annotations"] for shard in index["shards"]] == [4, 3, 3, 3]
+    assert sum(shard["images"] for shard in index["shards"]) == 10
+
+    image_ids = [img["id"] for shard in shards for img in shard["images"]]
+    assert sorted(image_ids) == list(range(1, 11))
+    for shard, entry in zip(shards, index["shards"]):
+        shard_image_ids = [img["id"] for img in shard["images"]]
+        assert shard_image_ids == sorted(shard_image_ids)
+        assert {ann["image_id"] for ann in shard["annotations"]} <= set(shard_image_ids)
+        assert len(shard["annotations"]) == entry["annotations"]
+        assert shard["categories"] == sample_data["categories"]
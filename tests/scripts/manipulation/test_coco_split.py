@@ -3,9 +3,19 @@ import tempfile
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
+import numpy as np
 import pytest
 
-from cocosuite.scripts.manipulation.coco_split import property_split, random_split
+from cocosuite.core.dataset import COCODataset
+from cocosuite.scripts.manipulation.coco_split import (
+    iterative_stratification,
+    kfold_assignment,
+    kfold_split,
+    partition_by_image_ids,
+    property_split,
+    random_split,
+    stratified_split,
+)
 
 
 def run_property_split_test(sample_data, sample_config):
@@ -64,6 +74,17 @@ def test_property_split_match_any(sample_data, sample_config):
     assert val_data["annotations"] == expected_val_annotations
 
 
+def test_property_split_string_ids(sample_data, sample_config):
+    for img in sample_data["images"]:
+        img["id"] = f"img_{img['id']}"
+    for ann in sample_data["annotations"]:
+        ann["image_id"] = f"img_{ann['image_id']}"
+    train_data, val_data = run_property_split_test(sample_data, sample_config)
+
+    assert train_data["annotations"] == sample_data["annotations"][1:]
+    assert val_data["annotations"] == [sample_data["annotations"][0]]
+
+
 def test_random_split_output_files(sample_data):
     with tempfile.TemporaryDirectory() as temp_dir:
         temp_dir_path = Path(temp_dir)
@@ -140,3 +161,153 @@ def test_random_split_coco_format(train_percentage, seed, sample_data):
         for key in necessary_keys:
             assert key in train_data
             assert key in val_data
+
+
+def test_partition_by_image_ids(sample_data):
+    sample_data["annotations"].append({"id": 11, "image_id": 99, "category_id": 1})
+    dataset = COCODataset(sample_data)
+    images = sample_data["images"]
+
+    first, second = partition_by_image_ids(dataset, [images[7:], images[:2]])
+
+    assert first.images == images[7:]
+    assert first.annotations == sample_data["annotations"][7:10]
+    assert second.annotations == sample_data["annotations"][:2]
+
+
+def test_iterative_stratification_balances_labels():
+    rng = np.random.default_rng(0)
+    samples = rng.integers(0, 2000, 6000)
+    labels = np.minimum(rng.zipf(1.6, 6000) - 1, 49)
+
+    folds = iterative_stratification(samples, labels, 2000, [0.8, 0.2], seed=1)
+
+    assert set(np.unique(folds)) == {0, 1}
+    assert abs((folds == 1).mean() - 0.2) < 0.02
+    counts = np.zeros((2, 50))
+    np.add.at(counts, (folds[samples], labels), 1)
+    common = counts.sum(axis=0) >= 10
+    val_fraction = counts[1, common] / counts.sum(axis=0)[common]
+    assert np.all(np.abs(val_fraction - 0.2) < 0.1)
+    assert np.array_equal(
+        folds, iterative_stratification(samples, labels, 2000, [0.8, 0.2], seed=1)
+    )
+
+
+def test_stratified_split_rare_category_in_val(sample_data):
+    sample_data["categories"].append({"id": 7, "name": "rare"})
+    for i in range(5):
+        sample_data["annotations"].append(
+            {"id": 20 + i, "image_id": 2 * i + 1, "category_id": 7}
+        )
+
+    with TemporaryDirectory() as temp_dir:
+        temp_file = Path(temp_dir) / "coco_data.json"
+        temp_file.write_text(json.dumps(sample_data))
+        output_file = Path(temp_dir) / "stratified_split.json"
+
+        stratified_split(str(temp_file), str(output_file), train_percentage=0.8)
+
+        with open(Path(temp_dir) / "stratified_split_train.json", "r") as f:
+            train_data = json.load(f)
+        with open(Path(temp_dir) / "stratified_split_val.json", "r") as f:
+            val_data = json.load(f)
+
+    assert len(train_data["images"]) + len(val_data["images"]) == 10
+    assert 7 in {ann["category_id"] for ann in val_data["annotations"]}
+    assert 7 in {ann["category_id"] for ann in train_data["annotations"]}
+    for split in (train_data, val_data):
+        split_image_ids = {img["id"] for img in split["images"]}
+        assert {ann["image_id"] for ann in split["annotations"]} <= split_image_ids
+
+
+@pytest.mark.parametrize("stratified", [False, True])
+def test_kfold_split_disjoint_folds(sample_data, stratified):
+    n_folds = 5
+    with TemporaryDirectory() as temp_dir:
+        temp_file = Path(temp_dir) / "coco_data.json"
+        temp_file.write_text(json.dumps(sample_data))
+        output_file = Path(temp_dir) / "kfold_split.json"
+
+        kfold_split(
+            str(temp_file),
+            str(output_file),
+            n_folds=n_folds,
+            stratified=stratified,
+            workers=2,
+        )
+
+        folds = []
+        for fold in range(n_folds):
+            split = {}
+            for name in ("train", "val"):
+                with open(Path(temp_dir) / f"kfold_split_fold{fold}_{name}.json") as f:
+                    split[name] = json.load(f)
+            folds.append(split)
+
+    all_ids = {img["id"] for img in sample_data["images"]}
+    val_ids = [{img["id"] for img in fold["val"]["images"]} for fold in folds]
+    assert set().union(*val_ids) == all_ids
+    assert sum(len(ids) for ids in val_ids) == len(all_ids)
+    for fold, fold_val_ids in zip(folds, val_ids):
+        train_ids = {img["id"] for img in fold["train"]["images"]}
+        assert train_ids == all_ids - fold_val_ids
+        assert {ann["image_id"] for ann in fold["val"]["annotations"]} == fold_val_ids
+        assert {ann["image_id"] for ann in fold["train"]["annotations"]} == train_ids
+
+
+def test_kfold_assignment_grouped(sample_data):
+    for i, image in enumerate(sample_data["images"]):
+        image["file_name"] = f"folder{i % 3}/{image['file_name']}"
+    dataset = COCODataset(sample_data)
+
+    folds = kfold_assignment(
+        dataset, n_folds=3, group_by="file_name", group_pattern="^[^/]+"
+    )
+
+    for i in range(3):
+        assert len(set(folds[i::3])) == 1
+    assert len(set(folds)) == 3
+
+
+def test_random_split_segmentation(sample_data):
+    square = [0, 0, 10, 0, 10, 10, 0, 10]
+    for annotation in sample_data["annotations"]:
+        annotation["segmentation"] = [square]
+
+    with TemporaryDirectory() as temp_dir:
+        temp_file = Path(temp_dir) / "coco_data.json"
+        temp_file.write_text(json.dumps(sample_data))
+        output_file = Path(temp_dir) / "random_split.json"
+
+        random_split(
+            str(temp_file), str(output_file), streaming=True, segmentation="rle"
+        )
+
+        splits = []
+        for name in ("train", "val"):
+            with open(Path(temp_dir) / f"random_split_{name}.json", "r") as f:
+                splits.append(json.load(f))
+
+    annotations = splits[0]["annotations"] + splits[1]["annotations"]
+    assert len(annotations) == len(sample_data["annotations"])
+    for annotation in annotations:
+        assert isinstance(annotation["segmentation"]["counts"], str)
+        assert annotation["area"] == 100.0
+        assert annotation["bbox"] == [0.0, 0.0, 10.0, 10.0]
+
+
+def test_random_split_null_width(sample_data):
+    sample_data["images"][0]["width"] = None
+
+    with TemporaryDirectory() as temp_dir:
+        temp_file = Path(temp_dir) / "coco_data.json"
+        temp_file.write_text(json.dumps(sample_data))
+        random_split(str(temp_file), str(Path(temp_dir) / "random_split.json"))
+
+        image_ids = []
+        for name in ("train", "val"):
+            with open(Path(temp_dir) / f"random_split_{name}.json", "r") as f:
+                image_ids += [img["id"] for img in json.load(f)["images"]]
+
+    assert sorted(image_ids) == list(range(1, 11))
@@ -2,9 +2,10 @@ import json
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
+import pytest
+
 from cocosuite.scripts.manipulation.merge_multiple_coco_files import (
     add_ann_folder_to_img_name,
-    delete_merged_files,
     merge_multiple_coco_files,
 )
 
@@ -40,30 +41,151 @@ def test_merge_multiple_coco_files_integration_with_fixture(sample_data):
         assert len(merged_data["categories"]) == len(unique_categories)
 
 
+def test_merge_multiple_coco_files_subfolders(sample_data):
+    with TemporaryDirectory() as temp_dir:
+        temp_dir_path = Path(temp_dir)
+        for folder in ("a", "b", "c"):
+            (temp_dir_path / folder).mkdir()
+            (temp_dir_path / folder / "ann.json").write_text(json.dumps(sample_data))
+
+        merge_multiple_coco_files(str(temp_dir_path), name_pattern="ann.json")
+
+        assert sorted(p.name for p in temp_dir_path.rglob("*.json")) == [
+            "ann.json",
+            "ann.json",
+            "ann.json",
+            "merged_annotations.json",
+        ]
+        with open(temp_dir_path / "merged_annotations.json", "r") as f:
+            merged_data = json.load(f)
+
+    n_images = len(sample_data["images"])
+    assert [img["id"] for img in merged_data["images"]] == list(range(3 * n_images))
+    assert [ann["id"] for ann in merged_data["annotations"]] == list(
+        range(3 * len(sample_data["annotations"]))
+    )
+    assert merged_data["images"][n_images]["file_name"] == "b/image1.jpg"
+    assert merged_data["annotations"][n_images]["image_id"] == n_images
+
+
 def test_add_ann_folder_to_img_name(sample_data):
     with TemporaryDirectory() as temp_dir:
         temp_file = Path(temp_dir) / "example.json"
         temp_file.write_text(json.dumps(sample_data))
 
-        updated_file = add_ann_folder_to_img_name(str(temp_file))
+        updated_data = add_ann_folder_to_img_name(str(temp_file))
+
+        assert list(Path(temp_dir).iterdir()) == [temp_file]
+
+    parent_folder = Path(temp_file).parent.name
+    for img in updated_data["images"]:
+        assert img["file_name"].startswith(f"{parent_folder}/")
+
+
+def test_merge_multiple_coco_files_parallel_matches_serial(sample_data):
+    with TemporaryDirectory() as temp_dir:
+        temp_dir_path = Path(temp_dir)
+        for i in range(5):
+            (temp_dir_path / f"shard_{i}").mkdir()
+            sample_data["categories"][1]["name"] = f"cat{i + 2}"
+            (temp_dir_path / f"shard_{i}" / "ann.json").write_text(
+                json.dumps(sample_data)
+            )
+
+        for workers in (1, 3):
+            merge_multiple_coco_files(
+                str(temp_dir_path),
+                output_file=f"merged_{workers}.json",
+                name_pattern="ann.json",
+                workers=workers,
+            )
+
+        serial = (temp_dir_path / "merged_1.json").read_bytes()
+        parallel = (temp_dir_path / "merged_3.json").read_bytes()
 
-        with open(updated_file, "r") as f:
-            updated_data = json.load(f)
+    assert parallel == serial
 
-        parent_folder = Path(temp_file).parent.name
-        for img in updated_data["images"]:
-            assert img["file_name"].startswith(f"{parent_folder}/")
 
+def write_shard(dir_path, name, data):
+    (dir_path / name).mkdir(exist_ok=True)
+    (dir_path / name / "ann.json").write_text(json.dumps(data))
 
-def test_delete_merged_files(sample_data):
+
+def test_incremental_merge(sample_data, tmp_path):
+    for name in ("a", "b"):
+        write_shard(tmp_path, name, sample_data)
+
+    def merge(incremental=True, output_file="merged_annotations.json"):
+        merge_multiple_coco_files(
+            str(tmp_path),
+            output_file=output_file,
+            name_pattern="ann.json",
+            incremental=incremental,
+        )
+        return (tmp_path / output_file).read_text()
+
+    assert merge() == merge(incremental=False, output_file="full.json")
+    assert (tmp_path / "merged_annotations.json.manifest.json").exists()
+
+    new_data = dict(sample_data, categories=[{"id": 7, "name": "cat3"}])
+    for ann in new_data["annotations"]:
+        ann["category_id"] = 7
+    write_shard(tmp_path, "c", new_data)
+    appended = merge()
+    assert appended == merge(incremental=False, output_file="full.json")
+    assert json.loads(appended)["categories"][-1] == {"id": 3, "name": "cat3"}
+
+    mtime = (tmp_path / "merged_annotations.json").stat().st_mtime_ns
+    merge()
+    assert (tmp_path / "merged_annotations.json").stat().st_mtime_ns == mtime
+
+
+def test_incremental_merge_changed_shard(sample_data, tmp_path):
+    for name in ("a", "b", "c"):
+        write_shard(tmp_path, name, sample_data)
+    merge_multiple_coco_files(str(tmp_path), name_pattern="ann.json", incremental=True)
+
+    changed = dict(
+        sample_data,
+        images=sample_data["images"][:2],
+        annotations=sample_data["annotations"][:2],
+    )
+    write_shard(tmp_path, "b", changed)
+    (tmp_path / "c" / "ann.json").unlink()
+    merge_multiple_coco_files(str(tmp_path), name_pattern="ann.json", incremental=True)
+
+    with open(tmp_path / "merged_annotations.json", "r") as f:
+        merged_data = json.load(f)
+    folders = [img["file_name"].split("/")[0] for img in merged_data["images"]]
+    assert folders == ["a"] * 10 + ["b"] * 2
+    image_ids = [img["id"] for img in merged_data["images"]]
+    assert image_ids == list(range(10)) + [30, 31]
+    assert [ann["image_id"] for ann in merged_data["annotations"]] == image_ids
+
+
+def test_merge_multiple_coco_files_dedup(sample_data):
     with TemporaryDirectory() as temp_dir:
-        temp_files = []
-        for i in range(2):
-            temp_file = Path(temp_dir) / f"example_{i + 1}.json"
-            temp_file.write_text(json.dumps(sample_data))
-            temp_files.append(str(temp_file))
+        temp_dir_path = Path(temp_dir)
+        for folder in ("a", "b"):
+            (temp_dir_path / folder).mkdir()
+            (temp_dir_path / folder / "ann.json").write_text(json.dumps(sample_data))
 
-        delete_merged_files(temp_files)
+        merge_multiple_coco_files(
+            str(temp_dir_path),
+            name_pattern="ann.json",
+            dedup="union",
+        )
+        with open(temp_dir_path / "merged_annotations.json", "r") as f:
+            merged_data = json.load(f)
 
-        for temp_file in temp_files:
-            assert not Path(temp_file).exists()
+        with pytest.raises(ValueError):
+            merge_multiple_coco_files(
+                str(temp_dir_path), incremental=True, dedup="keep_first"
+            )
+        with pytest.raises(ValueError):
+            merge_multiple_coco_files(
+                str(temp_dir_path), incremental=True, segmentation="rle"
+            )
+
+    assert len(merged_data["images"]) == len(sample_data["images"])
+    assert len(merged_data["annotations"]) == 2 * len(sample_data["annotations"])
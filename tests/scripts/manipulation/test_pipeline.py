@@ -0,0 +1,138 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from cocosuite.scripts.manipulation.coco_filter import filter_annotations
+from cocosuite.scripts.manipulation.coco_split import random_split
+from cocosuite.scripts.manipulation.merge_multiple_coco_files import (
+    merge_multiple_coco_files,
+)
+from cocosuite.scripts.manipulation.pipeline import COCOPipeline, run_pipeline
+
+
+def write_shards(sample_data, tmp_path, write_json):
+    for shard in ("a", "b"):
+        write_json(tmp_path / "shards" / shard / "annotations.json", sample_data)
+    return str(tmp_path / "shards")
+
+
+def test_pipeline_matches_the_file_tools(
+    sample_data, sample_config, tmp_path, write_json
+):
+    shards_dir = write_shards(sample_data, tmp_path, write_json)
+    filter_config = {"filter": {"width": {"in": [640]}}, "match_all": False}
+
+    merge_multiple_coco_files(shards_dir, output_file="merged.json")
+    merged_file = str(Path(shards_dir, "merged.json"))
+    filter_config_file = write_json(tmp_path / "filter.json", filter_config)
+    filter_annotations(merged_file, filter_config_file, str(tmp_path / "filtered.json"))
+    random_split(str(tmp_path / "filtered.json"), str(tmp_path / "split.json"), 0.5)
+    Path(merged_file).unlink()
+
+    pipeline = (
+        COCOPipeline()
+        .merge_multiple("merged", shards_dir)
+        .filter("filtered", "merged", **filter_config)
+        .random_split("split", "filtered", train_percentage=0.5)
+        .save("split_train", str(tmp_path / "pipeline_train.json"))
+        .save("split_val", str(tmp_path / "pipeline_val.json"))
+    )
+
+    assert len(pipeline.saved) == 2
+    for split in ("train", "val"):
+        assert (tmp_path / f"pipeline_{split}.json").read_text() == (
+            tmp_path / f"split_{split}.json"
+        ).read_text()
+
+
+def test_run_pipeline_config(sample_data, sample_config, tmp_path, write_json):
+    annotations_file = write_json(tmp_path / "ann.json", sample_data)
+    config = {
+        "steps": [
+            {"step": "load", "output": "a", "annotations_file": annotations_file},
+            {"step": "load", "output": "b", "annotations_file": annotations_file},
+            {"step": "merge", "output": "merged", "inputs": ["a", "b"]},
+            {
+                "step": "property_split",
+                "output": "split",
+                "input": "merged",
+                "criteria": sample_config["criteria"],
+                "match_all": sample_config["match_all"],
+            },
+            {
+                "step": "save",
+                "input": "split_val",
+                "output_file": str(tmp_path / "out" / "val.json"),
+            },
+        ]
+    }
+    config_file = write_json(tmp_path / "pipeline.json", config)
+
+    saved = run_pipeline(config_file)
+
+    assert saved == [str(tmp_path / "out" / "val.json")]
+    val = json.loads((tmp_path / "out" / "val.json").read_text())
+    assert [img["file_name"] for img in val["images"]] == ["image1.jpg"] * 2
+    assert len(val["annotations"]) == 2
+
+
+def test_run_pipeline_yaml_config(sample_data, tmp_path, write_json):
+    pytest.importorskip("yaml")
+    annotations_file = write_json(tmp_path / "ann.json", sample_data)
+    output_file = tmp_path / "train.json"
+    config_file = tmp_path / "pipeline.yaml"
+    config_file.write_text(
+        f"""
+steps:
+  - step: load
+    output: data
+    annotations_file: {annotations_file}
+  - step: random_split
+    output: split
+    input: data
+    train_percentage: 0.8
+  - step: save
+    input: split_train
+    output_file: {output_file}
+"""
+    )
+
+    run_pipeline(str(config_file))
+
+    assert len(json.loads(output_file.read_text())["images"]) == 8
+
+
+def test_run_releases_datasets(sample_data, tmp_path, write_json):
+    annotations_file = write_json(tmp_path / "ann.json", sample_data)
+    pipeline = COCOPipeline().run(
+        [
+            {"step": "load", "output": "data", "annotations_file": annotations_file},
+            {"step": "random_split", "output": "split", "input": "data"},
+        ]
+    )
+
+    assert set(pipeline.datasets) == {"split_train", "split_val"}
+
+
+def test_segmentation_step(sample_data, tmp_path, write_json):
+    sample_data["annotations"][0]["segmentation"] = [[0, 0, 10, 0, 10, 10, 0, 10]]
+    annotations_file = write_json(tmp_path / "ann.json", sample_data)
+    pipeline = COCOPipeline().run(
+        [
+            {"step": "load", "output": "data", "annotations_file": annotations_file},
+            {"step": "segmentation", "output": "rle", "input": "data"},
+        ]
+    )
+    annotation = pipeline["rle"].annotations[0]
+
+    assert annotation["segmentation"]["size"] == [600, 800]
+    assert annotation["area"] == 100.0
+
+
+def test_unknown_step_and_dataset(sample_data):
+    with pytest.raises(ValueError, match="Unknown step"):
+        COCOPipeline().run([{"step": "explode"}])
+
+    with pytest.raises(KeyError, match="Unknown dataset"):
+        COCOPipeline().filter("out", "missing", {})
@@ -83,3 +83,54 @@ def test_random_split_coco_format(train_percentage, seed, sample_data):
         for key in necessary_keys:
             assert key in train_data
             assert key in val_data
+
+
+def test_random_split_streaming_matches_in_memory(sample_data):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir_path = Path(temp_dir)
+        temp_file = temp_dir_path / "sample_data.json"
+        temp_file.write_text(json.dumps(sample_data))
+
+        results = {}
+        for streaming in (False, True):
+            output_file = temp_dir_path / f"random_split_{streaming}"
+            random_split(str(temp_file), str(output_file), streaming=streaming)
+            for data_type in ("train", "val"):
+                with open(f"{output_file}_{data_type}.json", "r") as f:
+                    results[streaming, data_type] = json.load(f)
+
+    for data_type in ("train", "val"):
+        in_memory = results[False, data_type]
+        streamed = results[True, data_type]
+        assert streamed["images"] == in_memory["images"]
+        assert sorted(ann["id"] for ann in streamed["annotations"]) == sorted(
+            ann["id"] for ann in in_memory["annotations"]
+        )
+
+
+def test_random_split_non_contiguous_image_ids(sample_data):
+    for image in sample_data["images"]:
+        image["id"] = image["id"] * 1000 + 7
+    for ann in sample_data["annotations"]:
+        ann["image_id"] = ann["image_id"] * 1000 + 7
+    sample_data["annotations"].reverse()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir_path = Path(temp_dir)
+        temp_file = temp_dir_path / "sample_data.json"
+        temp_file.write_text(json.dumps(sample_data))
+        output_file = temp_dir_path / "random_split_output"
+
+        random_split(str(temp_file), str(output_file), train_percentage=0.6)
+
+        splits = []
+        for data_type in ("train", "val"):
+            with open(f"{output_file}_{data_type}.json", "r") as f:
+                splits.append(json.load(f))
+
+    for split in splits:
+        split_image_ids = {img["id"] for img in split["images"]}
+        assert {ann["image_id"] for ann in split["annotations"]} == split_image_ids
+    assert sum(len(split["annotations"]) for split in splits) == len(
+        sample_data["annotations"]
+    )
@@ -0,0 +1,46 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from PIL import Image
+
+from cocosuite.scripts.manipulation.verify_images import verify_images
+
+
+def test_verify_images(sample_data: dict):
+    with TemporaryDirectory() as temp_dir:
+        temp_dir_path = Path(temp_dir)
+        annotations_file = temp_dir_path / "annotations.json"
+        annotations_file.write_text(json.dumps(sample_data))
+
+        images = sample_data["images"]
+        for img in images[2:]:
+            size = (img["width"], img["height"])
+            Image.new("RGB", size).save(temp_dir_path / img["file_name"], "JPEG")
+        Image.new("RGB", (10, 20)).save(temp_dir_path / images[2]["file_name"], "PNG")
+        (temp_dir_path / images[1]["file_name"]).write_text("not an image")
+
+        counts = verify_images(
+            str(annotations_file),
+            workers=2,
+            backfill=True,
+            report_file=str(temp_dir_path / "report.json"),
+        )
+        with open(temp_dir_path / "verified_annotations.json", "r") as f:
+            verified_data = json.load(f)
+        with open(temp_dir_path / "report.json", "r") as f:
+            report = json.load(f)
+
+    assert counts == {
+        "ok": len(images) - 3,
+        "mismatch": 1,
+        "missing": 1,
+        "unreadable": 1,
+    }
+    assert report["missing"] == [images[0]["file_name"]]
+    assert report["unreadable"] == [images[1]["file_name"]]
+    assert report["mismatch"][0]["id"] == images[2]["id"]
+    assert verified_data["images"][2]["width"] == 10
+    assert verified_data["images"][2]["height"] == 20
+    assert verified_data["images"][3:] == images[3:]
+    assert verified_data["annotations"] == sample_data["annotations"]
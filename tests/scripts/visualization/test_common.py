@@ -0,0 +1,73 @@
+import matplotlib
+import numpy as np
+import pytest
+from matplotlib import pyplot as plt
+
+from cocosuite.scripts.visualization import common
+from cocosuite.scripts.visualization.common import plot_histogram, plot_scatter_chart
+
+matplotlib.use("Agg")
+
+
+@pytest.fixture
+def shown(monkeypatch):
+    figures = []
+    monkeypatch.setattr(plt, "show", lambda: figures.append(plt.gcf()))
+    yield figures
+    plt.close("all")
+
+
+def test_scatter_groups_points_by_label(shown):
+    plot_scatter_chart(
+        [1, 2, 3, 4], [5, 6, 7, 8], ["b", "a", "b", "c"], "x", "y", "t", "l"
+    )
+
+    ax = shown[0].axes[0]
+    assert [c.get_label() for c in ax.collections] == ["b", "a", "c"]
+    assert ax.collections[0].get_offsets().tolist() == [[1, 5], [3, 7]]
+    assert [t.get_text() for t in ax.get_legend().get_texts()] == ["b", "a", "c"]
+
+
+def test_scatter_label_names_and_downsampling(shown):
+    x = np.arange(1000)
+    labels = x % 3
+
+    plot_scatter_chart(
+        x, x, labels, "x", "y", "t", label_names=["a", "b", "c"], max_points=10
+    )
+    plot_scatter_chart(
+        x, x, labels, "x", "y", "t", label_names=["a", "b", "c"], max_points=10
+    )
+
+    first, second = (
+        sum(len(c.get_offsets()) for c in f.axes[0].collections) for f in shown
+    )
+    assert first == second == 10
+    for a, b in zip(shown[0].axes[0].collections, shown[1].axes[0].collections):
+        assert a.get_offsets().tolist() == b.get_offsets().tolist()
+
+
+@pytest.mark.parametrize("mode", ["hist2d", "hexbin", "auto"])
+def test_density_modes(shown, monkeypatch, mode):
+    monkeypatch.setattr(common, "MAX_SCATTER_POINTS", 5)
+
+    plot_scatter_chart(
+        range(10), range(10), ["a"] * 10, "x", "y", "t", mode=mode, bins=4
+    )
+
+    ax = shown[0].axes[0]
+    assert not any(c.get_label() == "a" for c in ax.collections)
+    assert len(shown[0].axes) == 2
+
+
+def test_scatter_unknown_mode():
+    with pytest.raises(ValueError):
+        plot_scatter_chart([1], [1], ["a"], "x", "y", "t", mode="pie")
+    plt.close("all")
+
+
+def test_histogram_integer_bins(shown):
+    plot_histogram(np.array([0, 0, 1, 3]), "x", "y", "t")
+
+    patch = shown[0].axes[0].patches[0]
+    assert patch.get_data().values.tolist() == [2, 1, 0, 1]
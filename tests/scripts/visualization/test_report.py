@@ -0,0 +1,34 @@
+import pytest
+
+from cocosuite.scripts.visualization.report import CHARTS, report
+from cocosuite.scripts.visualization.visualization import plot_cat_distribution
+
+
+def test_plot_to_file(sample_data, tmp_path, write_json):
+    annotations_file = write_json(tmp_path / "ann.json", sample_data)
+
+    plot_cat_distribution(annotations_file, output_file=str(tmp_path / "chart.png"))
+
+    assert (tmp_path / "chart.png").read_bytes().startswith(b"\x89PNG")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_report(sample_data, workers, tmp_path, write_json):
+    for ann in sample_data["annotations"]:
+        ann["bbox"] = [0, 0, 10, 20]
+    files = [
+        write_json(tmp_path / "a" / "ann.json", sample_data),
+        write_json(tmp_path / "b" / "ann.json", sample_data),
+    ]
+
+    index_file = report(
+        *files, output_dir=str(tmp_path / "report"), image_format="svg", workers=workers
+    )
+
+    index = (tmp_path / "report" / "index.html").read_text()
+    assert index_file == str(tmp_path / "report" / "index.html")
+    assert "10 images, 10 annotations, 2 categories" in index
+    for chart_dir in ("ann", "ann_1"):
+        for chart in CHARTS:
+            assert f'src="{chart_dir}/{chart}.svg"' in index
+            assert (tmp_path / "report" / chart_dir / f"{chart}.svg").exists()
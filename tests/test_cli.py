@@ -0,0 +1,94 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from cocosuite import cli
+
+STARTUP = """
+import json, sys, time
+start = time.perf_counter()
+from cocosuite.cli import main
+try:
+    main(sys.argv[1:])
+except SystemExit:
+    pass
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def run_startup(*args):
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_every_command_resolves():
+    def specs(commands):
+        for entry in commands.values():
+            yield from specs(entry) if isinstance(entry, dict) else [entry]
+
+    for spec in specs(cli.COMMANDS):
+        assert callable(cli.resolve(spec))
+
+
+def test_usage(capsys):
+    cli.main(["split"])
+    assert "random" in capsys.readouterr().out
+
+    with pytest.raises(SystemExit):
+        cli.main(["unknown"])
+
+
+def test_merge_command(sample_data, tmp_path):
+    for name in ("a", "b"):
+        (tmp_path / f"{name}.json").write_text(json.dumps(sample_data))
+
+    cli.main(
+        ["merge", str(tmp_path / "a.json"), str(tmp_path / "b.json"), "merged.json"]
+    )
+
+    merged = json.loads((tmp_path / "merged.json").read_text())
+    assert len(merged["images"]) == 20
+
+
+@pytest.mark.parametrize("args", [["--help"], ["merge", "--help"]])
+def test_startup_is_lazy(args):
+    startup = run_startup(*args)
+
+    assert "numpy" not in startup["modules"]
+    assert "matplotlib" not in startup["modules"]
+    assert startup["elapsed"] < 2.0
+
+
+def test_profile_option(sample_data, tmp_path):
+    annotations_file = tmp_path / "a.json"
+    annotations_file.write_text(json.dumps(sample_data))
+    profile_file = tmp_path / "profile.json"
+
+    cli.main(
+        [
+            "--profile_output",
+            str(profile_file),
+            "merge",
+            str(annotations_file),
+            str(annotations_file),
+            "merged.json",
+        ]
+    )
+
+    profile = json.loads(profile_file.read_text())
+    assert profile["name"] == "cocosuite merge"
+    assert [s["name"] for s in profile["stages"]] == [
+        "load",
+        "merge",
+        "load",
+        "merge",
+        "write",
+    ]